@@ -4,6 +4,7 @@ Django settings for Sgea project.
 Generated by 'django-admin startproject' using Django 5.2.7.
 """
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv # Adicionado para ler o .env
 
@@ -50,6 +51,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'sgea_app.replicas.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -77,12 +79,84 @@ WSGI_APPLICATION = 'Sgea.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE=sqlite (padrão, arquivo local) ou postgresql (produção com vários workers)
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('DB_NAME', 'sgea'),
+            'USER': os.getenv('DB_USER', 'sgea'),
+            'PASSWORD': os.getenv('DB_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', 'localhost'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+            # Conexões persistentes: reaproveitadas entre requisições e testadas antes do reuso
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
     }
-}
+    # Pool de conexões do próprio Django (requer 'pip install "psycopg[pool]"'); substitui CONN_MAX_AGE
+    DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', '0'))
+    if DB_POOL_MAX:
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.getenv('DB_POOL_MIN', '2')),
+            'max_size': DB_POOL_MAX,
+            'timeout': 10,
+        }
+    # Atrás do PgBouncer em modo transaction, cursores nomeados (iterator()) não sobrevivem entre transações
+    if os.getenv('DB_PGBOUNCER') == '1':
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {},
+            # Banco de testes em arquivo: o SQLite em memória compartilhada responde "database table
+            # is locked" (sem esperar o busy_timeout) aos testes de concorrência com várias threads
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+        }
+    }
+    # Ajustes de concorrência do SQLite (PRAGMAs aplicados a cada conexão por sgea_app/banco.py).
+    # SQLITE_AJUSTES=0 volta ao comportamento padrão (usado pelo 'manage.py benchmark_banco').
+    SQLITE_AJUSTES = os.getenv('SQLITE_AJUSTES', '1') == '1'
+    SQLITE_PRAGMAS = {
+        'busy_timeout': 5000,        # ms esperando o lock de escrita antes de "database is locked"
+        'mmap_size': 256 * 1024 * 1024,
+    }
+    # O modo WAL fica gravado no próprio arquivo (com os arquivos -wal/-shm ao lado): só com SQLITE_WAL=1
+    # no .env do servidor, para que um 'manage.py' qualquer não altere o db.sqlite3 de exemplo do repositório
+    SQLITE_WAL = os.getenv('SQLITE_WAL', '0') == '1'
+    SQLITE_PRAGMAS_WAL = {
+        'journal_mode': 'WAL',       # leitores não bloqueiam o escritor (e vice-versa)
+        'synchronous': 'NORMAL',     # fsync só nos checkpoints do WAL
+    }
+    if SQLITE_AJUSTES:
+        # Transações pegam o lock de escrita no BEGIN: sem isso, uma transação que leu e depois
+        # tenta escrever recebe "database is locked" na hora, sem esperar o busy_timeout
+        DATABASES['default']['OPTIONS']['transaction_mode'] = 'IMMEDIATE'
+
+# Réplicas de leitura (sgea_app/replicas.py): arquivos SQLite ou hosts PostgreSQL separados por vírgula.
+# Só as views marcadas com leitura_em_replica leem delas; escritas e leituras após escrita usam o primário.
+DB_REPLICAS = [valor.strip() for valor in os.getenv('DB_REPLICAS', '').split(',') if valor.strip()]
+if 'test' in sys.argv and DB_ENGINE != 'postgresql' and not DB_REPLICAS:
+    # Nos testes com SQLite há sempre uma réplica, para os testes do roteador (ReplicaLeituraTests)
+    DB_REPLICAS = [str(BASE_DIR / 'replica1.sqlite3')]
+for numero, replica in enumerate(DB_REPLICAS, start=1):
+    DATABASES[f'replica{numero}'] = {
+        **DATABASES['default'],
+        'HOST' if DB_ENGINE == 'postgresql' else 'NAME': replica,
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+        # No SQLite cada réplica de teste é um arquivo próprio, copiado do primário só quando o teste
+        # chama replicas.sincronizar_sqlite() (simula o atraso da replicação)
+        'TEST': {'MIRROR': 'default'} if DB_ENGINE == 'postgresql' else {'NAME': BASE_DIR / f'test_replica{numero}.sqlite3'},
+    }
+DATABASE_ROUTERS = ['sgea_app.replicas.RoteadorReplicas']
+REPLICAS_FIXAR_SEGUNDOS = 10  # após escrever, o usuário lê do primário por esse tempo (> atraso da réplica)
+REPLICAS_CONTAR_CONSULTAS = DEBUG  # cabeçalho X-Consultas-Banco com as consultas por banco
 
 
 # Password validation
@@ -106,28 +180,67 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# O backend próprio já herda do ModelBackend e procura o username antes do e-mail; repetir o
+# ModelBackend faria cada login recusado consultar o banco e calcular o hash da senha duas vezes
 AUTHENTICATION_BACKENDS = [
     'sgea_app.backends.EmailOrUsernameModelBackend',
-    'django.contrib.auth.backends.ModelBackend',
 ]
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'sgea_app.identidade.TokenAuthenticationEmCache',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.ScopedRateThrottle',
+        'sgea_app.limites.ScopedRateThrottleCompartilhado',
     ],
     'DEFAULT_THROTTLE_RATES': {
         'consulta_eventos': '20/day',
         'inscricao_participante': '50/day',
+        'inscricao_lote': '100/day',
+        'presenca_lote': '1000/day',
+        'estatisticas': '1000/day',
+        'validacao_certificado': '5000/hour',
     }
 }
 
 
+# Contadores dos limites da API (sgea_app/limites.py), compartilhados entre os workers:
+# 'sqlite' (arquivo local), 'redis' (vários servidores) ou 'memoria' (um processo; usado nos testes)
+LIMITES_ARMAZENAMENTO = 'memoria' if 'test' in sys.argv else os.getenv('LIMITES_ARMAZENAMENTO', 'sqlite')
+LIMITES_SQLITE_CAMINHO = os.path.join(BASE_DIR, 'limites.sqlite3')
+LIMITES_REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+
+# Cache do Django: 'memoria' (LocMemCache, um por processo) ou 'redis' (REDIS_URL, compartilhado entre
+# os workers; requer 'pip install redis')
+CACHE_ARMAZENAMENTO = 'memoria' if 'test' in sys.argv else os.getenv('CACHE_ARMAZENAMENTO', 'memoria')
+if CACHE_ARMAZENAMENTO == 'redis':
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': LIMITES_REDIS_URL}}
+
+# Cache de identidades autenticadas (sessão e token da API), em segundos. Só é usado com um cache
+# compartilhado entre os processos: com o LocMemCache a invalidação não chegaria aos demais workers
+IDENTIDADE_CACHE_TTL = 300
+
+# Auditoria: os logs são enfileirados e gravados em lote por uma thread (sgea_app/auditoria.py).
+# Nos testes a gravação é síncrona, para que os registros possam ser verificados logo após a requisição.
+AUDITORIA_MODO = 'sincrono' if 'test' in sys.argv else os.getenv('AUDITORIA_MODO', 'assincrono')
+AUDITORIA_TAMANHO_FILA = 10000
+AUDITORIA_TAMANHO_LOTE = 200
+AUDITORIA_INTERVALO_FLUSH = 1.0  # segundos
+# 'bloquear', 'descartar' ou 'gravar_direto' quando a fila estiver cheia
+AUDITORIA_POLITICA_OVERFLOW = os.getenv('AUDITORIA_POLITICA_OVERFLOW', 'bloquear')
+# Retenção: 'manage.py arquivar_logs' move logs mais antigos para arquivos .jsonl.gz
+AUDITORIA_RETENCAO_DIAS = 180
+AUDITORIA_DIR_ARQUIVO = os.path.join(BASE_DIR, 'arquivo_auditoria')
+
+# Check-in por QR code (sgea_app/checkin.py): presenças lidas no quiosque são gravadas em lote
+CHECKIN_MODO = 'sincrono' if 'test' in sys.argv else os.getenv('CHECKIN_MODO', 'assincrono')
+CHECKIN_INTERVALO_GRAVACAO = 2.0  # segundos
+CHECKIN_VALIDADE_QUIOSQUE = 2 * 24 * 3600  # validade do link do quiosque, em segundos
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -164,6 +277,31 @@ LOGOUT_REDIRECT_URL = '/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Notificações em tempo real (SSE): 'local' entrega só no próprio processo;
+# 'redis' replica entre processos/servidores (requer o pacote opcional 'redis')
+NOTIFICACOES_BACKEND = os.getenv('NOTIFICACOES_BACKEND', 'local')
+NOTIFICACOES_REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+
+# Cache dos PDFs de certificados (fora de MEDIA_ROOT: não deve ser servido publicamente)
+CERTIFICADOS_DIR_CACHE = os.path.join(BASE_DIR, 'cache_certificados')
+# Processos usados para renderizar PDFs na exportação em ZIP (None = número de CPUs); o pool
+# é criado no primeiro download que precisar dele e reaproveitado pelos seguintes
+CERTIFICADOS_PROCESSOS = None
+
+# Variantes dos banners de eventos (worker: python manage.py processar_banners)
+BANNERS_PROCESSOS = None  # None = número de CPUs
+
+# Importação de usuários via CSV: processos para o hash das senhas (None = número de CPUs)
+IMPORTACAO_PROCESSOS = None
+IMPORTACAO_DIR_RELATORIOS = os.path.join(BASE_DIR, 'relatorios_importacao')
+
+# Caixa de saída de e-mails (worker: python manage.py enviar_emails)
+EMAILS_TAMANHO_LOTE = 100      # e-mails enviados por conexão SMTP
+EMAILS_MAX_TENTATIVAS = 5
+EMAILS_ESPERA_BASE = 60        # segundos; dobra a cada falha
+EMAILS_ESPERA_MAXIMA = 3600
+EMAILS_TEMPO_RESERVA = 300     # após isso, e-mails de um worker interrompido voltam à fila
+
 # --- Configuração de E-mail REAL (Gmail) ---
 
 EMAIL_HOST_USER = os.getenv('EMAIL_USER')
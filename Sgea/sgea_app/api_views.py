@@ -3,11 +3,21 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.permissions import IsAuthenticated
-from .models import Evento, Inscricao
-from .serializers import EventoSerializer, InscricaoSerializer
-from .views import registrar_log
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from django.core.cache import cache
+from django.shortcuts import get_object_or_404
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django.utils import timezone
+from django.utils.dateparse import parse_date
+from datetime import datetime, time, timedelta
+from .models import Evento
+from .serializers import EventoSerializer, InscricaoLoteSerializer, InscricaoSerializer, PresencaLoteSerializer
+from .paginacao import EventoBuscaPagination, EventoCursorPagination
+from .views import registrar_log
+from . import auditoria, busca, cache_eventos, estatisticas, inscricoes, validacao
 
 class InscricaoCreateAPIView(APIView):
     permission_classes = [IsAuthenticated]
@@ -17,24 +27,12 @@ class InscricaoCreateAPIView(APIView):
         serializer = InscricaoSerializer(data=request.data)
         if serializer.is_valid():
             evento = serializer.validated_data['evento']
-            usuario = request.user
-
-            # --- Validação de Data ---
-            if evento.data_fim < timezone.now():
-                return Response(
-                    {"detail": "As inscrições para este evento estão encerradas."},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
 
-            # Verifica se já está inscrito
-            if Inscricao.objects.filter(usuario=usuario, evento=evento).exists():
-                return Response(
-                    {"detail": "Você já está inscrito neste evento."},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+            try:
+                inscricoes.inscrever(request.user, evento)
+            except inscricoes.InscricaoRecusada as erro:
+                return Response({"detail": erro.mensagem}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Cria a inscrição
-            Inscricao.objects.create(usuario=usuario, evento=evento)
             return Response(
                 {"detail": f"Inscrição realizada com sucesso no evento {evento.nome}!"},
                 status=status.HTTP_201_CREATED
@@ -42,13 +40,284 @@ class InscricaoCreateAPIView(APIView):
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class InscricaoLoteAPIView(APIView):
+    """
+    Inscrição em lote: organizador inscrevendo uma turma em seus eventos, ou o próprio
+    usuário em vários eventos. Responde com a situação de cada item (ver inscricoes.py).
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'inscricao_lote'
+
+    def post(self, request):
+        serializer = InscricaoLoteSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        if 'inscricoes' in serializer.validated_data:
+            if request.user.perfil != 'organizador':
+                return Response(
+                    {"detail": "Apenas organizadores podem inscrever outros usuários."},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            pares = [(item['usuario'], item['evento']) for item in serializer.validated_data['inscricoes']]
+            resultados = inscricoes.inscrever_em_lote(pares, organizador=request.user)
+        else:
+            pares = [(request.user.pk, evento) for evento in serializer.validated_data['eventos']]
+            resultados = inscricoes.inscrever_em_lote(pares)
+
+        realizadas = [item for item in resultados if item['situacao'] == inscricoes.INSCRITO]
+        if realizadas:
+            auditoria.registrar_varios(
+                request.user, 'inscricao',
+                [f"Inscrição em lote: usuário {item['usuario']} no evento {item['evento']}" for item in realizadas],
+                request.META.get('REMOTE_ADDR'),
+            )
+
+        return Response(
+            {'inscritos': len(realizadas), 'total': len(resultados), 'resultados': resultados},
+            status=status.HTTP_201_CREATED if realizadas else status.HTTP_200_OK
+        )
+
+
 class EventoListAPIView(generics.ListAPIView):
-    queryset = Evento.objects.all()
+    """
+    Lista de eventos paginada por cursor (data_inicio, id).
+
+    Filtros: ?inicio_de=AAAA-MM-DD, ?inicio_ate=AAAA-MM-DD, ?tipo_evento=palestra,
+    ?abertos=1 (não encerrados e com vagas),
+    ?q=texto (índice de busca: nome, local, tipo ou professor; ver sgea_app.busca).
+    Campos: ?fields=id,nome,data_inicio
+
+    Suporta GET condicional (ETag / Last-Modified): um 304 é respondido sem
+    serializar nada e não conta no limite do throttle. Respostas completas ficam
+    em cache por assinatura da consulta (ver sgea_app.cache_eventos).
+    """
     serializer_class = EventoSerializer
+    pagination_class = EventoCursorPagination
     permission_classes = [IsAuthenticated]
     throttle_scope = 'consulta_eventos'
+    leitura_em_replica = True  # ver sgea_app.replicas
+
+    def check_throttles(self, request):
+        # initial() já autenticou e checou as permissões: um 304 sai antes da contagem do throttle
+        self.nao_modificado = None
+        if request.method in ('GET', 'HEAD'):
+            self.etag, self.ultima_modificacao = self.validadores()
+            self.nao_modificado = get_conditional_response(
+                request, etag=self.etag, last_modified=self.ultima_modificacao
+            )
+        if self.nao_modificado is None:
+            super().check_throttles(request)
 
     def get(self, request, *args, **kwargs):
+        if self.nao_modificado is not None:
+            return self.nao_modificado
         # LOG: Consulta via API
         registrar_log(request, 'evento_consulta_api', "Listagem de eventos via API")
-        return super().get(request, *args, **kwargs)
\ No newline at end of file
+
+        chave = cache_eventos.chave_resposta(self.etag)
+        dados = cache.get(chave)
+        if dados is None:
+            dados = super().get(request, *args, **kwargs).data
+            cache.set(chave, dados, cache_eventos.TEMPO_RESPOSTA)
+
+        response = Response(dados)
+        response['ETag'] = self.etag
+        if self.ultima_modificacao:
+            response['Last-Modified'] = http_date(self.ultima_modificacao)
+        return response
+
+    def validadores(self):
+        """ETag e Last-Modified a partir de MAX(data_atualizacao) e COUNT(*) do queryset filtrado."""
+        resumo = self.filtrar(Evento.objects.all()).order_by().aggregate(
+            ultima=Max('data_atualizacao'), total=Count('pk')
+        )
+        # O caminho entra na assinatura: listagem e busca com os mesmos parâmetros têm respostas diferentes
+        assinatura = [self.request.path] + sorted(self.request.query_params.lists())
+        etag = cache_eventos.etag(assinatura, resumo['ultima'], resumo['total'], cache_eventos.versao())
+
+        momentos = [m for m in (resumo['ultima'], cache_eventos.ultima_alteracao()) if m is not None]
+        ultima_modificacao = int(max(momentos).timestamp()) if momentos else None
+        return etag, ultima_modificacao
+
+    def campos_solicitados(self):
+        parametro = self.request.query_params.get('fields')
+        if not parametro:
+            return None
+        campos = [campo.strip() for campo in parametro.split(',') if campo.strip()]
+        invalidos = set(campos) - set(EventoSerializer.Meta.fields)
+        if invalidos:
+            raise ValidationError({'fields': f"Campos inválidos: {', '.join(sorted(invalidos))}."})
+        return campos
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs['campos'] = self.campos_solicitados()
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        campos = self.campos_solicitados()
+        queryset = Evento.objects.all()
+
+        # Só paga pelo JOIN/anotações quando o campo for de fato devolvido
+        if campos is None or 'organizador' in campos:
+            queryset = queryset.select_related('organizador')
+        if campos is None or {'inscritos', 'vagas_restantes'} & set(campos):
+            queryset = queryset.com_vagas()
+
+        return self.filtrar(queryset)
+
+    def filtrar(self, queryset):
+        params = self.request.query_params
+
+        inicio_de = self._data(params, 'inicio_de')
+        if inicio_de:
+            queryset = queryset.filter(data_inicio__gte=inicio_de)
+        inicio_ate = self._data(params, 'inicio_ate')
+        if inicio_ate:
+            queryset = queryset.filter(data_inicio__lt=inicio_ate + timedelta(days=1))
+
+        tipo = params.get('tipo_evento')
+        if tipo:
+            queryset = queryset.filter(tipo_evento=tipo)
+
+        if params.get('abertos') in ('1', 'true', 'sim'):
+            queryset = queryset.abertos()
+
+        termo = params.get('q', '').strip()
+        if termo:
+            queryset = busca.filtrar(queryset, termo)
+
+        return queryset
+
+    def _data(self, params, nome):
+        valor = params.get(nome)
+        if not valor:
+            return None
+        data = parse_date(valor)
+        if data is None:
+            raise ValidationError({nome: "Use o formato AAAA-MM-DD."})
+        return timezone.make_aware(datetime.combine(data, time.min))
+
+
+class EventoBuscaAPIView(EventoListAPIView):
+    """
+    Busca de eventos ordenada por relevância: ?q=texto (obrigatório), paginada por número
+    (?pagina=N, ?por_pagina=20, máx. 100). Aceita os mesmos filtros e ?fields= da listagem.
+    """
+    pagination_class = EventoBuscaPagination
+
+    def get(self, request, *args, **kwargs):
+        if not busca.termos(request.query_params.get('q')):
+            raise ValidationError({'q': "Informe o texto da busca."})
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        # filtrar() da listagem já aplica ?q=; aqui só entra a ordenação
+        return busca.ordenar(super().get_queryset(), self.request.query_params['q'])
+
+
+class PresencaLoteAPIView(APIView):
+    """
+    Chamada de presença em lote de um evento do organizador (ver inscricoes.atualizar_presencas).
+    POST {"presentes": [ids de inscrição], "ausentes": [...]}
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'presenca_lote'
+
+    def post(self, request, pk):
+        evento = get_object_or_404(Evento, pk=pk)
+        if evento.organizador_id != request.user.pk:
+            return Response(
+                {"detail": "Apenas o organizador do evento pode registrar presenças."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = PresencaLoteSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        situacoes = {pk: True for pk in serializer.validated_data['presentes']}
+        situacoes.update({pk: False for pk in serializer.validated_data['ausentes']})
+        alteradas, ignoradas = inscricoes.atualizar_presencas(evento, situacoes)
+        if alteradas:
+            registrar_log(request, 'presenca', inscricoes.resumo_presencas(evento, alteradas))
+
+        return Response({
+            'alteradas': len(alteradas),
+            'inalteradas': len(situacoes) - len(alteradas) - len(ignoradas),
+            'ignoradas': ignoradas,
+        })
+
+
+class EstatisticasEventoAPIView(APIView):
+    """
+    Estatísticas de um evento do organizador: inscritos, presentes, taxa de presença, certificados
+    e inscrições por dia, lidas da tabela de resumo (ver sgea_app.estatisticas).
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'estatisticas'
+    leitura_em_replica = True
+
+    def get(self, request, pk):
+        evento = get_object_or_404(Evento.objects.only('id', 'nome', 'organizador_id'), pk=pk)
+        if evento.organizador_id != request.user.pk:
+            return Response(
+                {"detail": "Apenas o organizador do evento pode consultar suas estatísticas."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return Response(estatisticas.do_evento(evento))
+
+
+class EstatisticasOrganizadorAPIView(APIView):
+    """Totais de todos os eventos do organizador autenticado e uma linha por evento."""
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'estatisticas'
+    leitura_em_replica = True
+
+    def get(self, request):
+        if request.user.perfil != 'organizador':
+            return Response(
+                {"detail": "Apenas organizadores possuem estatísticas de eventos."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return Response({
+            **estatisticas.do_organizador(request.user),
+            'eventos': estatisticas.eventos_do_organizador(request.user),
+        })
+
+
+class CertificadoValidacaoAPIView(APIView):
+    """
+    Validação pública de certificados, individual ou em lote.
+    GET ?codigo=A&codigo=B  ou  POST {"codigos": ["A", "B"]}
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    throttle_scope = 'validacao_certificado'
+
+    def get(self, request):
+        return self._validar(request.query_params.getlist('codigo'))
+
+    def post(self, request):
+        codigos = request.data.get('codigos')
+        if not isinstance(codigos, list):
+            return Response({"detail": "Envie uma lista em 'codigos'."}, status=status.HTTP_400_BAD_REQUEST)
+        return self._validar(codigos)
+
+    def _validar(self, codigos):
+        codigos = [validacao.normalizar_codigo(str(c)) for c in codigos]
+        codigos = list(dict.fromkeys(c for c in codigos if c))
+        if not codigos:
+            return Response({"detail": "Informe ao menos um código."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(codigos) > validacao.MAXIMO_POR_CONSULTA:
+            return Response(
+                {"detail": f"Máximo de {validacao.MAXIMO_POR_CONSULTA} códigos por requisição."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        encontrados = validacao.obter_indice().consultar_varios(codigos)
+        resultados = []
+        for codigo in codigos:
+            dados = encontrados[codigo]
+            resultados.append({'codigo': codigo, 'valido': dados is not None, **(dados or {})})
+        return Response({'resultados': resultados})
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SgeaAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'sgea_app'
+
+    def ready(self):
+        from . import banco, busca, signals  # noqa: F401 (registra os receivers e as verificações)
@@ -0,0 +1,204 @@
+# sgea_app/auditoria.py
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from functools import partial
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import LogAuditoria
+
+logger = logging.getLogger(__name__)
+
+POLITICAS_OVERFLOW = ('bloquear', 'descartar', 'gravar_direto')
+
+
+class GravadorAuditoria:
+    """
+    Fila limitada em memória + thread de gravação em lote para LogAuditoria.
+
+    Os registros são enfileirados no caminho da requisição e gravados com
+    bulk_create quando o lote enche (tamanho_lote) ou o intervalo expira.
+    Quando a fila está cheia, aplica a política configurada:
+      - 'bloquear': a requisição espera por espaço na fila;
+      - 'descartar': o registro é descartado e contado em self.descartados;
+      - 'gravar_direto': o registro é gravado de forma síncrona.
+    """
+
+    def __init__(self, tamanho_fila=10000, tamanho_lote=200, intervalo=1.0, politica='bloquear'):
+        if politica not in POLITICAS_OVERFLOW:
+            raise ValueError(f"Política de overflow inválida: {politica!r}")
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self.politica = politica
+        self.descartados = 0
+        self._tamanho_fila = tamanho_fila
+        self._trava = threading.Lock()
+        self._iniciar_estado()
+        atexit.register(self.encerrar)
+
+    def _iniciar_estado(self):
+        self._fila = queue.Queue(maxsize=self._tamanho_fila)
+        self._parar = threading.Event()
+        self._thread = None
+        self._pid = os.getpid()
+
+    def _garantir_thread(self):
+        # Após um fork (ex: gunicorn --preload) a thread do processo pai não existe no filho
+        if self._pid != os.getpid():
+            with self._trava:
+                if self._pid != os.getpid():
+                    self._iniciar_estado()
+        if self._thread is None or not self._thread.is_alive():
+            with self._trava:
+                if self._thread is None or not self._thread.is_alive():
+                    self._parar.clear()
+                    self._thread = threading.Thread(target=self._executar, name='auditoria', daemon=True)
+                    self._thread.start()
+
+    def enfileirar(self, log):
+        self._garantir_thread()
+        try:
+            self._fila.put_nowait(log)
+        except queue.Full:
+            if self.politica == 'bloquear':
+                self._fila.put(log)
+            elif self.politica == 'descartar':
+                with self._trava:
+                    self.descartados += 1
+            else:
+                self._gravar([log])
+
+    def _proximo_lote(self):
+        try:
+            lote = [self._fila.get(timeout=self.intervalo)]
+        except queue.Empty:
+            return []
+        prazo = time.monotonic() + self.intervalo
+        while len(lote) < self.tamanho_lote:
+            restante = prazo - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                lote.append(self._fila.get(timeout=restante))
+            except queue.Empty:
+                break
+        return lote
+
+    def _executar(self):
+        try:
+            while not self._parar.is_set():
+                lote = self._proximo_lote()
+                if lote:
+                    self._gravar(lote)
+            self.flush()
+        finally:
+            connection.close()
+
+    def _gravar(self, lote):
+        try:
+            LogAuditoria.objects.bulk_create(lote, batch_size=self.tamanho_lote)
+        except Exception:
+            # Um registro inválido não pode derrubar o lote inteiro: tenta um a um
+            logger.exception("Falha ao gravar lote de %d logs de auditoria; gravando individualmente.", len(lote))
+            for log in lote:
+                try:
+                    log.save()
+                except Exception:
+                    logger.exception("Log de auditoria descartado: %s", log.acao)
+        finally:
+            # Só na thread de gravação: flush() e 'gravar_direto' também rodam na thread da requisição
+            if threading.current_thread() is self._thread:
+                connection.close_if_unusable_or_obsolete()
+
+    def flush(self):
+        """Grava imediatamente tudo o que está na fila (na thread que chamou)."""
+        lote = []
+        while True:
+            try:
+                lote.append(self._fila.get_nowait())
+            except queue.Empty:
+                break
+            if len(lote) >= self.tamanho_lote:
+                self._gravar(lote)
+                lote = []
+        if lote:
+            self._gravar(lote)
+
+    def encerrar(self, timeout=5.0):
+        """Para a thread de gravação e esvazia a fila (chamado no desligamento do processo)."""
+        self._parar.set()
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            self._thread.join(timeout)
+        self.flush()
+
+
+_gravador = None
+_gravador_trava = threading.Lock()
+
+
+def obter_gravador():
+    global _gravador
+    if _gravador is None:
+        with _gravador_trava:
+            if _gravador is None:
+                _gravador = GravadorAuditoria(
+                    tamanho_fila=getattr(settings, 'AUDITORIA_TAMANHO_FILA', 10000),
+                    tamanho_lote=getattr(settings, 'AUDITORIA_TAMANHO_LOTE', 200),
+                    intervalo=getattr(settings, 'AUDITORIA_INTERVALO_FLUSH', 1.0),
+                    politica=getattr(settings, 'AUDITORIA_POLITICA_OVERFLOW', 'bloquear'),
+                )
+    return _gravador
+
+
+def registrar(usuario, acao, detalhes="", ip=None):
+    """
+    Registra uma ação na auditoria.
+    No modo 'sincrono' grava na hora (usado nos testes); no modo 'assincrono' enfileira
+    para o gravador em lote. O enfileiramento só acontece após o commit da transação
+    corrente, para que ações desfeitas (rollback) não deixem logs órfãos.
+    """
+    log = LogAuditoria(
+        usuario_id=usuario.pk if usuario is not None else None,
+        acao=acao,
+        detalhes=detalhes,
+        ip_usuario=ip,
+        data_hora=timezone.now(),
+    )
+    if getattr(settings, 'AUDITORIA_MODO', 'assincrono') == 'sincrono':
+        log.save()
+    else:
+        transaction.on_commit(partial(obter_gravador().enfileirar, log))
+    return log
+
+
+def registrar_varios(usuario, acao, lista_detalhes, ip=None):
+    """Registra várias ações de uma vez (ex: inscrição em lote), em um único INSERT no modo síncrono."""
+    agora = timezone.now()
+    logs = [
+        LogAuditoria(
+            usuario_id=usuario.pk if usuario is not None else None,
+            acao=acao,
+            detalhes=detalhes,
+            ip_usuario=ip,
+            data_hora=agora,
+        )
+        for detalhes in lista_detalhes
+    ]
+    if getattr(settings, 'AUDITORIA_MODO', 'assincrono') == 'sincrono':
+        LogAuditoria.objects.bulk_create(logs)
+    else:
+        gravador = obter_gravador()
+
+        def enfileirar_todos():
+            for log in logs:
+                gravador.enfileirar(log)
+
+        transaction.on_commit(enfileirar_todos)
+    return logs
@@ -2,7 +2,8 @@
 
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+
+from . import identidade
 
 UserModel = get_user_model()
 
@@ -16,19 +17,22 @@ class EmailOrUsernameModelBackend(ModelBackend):
     def authenticate(self, request, username=None, password=None, **kwargs):
         if username is None:
             username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
 
-        try:
-            # Tenta buscar o usuário combinando username OU email
-            user = UserModel.objects.get(Q(username__iexact=username) | Q(email__iexact=username))
-        except UserModel.DoesNotExist:
+        # Uma única consulta, resolvida pelos índices Lower(username) e Lower(email). Se houver mais de
+        # um usuário, vale o dono do username e, entre e-mails repetidos (cadastros antigos), o mais antigo.
+        user = UserModel.objects.por_login(username).first()
+        if user is None:
+            # Executa o hasher mesmo assim, para não revelar pelo tempo de resposta que o usuário não existe
             UserModel().set_password(password)
             return None
-        except UserModel.MultipleObjectsReturned:
-            # Caso existam múltiplos usuários com o mesmo email (evitar isso na validação de cadastro),
-            # pega o primeiro encontrado para evitar erro 500.
-            user = UserModel.objects.filter(Q(username__iexact=username) | Q(email__iexact=username)).order_by(
-                'id').first()
 
         if user.check_password(password) and self.user_can_authenticate(user):
             return user
-        return None
\ No newline at end of file
+        return None
+
+    def get_user(self, user_id):
+        # Usado a cada requisição com sessão: resolvido pelo cache de identidades
+        user = identidade.obter_usuario(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
@@ -0,0 +1,38 @@
+# sgea_app/banco.py
+"""
+Ajustes aplicados a cada nova conexão com o banco.
+
+No SQLite, os PRAGMAs de settings.SQLITE_PRAGMAS (busy_timeout e mmap_size) são executados no
+sinal connection_created, antes de qualquer consulta da conexão; valem só para a conexão, por isso
+são repetidos em todas. Com SQLITE_WAL, também os de SQLITE_PRAGMAS_WAL (journal_mode=WAL e
+synchronous=NORMAL): o modo WAL fica gravado no arquivo, por isso é opcional e ligado pelo .env
+do servidor. O PostgreSQL é configurado apenas em settings.DATABASES (conexões persistentes com
+health check ou pool).
+"""
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def pragmas_sqlite():
+    """PRAGMAs a aplicar nas conexões SQLite ({} com SQLITE_AJUSTES desligado)."""
+    if not getattr(settings, 'SQLITE_AJUSTES', True):
+        return {}
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    if getattr(settings, 'SQLITE_WAL', False):
+        # journal_mode antes dos demais: synchronous=NORMAL só é seguro no modo WAL
+        pragmas = {**getattr(settings, 'SQLITE_PRAGMAS_WAL', {}), **pragmas}
+    return pragmas
+
+
+@receiver(connection_created)
+def configurar_conexao(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = pragmas_sqlite()
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for nome, valor in pragmas.items():
+            cursor.execute(f"PRAGMA {nome} = {valor}")
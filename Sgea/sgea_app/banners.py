@@ -0,0 +1,258 @@
+# sgea_app/banners.py
+"""
+Versões redimensionadas dos banners de eventos.
+
+O upload só grava o arquivo original. O worker (python manage.py processar_banners) gera, em um
+pool de processos, cada banner em três larguras (TAMANHOS) e dois formatos (WebP e JPEG), em
+eventos/banners/variantes/<evento_id>/<hash do conteúdo>-<largura>.<formato>. Como o nome muda
+sempre que a imagem muda, as variantes podem ser servidas com cache permanente.
+
+Evento.banner_processado guarda o banner cujas variantes estão em Evento.banner_variantes: um
+evento é pendente quando os dois diferem (banner novo, trocado ou removido). Enquanto isso as
+páginas usam o original.
+"""
+
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import posixpath
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Coalesce
+from PIL import Image, ImageOps
+
+from . import cache_eventos, painel
+from .models import Evento
+
+logger = logging.getLogger(__name__)
+
+# Largura máxima de cada variante (imagens menores não são ampliadas)
+TAMANHOS = {'miniatura': 320, 'cartao': 640, 'destaque': 1280}
+FORMATOS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+DIR_BANNERS = 'eventos/banners'
+DIR_VARIANTES = f'{DIR_BANNERS}/variantes'
+
+
+def _storage():
+    return Evento._meta.get_field('banner').storage
+
+
+def _diretorio(evento_id):
+    return f"{DIR_VARIANTES}/{evento_id}"
+
+
+# --- Geração (executada nos processos do pool) ---
+
+def _rgb(imagem):
+    # JPEG não tem transparência: PNGs com canal alfa são compostos sobre fundo branco
+    if imagem.mode in ('RGBA', 'LA') or (imagem.mode == 'P' and 'transparency' in imagem.info):
+        imagem = imagem.convert('RGBA')
+        fundo = Image.new('RGB', imagem.size, (255, 255, 255))
+        fundo.paste(imagem, mask=imagem.getchannel('A'))
+        return fundo
+    return imagem.convert('RGB')
+
+
+def gerar_variantes(evento_id, nome_banner):
+    """
+    Lê o banner do storage e grava as variantes que ainda não existem. Retorna o valor de
+    Evento.banner_variantes: {'hash': ..., 'imagens': {tamanho: {'largura', 'altura', 'webp', 'jpeg'}}}.
+    """
+    storage = _storage()
+    with storage.open(nome_banner, 'rb') as arquivo:
+        conteudo = arquivo.read()
+    hash_conteudo = hashlib.sha256(conteudo).hexdigest()[:16]
+
+    with Image.open(io.BytesIO(conteudo)) as original:
+        # JPEG: decodifica direto em escala reduzida quando o original é muito maior que o destaque
+        original.draft('RGB', (max(TAMANHOS.values()), max(TAMANHOS.values())))
+        imagem = _rgb(ImageOps.exif_transpose(original))
+
+    imagens = {}
+    # Da maior para a menor: cada variante é reduzida a partir da anterior, não do original
+    for tamanho, largura_maxima in sorted(TAMANHOS.items(), key=lambda item: -item[1]):
+        largura = min(largura_maxima, imagem.width)
+        altura = max(1, round(imagem.height * largura / imagem.width))
+        if (largura, altura) != imagem.size:
+            imagem = imagem.resize((largura, altura), Image.LANCZOS, reducing_gap=3.0)
+
+        variante = {'largura': largura, 'altura': altura}
+        for formato, (formato_pil, opcoes) in FORMATOS.items():
+            caminho = f"{_diretorio(evento_id)}/{hash_conteudo}-{largura}.{formato}"
+            if not storage.exists(caminho):
+                saida = io.BytesIO()
+                imagem.save(saida, formato_pil, **opcoes)
+                caminho = storage.save(caminho, ContentFile(saida.getvalue()))
+            variante[formato] = caminho
+        imagens[tamanho] = variante
+    return {'hash': hash_conteudo, 'imagens': imagens}
+
+
+# --- Arquivos sem uso ---
+
+def _caminhos(variantes):
+    return {
+        caminho
+        for variante in (variantes or {}).get('imagens', {}).values()
+        for formato, caminho in variante.items() if formato in FORMATOS
+    }
+
+
+def _apagar_original(nome):
+    if nome and not Evento.objects.filter(banner=nome).exists():
+        _storage().delete(nome)
+
+
+def _apagar_sobras(evento_id, manter=()):
+    storage = _storage()
+    diretorio = _diretorio(evento_id)
+    try:
+        _, arquivos = storage.listdir(diretorio)
+    except FileNotFoundError:
+        return
+    for arquivo in arquivos:
+        caminho = f"{diretorio}/{arquivo}"
+        if caminho not in manter:
+            storage.delete(caminho)
+
+
+def apagar_arquivos(evento_id, nomes_banner):
+    """Remove variantes e originais de um evento excluído (chamado após o commit, ver signals)."""
+    _apagar_sobras(evento_id)
+    for nome in set(nomes_banner):
+        _apagar_original(nome)
+
+
+def limpar_orfaos():
+    """
+    Remove originais e diretórios de variantes que nenhum evento referencia (ex: banners trocados
+    mais de uma vez entre duas execuções do worker). Retorna a quantidade de arquivos apagados.
+    """
+    storage = _storage()
+    apagados = 0
+    try:
+        diretorios, arquivos = storage.listdir(DIR_BANNERS)
+    except FileNotFoundError:
+        return 0
+
+    em_uso = set(Evento.objects.exclude(banner='').exclude(banner__isnull=True).values_list('banner', flat=True))
+    em_uso.update(Evento.objects.exclude(banner_processado='').values_list('banner_processado', flat=True))
+    for arquivo in arquivos:
+        if posixpath.join(DIR_BANNERS, arquivo) not in em_uso:
+            storage.delete(posixpath.join(DIR_BANNERS, arquivo))
+            apagados += 1
+
+    if posixpath.basename(DIR_VARIANTES) in diretorios:
+        variantes = dict(Evento.objects.values_list('pk', 'banner_variantes'))
+        for diretorio in storage.listdir(DIR_VARIANTES)[0]:
+            manter = _caminhos(variantes.get(int(diretorio))) if diretorio.isdigit() else set()
+            for arquivo in storage.listdir(f"{DIR_VARIANTES}/{diretorio}")[1]:
+                caminho = f"{DIR_VARIANTES}/{diretorio}/{arquivo}"
+                if caminho not in manter:
+                    storage.delete(caminho)
+                    apagados += 1
+    return apagados
+
+
+# --- Worker ---
+
+def _banner_atual():
+    return Coalesce('banner', Value(''), output_field=CharField())
+
+
+def pendentes():
+    """Eventos cujo banner mudou desde o último processamento (inclusive banners removidos)."""
+    return Evento.objects.annotate(banner_atual=_banner_atual()).exclude(banner_processado=F('banner_atual'))
+
+
+def _concluir(evento_id, nome_banner, anterior, variantes):
+    # Só grava se o banner não foi trocado de novo enquanto as variantes eram geradas
+    atualizados = Evento.objects.annotate(banner_atual=_banner_atual()).filter(
+        pk=evento_id, banner_atual=nome_banner
+    ).update(banner_processado=nome_banner, banner_variantes=variantes)
+    if not atualizados:
+        return False
+    _apagar_sobras(evento_id, manter=_caminhos(variantes))
+    if anterior != nome_banner:
+        _apagar_original(anterior)
+    return True
+
+
+def processar_pendentes(processos=None, limite=500):
+    """
+    Gera as variantes dos banners pendentes (até `limite` eventos por chamada) em um pool de
+    processos. Retorna a quantidade de eventos atualizados.
+    """
+    if processos is None:
+        processos = getattr(settings, 'BANNERS_PROCESSOS', None) or os.cpu_count() or 1
+
+    eventos = list(pendentes().values_list('pk', 'banner_atual', 'banner_processado')[:limite])
+    if not eventos:
+        return 0
+
+    com_banner = [(pk, nome) for pk, nome, _ in eventos if nome]
+    resultados = {}
+    if len(com_banner) > 1 and processos > 1:
+        contexto = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=processos, mp_context=contexto, initializer=django.setup) as executor:
+            futuros = {pk: executor.submit(gerar_variantes, pk, nome) for pk, nome in com_banner}
+            for pk, futuro in futuros.items():
+                try:
+                    resultados[pk] = futuro.result()
+                except Exception:
+                    logger.exception("Falha ao gerar as variantes do banner do evento %s.", pk)
+                    resultados[pk] = {}
+    else:
+        for pk, nome in com_banner:
+            try:
+                resultados[pk] = gerar_variantes(pk, nome)
+            except Exception:
+                logger.exception("Falha ao gerar as variantes do banner do evento %s.", pk)
+                resultados[pk] = {}
+
+    # Banner inválido ou ilegível: fica marcado como processado, sem variantes (as páginas usam o original)
+    atualizados = sum(
+        _concluir(pk, nome, anterior, resultados.get(pk, {}))
+        for pk, nome, anterior in eventos
+    )
+    if atualizados:
+        # update() não dispara sinais: a URL das imagens muda na listagem da API e no painel
+        cache_eventos.invalidar()
+        painel.invalidar_eventos()
+    return atualizados
+
+
+# --- Exibição ---
+
+def imagem(evento, tamanho='destaque'):
+    """
+    Dados para o <picture> do banner no tamanho pedido: {'src', 'largura', 'altura', 'srcset':
+    {formato: 'url 320w, ...'}}. Sem variantes, só 'src' (o original); sem banner, None.
+    """
+    if not evento.banner:
+        return None
+    imagens = (evento.banner_variantes or {}).get('imagens')
+    if evento.banner_processado != evento.banner.name or not imagens:
+        return {'src': evento.banner.url, 'srcset': {}}
+
+    storage = _storage()
+    variante = imagens.get(tamanho) or imagens[max(imagens, key=lambda nome: imagens[nome]['largura'])]
+    por_largura = sorted({v['largura']: v for v in imagens.values()}.values(), key=lambda v: v['largura'])
+    return {
+        'src': storage.url(variante['jpeg']),
+        'largura': variante['largura'],
+        'altura': variante['altura'],
+        'srcset': {
+            formato: ', '.join(f"{storage.url(v[formato])} {v['largura']}w" for v in por_largura)
+            for formato in FORMATOS
+        },
+    }
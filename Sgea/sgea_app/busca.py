@@ -0,0 +1,201 @@
+# sgea_app/busca.py
+"""
+Busca textual de eventos (nome, local, tipo e nome do professor responsável).
+
+O índice é a tabela evento_busca criada pela migração 0014 e mantida por triggers do banco:
+- SQLite: tabela virtual FTS5 (tokenizer unicode61 sem acentos), ranqueada por bm25;
+- PostgreSQL: tsvector com pesos e índice GIN (configuração 'sgea_pt': português + unaccent),
+  ranqueado por ts_rank.
+No SQLite, qualquer migração que recria a tabela evento ou usuario (adicionar coluna NOT NULL,
+mudar tipo, remover coluna...) descarta os triggers: ela precisa removê-los antes e recriá-los
+depois com uma cópia do SQL de SQLITE_TRIGGERS (como a 0016), sem importar este módulo, para que
+mudanças futuras aqui não alterem migrações antigas. A verificação 'sgea.E001' (manage.py check --database default, e antes
+dos testes) falha se o índice existir sem os triggers.
+Todas as palavras precisam aparecer; a última vale como prefixo ("fisica semin" encontra
+"Seminário de Física").
+Em outros bancos, ou se o SQLite não tiver FTS5, recorre a icontains sem ranking.
+"""
+
+import re
+
+from django.core import checks
+from django.db import DatabaseError, connection, connections
+from django.db.models import Q
+
+TABELA = 'evento_busca'
+MAX_TERMOS = 8
+
+# Pesos do bm25 por coluna do FTS5 (nome, local, tipo, professor)
+PESOS_SQLITE = (10.0, 2.0, 1.0, 3.0)
+
+_PALAVRA = re.compile(r'\w+', re.UNICODE)
+_indice_disponivel = {}
+
+
+def termos(texto):
+    """Palavras da busca, sem operadores nem pontuação (seguras para MATCH / to_tsquery)."""
+    return _PALAVRA.findall(texto or '')[:MAX_TERMOS]
+
+
+def indice_disponivel(conexao=connection):
+    """True se a tabela do índice existe neste banco (verificado uma vez por alias)."""
+    if conexao.alias not in _indice_disponivel:
+        if conexao.vendor not in ('sqlite', 'postgresql'):
+            _indice_disponivel[conexao.alias] = False
+        else:
+            try:
+                with conexao.cursor() as cursor:
+                    _indice_disponivel[conexao.alias] = TABELA in conexao.introspection.table_names(cursor)
+            except DatabaseError:
+                _indice_disponivel[conexao.alias] = False
+    return _indice_disponivel[conexao.alias]
+
+
+def _consulta(palavras):
+    # Só a última palavra é prefixo (a que ainda está sendo digitada): termos exatos
+    # percorrem o índice com saltos, prefixos precisam ler a lista inteira de cada termo
+    *completas, ultima = palavras
+    if connection.vendor == 'sqlite':
+        return ' '.join([f'"{palavra}"' for palavra in completas] + [f'"{ultima}"*'])
+    return ' & '.join(completas + [f'{ultima}:*'])
+
+
+def filtrar(queryset, texto):
+    """
+    Restringe o queryset de eventos aos que casam com a busca (sem alterar a ordenação).
+    Texto sem nenhuma palavra não filtra nada.
+    """
+    palavras = termos(texto)
+    if not palavras:
+        return queryset
+
+    if not indice_disponivel():
+        condicao = Q()
+        for palavra in palavras:
+            condicao &= (
+                Q(nome__icontains=palavra) | Q(local__icontains=palavra) | Q(tipo_evento__icontains=palavra)
+                | Q(professor_responsavel__first_name__icontains=palavra)
+                | Q(professor_responsavel__last_name__icontains=palavra)
+            )
+        return queryset.filter(condicao)
+
+    tabela_evento = queryset.model._meta.db_table
+    if connection.vendor == 'sqlite':
+        where = [f"{TABELA}.rowid = {tabela_evento}.id", f"{TABELA} MATCH %s"]
+    else:
+        where = [f"{TABELA}.evento_id = {tabela_evento}.id", f"{TABELA}.documento @@ to_tsquery('sgea_pt', %s)"]
+    return queryset.extra(tables=[TABELA], where=where, params=[_consulta(palavras)])
+
+
+def ordenar(queryset, texto):
+    """
+    Ordena por relevância (mais relevantes primeiro; empate pelo id) um queryset já restrito
+    por filtrar() com o mesmo texto. O valor fica disponível como evento.relevancia
+    (menor é melhor: bm25 / -ts_rank).
+    """
+    palavras = termos(texto)
+    if not palavras or not indice_disponivel():
+        return queryset.order_by('-data_inicio', 'id')
+
+    if connection.vendor == 'sqlite':
+        pesos = ', '.join(str(peso) for peso in PESOS_SQLITE)
+        return queryset.extra(
+            select={'relevancia': f"bm25({TABELA}, {pesos})"}, order_by=['relevancia', 'id'],
+        )
+    return queryset.extra(
+        select={'relevancia': f"-ts_rank({TABELA}.documento, to_tsquery('sgea_pt', %s))"},
+        select_params=[_consulta(palavras)],
+        order_by=['relevancia', 'id'],
+    )
+
+
+def ranquear(queryset, texto):
+    """Filtra pela busca e ordena por relevância."""
+    return ordenar(filtrar(queryset, texto), texto)
+
+
+# --- Triggers do índice (SQLite) ---
+
+SQLITE_TRIGGERS = {
+    'evento_busca_insercao': """
+        CREATE TRIGGER evento_busca_insercao AFTER INSERT ON evento BEGIN
+            INSERT INTO evento_busca (rowid, nome, local, tipo, professor)
+            VALUES (new.id, new.nome, new.local, new.tipo_evento, COALESCE(
+                (SELECT first_name || ' ' || last_name FROM usuario WHERE id = new.professor_responsavel_id), ''
+            ));
+        END
+    """,
+    'evento_busca_alteracao': """
+        CREATE TRIGGER evento_busca_alteracao AFTER UPDATE OF nome, local, tipo_evento, professor_responsavel_id ON evento BEGIN
+            UPDATE evento_busca SET nome = new.nome, local = new.local, tipo = new.tipo_evento, professor = COALESCE(
+                (SELECT first_name || ' ' || last_name FROM usuario WHERE id = new.professor_responsavel_id), ''
+            ) WHERE rowid = new.id;
+        END
+    """,
+    'evento_busca_exclusao': """
+        CREATE TRIGGER evento_busca_exclusao AFTER DELETE ON evento BEGIN
+            DELETE FROM evento_busca WHERE rowid = old.id;
+        END
+    """,
+    'evento_busca_professor': """
+        CREATE TRIGGER evento_busca_professor AFTER UPDATE OF first_name, last_name ON usuario BEGIN
+            UPDATE evento_busca SET professor = new.first_name || ' ' || new.last_name
+            WHERE rowid IN (SELECT id FROM evento WHERE professor_responsavel_id = new.id);
+        END
+    """,
+}
+
+# Criados pela migração 0014 no PostgreSQL (ALTER TABLE não os descarta)
+POSTGRES_TRIGGERS = ('evento_busca_sincronizar', 'evento_busca_professor')
+
+
+def remover_triggers(apps, schema_editor):
+    """Remove os triggers do SQLite (assinatura de RunPython)."""
+    if schema_editor.connection.vendor == 'sqlite':
+        for nome in reversed(list(SQLITE_TRIGGERS)):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {nome}")
+
+
+def criar_triggers(apps, schema_editor):
+    """(Re)cria os triggers do SQLite com o SQL atual; a tabela evento_busca e seu conteúdo não mudam."""
+    if schema_editor.connection.vendor == 'sqlite':
+        remover_triggers(apps, schema_editor)
+        for comando in SQLITE_TRIGGERS.values():
+            schema_editor.execute(comando)
+
+
+def triggers_ausentes(conexao=connection):
+    """Triggers do índice que faltam neste banco ([] se o índice não existe nele)."""
+    if conexao.vendor not in ('sqlite', 'postgresql'):
+        return []
+    with conexao.cursor() as cursor:
+        if TABELA not in conexao.introspection.table_names(cursor):
+            return []
+        if conexao.vendor == 'sqlite':
+            esperados = list(SQLITE_TRIGGERS)
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        else:
+            esperados = list(POSTGRES_TRIGGERS)
+            cursor.execute("SELECT tgname FROM pg_trigger WHERE NOT tgisinternal")
+        existentes = {linha[0] for linha in cursor.fetchall()}
+    return [nome for nome in esperados if nome not in existentes]
+
+
+@checks.register(checks.Tags.database)
+def verificar_triggers(app_configs=None, databases=None, **kwargs):
+    erros = []
+    for alias in databases or []:
+        try:
+            ausentes = triggers_ausentes(connections[alias])
+        except DatabaseError:
+            continue  # banco inacessível: o próprio Django acusa
+        if ausentes:
+            erros.append(checks.Error(
+                f"O índice de busca de eventos existe no banco '{alias}', mas faltam os triggers: "
+                f"{', '.join(ausentes)}. Sem eles o índice deixa de acompanhar os eventos.",
+                hint="Alguma migração recriou a tabela evento ou usuario sem recriar os triggers. Corrija-a "
+                     "como a 0016 (com uma cópia do SQL de busca.SQLITE_TRIGGERS) e rode "
+                     "'manage.py migrate --skip-checks', ou recrie-os com busca.criar_triggers().",
+                id='sgea.E001',
+            ))
+    return erros
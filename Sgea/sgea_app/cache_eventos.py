@@ -0,0 +1,44 @@
+# sgea_app/cache_eventos.py
+
+import hashlib
+
+from django.core.cache import cache
+from django.utils import timezone
+
+CHAVE_VERSAO = 'sgea:eventos:versao'
+CHAVE_ALTERACAO = 'sgea:eventos:alterado_em'
+PREFIXO_RESPOSTA = 'sgea:eventos:resposta'
+TEMPO_RESPOSTA = 300  # segundos
+
+
+def versao():
+    """Versão corrente da listagem de eventos (muda a cada save/delete de Evento ou Inscricao)."""
+    atual = cache.get(CHAVE_VERSAO)
+    if atual is None:
+        cache.add(CHAVE_VERSAO, 1, None)
+        atual = cache.get(CHAVE_VERSAO, 1)
+    return atual
+
+
+def ultima_alteracao():
+    """Momento da última invalidação (cobre exclusões, que não aparecem em MAX(data_atualizacao))."""
+    return cache.get(CHAVE_ALTERACAO)
+
+
+def invalidar():
+    """Descarta todas as respostas em cache incrementando a versão."""
+    try:
+        cache.incr(CHAVE_VERSAO)
+    except ValueError:
+        cache.set(CHAVE_VERSAO, 1, None)
+    cache.set(CHAVE_ALTERACAO, timezone.now(), None)
+
+
+def etag(*partes):
+    """ETag forte a partir das partes (filtros da requisição, resumo do queryset, versão)."""
+    bruto = '|'.join(str(parte) for parte in partes)
+    return '"' + hashlib.sha256(bruto.encode('utf-8')).hexdigest()[:32] + '"'
+
+
+def chave_resposta(etag_resposta):
+    return PREFIXO_RESPOSTA + ':' + etag_resposta.strip('"')
@@ -0,0 +1,277 @@
+# sgea_app/certificados.py
+
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from . import auditoria, estatisticas, painel, pdf, validacao
+from .models import Certificado, Inscricao
+
+TAMANHO_LOTE = 1000
+
+# Exportação em ZIP: certificados lidos do banco (e renderizados) por vez, e mínimo de PDFs
+# pendentes em um lote para valer a pena mandá-los ao pool de processos
+TAMANHO_LOTE_ZIP = 200
+MIN_PENDENTES_PARALELO = 8
+
+
+def gerar_codigo():
+    """Código de validação no formato usado desde a primeira versão (16 caracteres hexadecimais)."""
+    return uuid.uuid4().hex[:16].upper()
+
+
+def _codigos_unicos(quantidade):
+    """
+    Gera `quantidade` códigos inéditos: sem repetição dentro do lote e sem
+    colisão com certificados já gravados (verificado em uma única consulta por rodada).
+    """
+    codigos = set()
+    while len(codigos) < quantidade:
+        candidatos = {gerar_codigo() for _ in range(quantidade - len(codigos))} - codigos
+        existentes = set(
+            Certificado.objects.filter(codigo_validacao__in=candidatos).values_list('codigo_validacao', flat=True)
+        )
+        codigos |= candidatos - existentes
+    return list(codigos)
+
+
+def inscricoes_elegiveis(inscricoes=None):
+    """Inscrições com presença confirmada, em eventos encerrados e ainda sem certificado."""
+    if inscricoes is None:
+        inscricoes = Inscricao.objects.all()
+    return inscricoes.filter(
+        presenca=True,
+        certificado__isnull=True,
+        evento__data_fim__lt=timezone.now(),
+    )
+
+
+def emitir_certificados_pendentes(inscricoes=None, tamanho_lote=TAMANHO_LOTE):
+    """
+    Emite em lote os certificados de todas as inscrições elegíveis (opcionalmente
+    restritas ao queryset `inscricoes`). Retorna a quantidade emitida.
+
+    Cada lote é: uma consulta para achar as inscrições, uma para checar colisões
+    de código e um bulk_create. ignore_conflicts torna seguro rodar dois emissores
+    ao mesmo tempo; o que for ignorado é recontado e fica para a próxima execução.
+    """
+    emitidos = 0
+    ultimo_pk = 0
+    while True:
+        ids = list(
+            inscricoes_elegiveis(inscricoes)
+            .filter(pk__gt=ultimo_pk)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:tamanho_lote]
+        )
+        if not ids:
+            break
+        ultimo_pk = ids[-1]
+
+        codigos = _codigos_unicos(len(ids))
+        with transaction.atomic():
+            Certificado.objects.bulk_create(
+                [Certificado(inscricao_id=pk, codigo_validacao=codigo) for pk, codigo in zip(ids, codigos)],
+                ignore_conflicts=True,
+            )
+            # Só os códigos deste lote: o que outro emissor gravou antes (conflito ignorado) não conta
+            por_evento = dict(
+                Certificado.objects.filter(codigo_validacao__in=codigos)
+                .values('inscricao__evento_id').annotate(total=Count('pk'))
+                .values_list('inscricao__evento_id', 'total')
+            )
+            emitidos += sum(por_evento.values())
+            # bulk_create não dispara post_save: avisa as estatísticas, o índice de validação e o painel diretamente
+            for evento_id, total in por_evento.items():
+                estatisticas.atualizar(evento_id, certificados=total)
+            transaction.on_commit(partial(validacao.obter_indice().adicionar, codigos))
+            usuarios_ids = set(Inscricao.objects.filter(pk__in=ids).values_list('usuario_id', flat=True))
+            transaction.on_commit(partial(painel.invalidar_usuarios, usuarios_ids))
+
+    if emitidos:
+        auditoria.registrar(None, 'certificado_geracao', f"{emitidos} certificado(s) emitidos em lote.")
+    return emitidos
+
+
+# --- PDF: cache em disco endereçado por conteúdo ---
+
+def dados_certificado(certificado):
+    """Dados simples (serializáveis) usados na renderização. Espera inscricao/evento/usuários carregados."""
+    inscricao = certificado.inscricao
+    evento = inscricao.evento
+    participante = inscricao.usuario
+
+    def nome(usuario):
+        if usuario is None:
+            return ""
+        return f"{usuario.first_name} {usuario.last_name}".strip() or usuario.username
+
+    return {
+        'codigo': certificado.codigo_validacao,
+        'participante': nome(participante),
+        'evento': evento.nome,
+        'local': evento.local,
+        'data_inicio': timezone.localtime(evento.data_inicio).strftime('%d/%m/%Y'),
+        'data_fim': timezone.localtime(evento.data_fim).strftime('%d/%m/%Y'),
+        'organizador': nome(evento.organizador),
+        'professor': nome(evento.professor_responsavel),
+        'data_emissao': timezone.localtime(certificado.data_emissao).strftime('%d/%m/%Y'),
+    }
+
+
+def assinatura_pdf(dados):
+    """Hash do conteúdo do certificado: muda sempre que algum dado impresso (ou o layout) muda."""
+    bruto = json.dumps([pdf.VERSAO_LAYOUT, dados], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(bruto.encode('utf-8')).hexdigest()
+
+
+def caminho_pdf(dados):
+    """<CERTIFICADOS_DIR_CACHE>/<codigo>/<hash>.pdf — versões antigas ficam órfãs e podem ser apagadas."""
+    return os.path.join(settings.CERTIFICADOS_DIR_CACHE, dados['codigo'], f"{assinatura_pdf(dados)}.pdf")
+
+
+def certificados_com_dados(queryset=None):
+    if queryset is None:
+        queryset = Certificado.objects.all()
+    return queryset.select_related(
+        'inscricao__usuario',
+        'inscricao__evento__organizador',
+        'inscricao__evento__professor_responsavel',
+    )
+
+
+def obter_pdf(certificado):
+    """Retorna (caminho, hash) do PDF, renderizando apenas se ainda não estiver em cache."""
+    dados = dados_certificado(certificado)
+    caminho = caminho_pdf(dados)
+    pdf.renderizar_para_arquivo(dados, caminho)
+    return caminho, assinatura_pdf(dados)
+
+
+# --- Exportação em ZIP (streaming) ---
+
+class SaidaZip:
+    """Destino de escrita do zipfile que acumula apenas o trecho ainda não enviado ao cliente."""
+
+    def __init__(self):
+        self._partes = []
+        self._posicao = 0
+
+    def write(self, dados):
+        self._partes.append(bytes(dados))
+        self._posicao += len(dados)
+        return len(dados)
+
+    def tell(self):
+        return self._posicao
+
+    def flush(self):
+        pass
+
+    def esvaziar(self):
+        pedaco = b''.join(self._partes)
+        self._partes = []
+        return pedaco
+
+
+# Um pool por processo do servidor, criado no primeiro ZIP que precisar dele e reaproveitado
+# pelos seguintes (subir processos 'spawn' a cada download custaria mais que renderizar)
+_pool = None
+_pool_processos = None
+_trava_pool = threading.Lock()
+
+
+def _pool_renderizacao(processos):
+    global _pool, _pool_processos
+    with _trava_pool:
+        if _pool is None or _pool_processos != processos:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context('spawn'))
+            _pool_processos = processos
+        return _pool
+
+
+def _descartar_pool(pool):
+    """Esquece um pool quebrado (ex: processo morto) para que o próximo ZIP crie outro."""
+    global _pool
+    with _trava_pool:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _caminhos_renderizados(lista_dados, processos):
+    """
+    Renderiza só o que falta no cache, preservando a ordem da lista: no pool compartilhado
+    quando há PDFs pendentes suficientes, senão no próprio processo.
+    """
+    caminhos = [caminho_pdf(dados) for dados in lista_dados]
+    pendentes = [(dados, caminho) for dados, caminho in zip(lista_dados, caminhos) if not os.path.exists(caminho)]
+
+    if processos > 1 and len(pendentes) >= MIN_PENDENTES_PARALELO:
+        pool = _pool_renderizacao(processos)
+        futuros = {}
+        try:
+            for dados, caminho in pendentes:
+                futuros[caminho] = pool.submit(pdf.renderizar_para_arquivo, dados, caminho)
+            for caminho in caminhos:
+                if caminho in futuros:
+                    futuros[caminho].result()
+                yield caminho
+        except BrokenProcessPool:
+            _descartar_pool(pool)
+            raise
+        finally:
+            # Download interrompido: o que ainda não começou não precisa ser renderizado
+            for futuro in futuros.values():
+                futuro.cancel()
+    else:
+        for dados, caminho in pendentes:
+            pdf.renderizar_para_arquivo(dados, caminho)
+        yield from caminhos
+
+
+def _lotes(certificados, tamanho):
+    """Percorre o queryset com .iterator() (sem carregar todos de uma vez), em listas de `tamanho`."""
+    itens = certificados.iterator(chunk_size=tamanho) if hasattr(certificados, 'iterator') else iter(certificados)
+    while lote := list(islice(itens, tamanho)):
+        yield lote
+
+
+def zip_certificados(certificados, processos=None, tamanho_bloco=64 * 1024):
+    """
+    Gera (em pedaços de bytes) um ZIP com o PDF de cada certificado, para uso em
+    StreamingHttpResponse. Os certificados são lidos e renderizados em lotes de
+    TAMANHO_LOTE_ZIP e cada PDF é copiado do cache em blocos, então a memória usada
+    não depende da quantidade de certificados nem do tamanho do arquivo final.
+    """
+    if processos is None:
+        processos = getattr(settings, 'CERTIFICADOS_PROCESSOS', None) or os.cpu_count() or 1
+
+    saida = SaidaZip()
+    # ZIP_STORED: o PDF já é compactado; recompactar só gastaria CPU
+    with zipfile.ZipFile(saida, 'w', compression=zipfile.ZIP_STORED) as arquivo_zip:
+        for lote in _lotes(certificados, TAMANHO_LOTE_ZIP):
+            lista_dados = [dados_certificado(certificado) for certificado in lote]
+            for dados, caminho in zip(lista_dados, _caminhos_renderizados(lista_dados, processos)):
+                nome = f"{dados['participante'] or dados['codigo']} - {dados['codigo']}.pdf".replace('/', '-')
+                with open(caminho, 'rb') as origem, arquivo_zip.open(nome, 'w', force_zip64=True) as destino:
+                    while bloco := origem.read(tamanho_bloco):
+                        destino.write(bloco)
+                        yield saida.esvaziar()
+                yield saida.esvaziar()
+    yield saida.esvaziar()
@@ -0,0 +1,192 @@
+# sgea_app/checkin.py
+"""
+Check-in na porta do evento por QR code.
+
+Cada inscrição tem um ingresso assinado (HMAC da SECRET_KEY sobre inscricao_id e evento_id), exibido
+como QR code no painel do participante. O quiosque do evento (aberto por um link assinado gerado
+pelo organizador, sem login) lê os ingressos; cada leitura é verificada só pela assinatura, sem
+consulta ao banco, e repetições são descartadas em memória. As presenças são gravadas em lote por
+uma thread, com um UPDATE por evento a cada CHECKIN_INTERVALO_GRAVACAO segundos.
+"""
+
+import atexit
+import logging
+import os
+import threading
+from collections import OrderedDict, defaultdict
+from functools import partial
+
+from django.conf import settings
+from django.core import signing
+from django.db import connection, transaction
+
+from . import auditoria, cache_eventos, estatisticas, painel
+from .models import Inscricao
+
+logger = logging.getLogger(__name__)
+
+SALT_INGRESSO = 'sgea.checkin.ingresso'
+SALT_QUIOSQUE = 'sgea.checkin.quiosque'
+
+# Situações devolvidas por leitura
+PRESENTE = 'presente'
+REPETIDO = 'repetido'
+OUTRO_EVENTO = 'outro_evento'
+INVALIDO = 'invalido'
+
+# Eventos lembrados pela deduplicação em memória (os mais antigos são esquecidos primeiro)
+MAX_EVENTOS_MEMORIA = 1000
+
+
+# --- Ingressos e links de quiosque ---
+
+def gerar_ingresso(inscricao_id, evento_id):
+    return signing.Signer(salt=SALT_INGRESSO).sign(f"{inscricao_id}.{evento_id}")
+
+
+def ler_ingresso(token):
+    """(inscricao_id, evento_id) de um ingresso íntegro, ou None."""
+    try:
+        valor = signing.Signer(salt=SALT_INGRESSO).unsign(str(token).strip())
+        inscricao_id, evento_id = valor.split('.')
+        return int(inscricao_id), int(evento_id)
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+def gerar_chave_quiosque(evento_id):
+    return signing.TimestampSigner(salt=SALT_QUIOSQUE).sign(str(evento_id))
+
+
+def ler_chave_quiosque(chave):
+    """evento_id de um link de quiosque íntegro e dentro da validade, ou None."""
+    try:
+        valor = signing.TimestampSigner(salt=SALT_QUIOSQUE).unsign(
+            chave, max_age=getattr(settings, 'CHECKIN_VALIDADE_QUIOSQUE', 172800)
+        )
+        return int(valor)
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+# --- Registro das presenças ---
+
+class RegistroPresencas:
+    """
+    Deduplicação em memória + gravação periódica das presenças lidas no quiosque.
+    Em modo 'sincrono' (testes) grava a cada chamada de registrar().
+    """
+
+    def __init__(self, intervalo=2.0, sincrono=False):
+        self.intervalo = intervalo
+        self.sincrono = sincrono
+        self._trava = threading.Lock()
+        self._iniciar_estado()
+        atexit.register(self.encerrar)
+
+    def _iniciar_estado(self):
+        self._vistos = OrderedDict()        # evento_id -> {inscricao_id}
+        self._pendentes = defaultdict(set)  # evento_id -> {inscricao_id}
+        self._parar = threading.Event()
+        self._thread = None
+        self._pid = os.getpid()
+
+    def _garantir_thread(self):
+        # Após um fork, o estado e a thread do processo pai não valem no filho
+        if self._pid != os.getpid():
+            self._iniciar_estado()
+        if self._thread is None or not self._thread.is_alive():
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._executar, name='checkin', daemon=True)
+            self._thread.start()
+
+    def registrar(self, evento_id, tokens):
+        """Situação de cada ingresso lido no quiosque do evento (na ordem recebida)."""
+        situacoes = []
+        with self._trava:
+            if not self.sincrono:
+                self._garantir_thread()
+            vistos = self._vistos.setdefault(evento_id, set())
+            self._vistos.move_to_end(evento_id)
+            while len(self._vistos) > MAX_EVENTOS_MEMORIA:
+                self._vistos.popitem(last=False)
+
+            for token in tokens:
+                lido = ler_ingresso(token)
+                if lido is None:
+                    situacoes.append(INVALIDO)
+                elif lido[1] != evento_id:
+                    situacoes.append(OUTRO_EVENTO)
+                elif lido[0] in vistos:
+                    situacoes.append(REPETIDO)
+                else:
+                    vistos.add(lido[0])
+                    self._pendentes[evento_id].add(lido[0])
+                    situacoes.append(PRESENTE)
+
+        if self.sincrono:
+            self.flush()
+        return situacoes
+
+    def _executar(self):
+        try:
+            while not self._parar.wait(self.intervalo):
+                self.flush()
+            self.flush()
+        finally:
+            connection.close()
+
+    def flush(self):
+        """
+        Grava as presenças pendentes: um UPDATE por evento (inscrições canceladas são ignoradas).
+        update() não dispara os sinais de Inscricao: estatísticas e caches são atualizados aqui.
+        """
+        with self._trava:
+            pendentes, self._pendentes = self._pendentes, defaultdict(set)
+        for evento_id, ids in pendentes.items():
+            try:
+                with transaction.atomic():
+                    marcadas = dict(
+                        Inscricao.objects.select_for_update()
+                        .filter(evento_id=evento_id, pk__in=ids, presenca=False).values_list('pk', 'usuario_id')
+                    )
+                    gravadas = Inscricao.objects.filter(pk__in=marcadas).update(presenca=True)
+                    estatisticas.atualizar(evento_id, presentes=gravadas)
+                    if gravadas:
+                        transaction.on_commit(cache_eventos.invalidar)
+                        transaction.on_commit(partial(painel.invalidar_usuarios, marcadas.values()))
+            except Exception:
+                # Devolve o lote para a próxima tentativa
+                logger.exception("Falha ao gravar %d presenças do evento %s.", len(ids), evento_id)
+                with self._trava:
+                    self._pendentes[evento_id].update(ids)
+                continue
+            finally:
+                # Só na thread de gravação: no modo síncrono a conexão é a da requisição (e pode
+                # estar dentro de uma transação, que close_if_unusable_or_obsolete() fecharia)
+                if threading.current_thread() is self._thread:
+                    connection.close_if_unusable_or_obsolete()
+            if gravadas:
+                auditoria.registrar(None, 'presenca', f"Check-in por QR code: {gravadas} presença(s) no evento ID {evento_id}")
+
+    def encerrar(self, timeout=5.0):
+        self._parar.set()
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            self._thread.join(timeout)
+        self.flush()
+
+
+_registro = None
+_registro_trava = threading.Lock()
+
+
+def obter_registro():
+    global _registro
+    if _registro is None:
+        with _registro_trava:
+            if _registro is None:
+                _registro = RegistroPresencas(
+                    intervalo=getattr(settings, 'CHECKIN_INTERVALO_GRAVACAO', 2.0),
+                    sincrono=getattr(settings, 'CHECKIN_MODO', 'assincrono') == 'sincrono',
+                )
+    return _registro
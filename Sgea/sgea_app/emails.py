@@ -0,0 +1,130 @@
+# sgea_app/emails.py
+"""
+Caixa de saída de e-mails (outbox transacional).
+
+As views apenas gravam um EmailPendente dentro da própria transação, sem falar com o servidor
+SMTP. O worker (manage.py enviar_emails) reserva lotes de pendentes, envia todos reutilizando
+uma única conexão SMTP e reagenda as falhas com espera exponencial.
+"""
+
+import logging
+import smtplib
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F
+from django.utils import timezone
+
+from .models import EmailPendente
+
+logger = logging.getLogger(__name__)
+
+
+def _config(nome, padrao):
+    return getattr(settings, nome, padrao)
+
+
+def enfileirar(assunto, corpo, destinatarios, html=True):
+    """Grava um e-mail por destinatário na caixa de saída (use dentro da transação da ação)."""
+    if isinstance(destinatarios, str):
+        destinatarios = [destinatarios]
+    return EmailPendente.objects.bulk_create([
+        EmailPendente(destinatario=destinatario, assunto=assunto, corpo=corpo, html=html)
+        for destinatario in destinatarios
+    ])
+
+
+def espera_para(tentativas):
+    """Espera exponencial antes da próxima tentativa: base, 2x base, 4x base... até o máximo."""
+    base = _config('EMAILS_ESPERA_BASE', 60)
+    return timedelta(seconds=min(base * 2 ** max(tentativas - 1, 0), _config('EMAILS_ESPERA_MAXIMA', 3600)))
+
+
+def reservar_lote(tamanho_lote=None):
+    """
+    Reserva pendentes vencidos para este worker e os retorna. A reserva empurra proxima_tentativa
+    para frente: se o worker morrer no meio do envio, os e-mails voltam à fila sozinhos.
+    """
+    tamanho_lote = tamanho_lote or _config('EMAILS_TAMANHO_LOTE', 100)
+    agora = timezone.now()
+    vencidos = EmailPendente.objects.filter(situacao='pendente', proxima_tentativa__lte=agora)
+    ids = list(vencidos.order_by('proxima_tentativa', 'id').values_list('pk', flat=True)[:tamanho_lote])
+    if not ids:
+        return []
+
+    token = uuid.uuid4().hex
+    # O filtro repetido garante que dois workers nunca fiquem com o mesmo e-mail
+    vencidos.filter(pk__in=ids).update(
+        reservado_por=token,
+        proxima_tentativa=agora + timedelta(seconds=_config('EMAILS_TEMPO_RESERVA', 300)),
+    )
+    return list(EmailPendente.objects.filter(reservado_por=token, situacao='pendente').order_by('id'))
+
+
+def _registrar_falha(pendente, erro):
+    tentativas = pendente.tentativas + 1
+    desistir = tentativas >= _config('EMAILS_MAX_TENTATIVAS', 5)
+    EmailPendente.objects.filter(pk=pendente.pk).update(
+        tentativas=tentativas,
+        situacao='falhou' if desistir else 'pendente',
+        proxima_tentativa=timezone.now() + espera_para(tentativas),
+        reservado_por='',
+        ultimo_erro=str(erro)[:1000],
+    )
+    if desistir:
+        logger.error("E-mail %s para %s descartado após %s tentativas: %s",
+                     pendente.pk, pendente.destinatario, tentativas, erro)
+
+
+def enviar_pendentes(tamanho_lote=None, conexao=None):
+    """
+    Envia um lote da caixa de saída pela mesma conexão SMTP. Retorna (enviados, falhas).
+
+    Falhas de um destinatário só reagendam aquele e-mail; se a conexão cair, ela é reaberta
+    para o restante do lote.
+    """
+    lote = reservar_lote(tamanho_lote)
+    if not lote:
+        return 0, 0
+
+    conexao = conexao or get_connection(fail_silently=False)
+    enviados, processados = [], set()
+    try:
+        conexao.open()
+        for pendente in lote:
+            mensagem = EmailMessage(pendente.assunto, pendente.corpo, to=[pendente.destinatario], connection=conexao)
+            if pendente.html:
+                mensagem.content_subtype = "html"
+            reconectar = False
+            try:
+                mensagem.send(fail_silently=False)
+                enviados.append(pendente.pk)
+            except smtplib.SMTPServerDisconnected as erro:
+                _registrar_falha(pendente, erro)
+                reconectar = True
+            except smtplib.SMTPException as erro:
+                # Recusa do servidor para este e-mail: a conexão continua válida
+                _registrar_falha(pendente, erro)
+            except OSError as erro:
+                _registrar_falha(pendente, erro)
+                reconectar = True
+            processados.add(pendente.pk)
+            if reconectar:
+                conexao.close()
+                conexao.open()
+    except Exception as erro:
+        # Servidor indisponível (ou a conexão não pôde ser reaberta): o restante volta para a fila com espera
+        logger.warning("Falha na conexão SMTP durante o envio do lote: %s", erro)
+        for pendente in lote:
+            if pendente.pk not in processados:
+                _registrar_falha(pendente, erro)
+    finally:
+        conexao.close()
+        if enviados:
+            EmailPendente.objects.filter(pk__in=enviados).update(
+                situacao='enviado', data_envio=timezone.now(), reservado_por='',
+                tentativas=F('tentativas') + 1, ultimo_erro='',
+            )
+    return len(enviados), len(lote) - len(enviados)
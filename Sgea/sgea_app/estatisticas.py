@@ -0,0 +1,160 @@
+# sgea_app/estatisticas.py
+"""
+Estatísticas por evento: inscritos, presentes, taxa de presença, certificados emitidos e inscrições
+por dia, guardadas em EstatisticaEvento e EstatisticaDia para que os painéis leiam uma linha por
+evento em vez de agregar inscrições e certificados a cada acesso.
+
+As linhas são atualizadas com UPDATEs incrementais na mesma transação que altera os dados:
+- save/delete de Inscricao e Certificado pelo ORM: sinais (sgea_app.signals);
+- operações em lote, que não disparam sinais (bulk_create, bulk_update, update): chamadas diretas
+  em inscricoes, certificados e checkin.
+Os totais do organizador são a soma das linhas dos seus eventos. O que escapar disso (SQL direto,
+fixtures) é corrigido por reconstruir() / python manage.py recalcular_estatisticas.
+"""
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from .models import Certificado, EstatisticaDia, EstatisticaEvento, Evento, Inscricao
+
+
+def dia_local(momento):
+    """Dia (no fuso do projeto) em que uma inscrição foi feita."""
+    return timezone.localdate(momento, timezone.get_default_timezone())
+
+
+def _somar(campo, delta):
+    # Greatest: um contador já divergente nunca fica negativo (a coluna é PositiveIntegerField)
+    return Greatest(F(campo) + delta, Value(0))
+
+
+# --- Atualização incremental ---
+
+def criar(eventos_ids):
+    """Linhas zeradas para eventos novos (as já existentes são mantidas)."""
+    EstatisticaEvento.objects.bulk_create(
+        [EstatisticaEvento(evento_id=pk) for pk in eventos_ids], ignore_conflicts=True
+    )
+
+
+def atualizar(evento_id, inscritos=0, presentes=0, certificados=0, dia=None):
+    """
+    Soma as variações aos totais do evento. `dia` é o dia das inscrições a que `inscritos` se
+    refere (EstatisticaDia). Sem linha para o evento, ela é reconstruída a partir das tabelas
+    (que, dentro da transação, já incluem a alteração).
+    """
+    deltas = {campo: delta for campo, delta in
+              (('inscritos', inscritos), ('presentes', presentes), ('certificados', certificados)) if delta}
+    if not deltas:
+        return
+
+    alterados = EstatisticaEvento.objects.filter(evento_id=evento_id).update(
+        **{campo: _somar(campo, delta) for campo, delta in deltas.items()}
+    )
+    if not alterados:
+        if any(delta > 0 for delta in deltas.values()):
+            reconstruir(Evento.objects.filter(pk=evento_id))
+        return
+
+    if inscritos and dia is not None:
+        dias = EstatisticaDia.objects.filter(evento_id=evento_id, dia=dia)
+        if not dias.update(inscricoes=_somar('inscricoes', inscritos)) and inscritos > 0:
+            EstatisticaDia.objects.bulk_create(
+                [EstatisticaDia(evento_id=evento_id, dia=dia, inscricoes=0)], ignore_conflicts=True
+            )
+            dias.update(inscricoes=_somar('inscricoes', inscritos))
+
+
+# --- Reconstrução ---
+
+def reconstruir(eventos=None):
+    """
+    Recalcula do zero, em uma transação, as linhas dos eventos (todos, por padrão) com três
+    consultas agregadas. Retorna a quantidade de eventos recalculados.
+    """
+    if eventos is None:
+        eventos = Evento.objects.all()
+    filtro = eventos.values('pk')
+
+    with transaction.atomic():
+        ids = list(eventos.values_list('pk', flat=True))
+        inscricoes = Inscricao.objects.filter(evento__in=filtro)
+        totais = {
+            linha['evento_id']: linha for linha in
+            inscricoes.values('evento_id').annotate(inscritos=Count('pk'), presentes=Count('pk', filter=Q(presenca=True)))
+        }
+        certificados = dict(
+            Certificado.objects.filter(inscricao__evento__in=filtro)
+            .values('inscricao__evento_id').annotate(total=Count('pk')).values_list('inscricao__evento_id', 'total')
+        )
+        por_dia = list(
+            inscricoes.annotate(dia=TruncDate('data_inscricao', tzinfo=timezone.get_default_timezone()))
+            .values('evento_id', 'dia').annotate(total=Count('pk')).values_list('evento_id', 'dia', 'total')
+        )
+
+        EstatisticaEvento.objects.filter(evento__in=filtro).delete()
+        EstatisticaDia.objects.filter(evento__in=filtro).delete()
+        EstatisticaEvento.objects.bulk_create([
+            EstatisticaEvento(
+                evento_id=pk,
+                inscritos=totais.get(pk, {}).get('inscritos', 0),
+                presentes=totais.get(pk, {}).get('presentes', 0),
+                certificados=certificados.get(pk, 0),
+            )
+            for pk in ids
+        ], batch_size=1000)
+        EstatisticaDia.objects.bulk_create(
+            [EstatisticaDia(evento_id=pk, dia=dia, inscricoes=total) for pk, dia, total in por_dia],
+            batch_size=1000,
+        )
+    return len(ids)
+
+
+# --- Leitura ---
+
+def _taxa(presentes, inscritos):
+    return round(100 * presentes / inscritos, 1) if inscritos else None
+
+
+def do_evento(evento):
+    """Totais do evento e a série de inscrições por dia (duas consultas de chave primária/índice)."""
+    estatistica = EstatisticaEvento.objects.filter(evento=evento).first() or EstatisticaEvento(evento=evento)
+    return {
+        'evento': evento.pk,
+        'nome': evento.nome,
+        'inscritos': estatistica.inscritos,
+        'presentes': estatistica.presentes,
+        'taxa_presenca': estatistica.taxa_presenca,
+        'certificados': estatistica.certificados,
+        'inscricoes_por_dia': [
+            {'dia': dia, 'inscricoes': total}
+            for dia, total in EstatisticaDia.objects.filter(evento=evento, inscricoes__gt=0)
+            .order_by('dia').values_list('dia', 'inscricoes')
+        ],
+    }
+
+
+def do_organizador(organizador):
+    """Totais somados dos eventos do organizador (uma consulta)."""
+    totais = EstatisticaEvento.objects.filter(evento__organizador=organizador).aggregate(
+        inscritos=Sum('inscritos'), presentes=Sum('presentes'), certificados=Sum('certificados'),
+    )
+    totais = {campo: valor or 0 for campo, valor in totais.items()}
+    totais['taxa_presenca'] = _taxa(totais['presentes'], totais['inscritos'])
+    return totais
+
+
+def eventos_do_organizador(organizador):
+    """Uma linha de totais por evento do organizador, do mais recente ao mais antigo (uma consulta)."""
+    linhas = (
+        EstatisticaEvento.objects.filter(evento__organizador=organizador)
+        .order_by('-evento__data_inicio', 'evento_id')
+        .values_list('evento_id', 'evento__nome', 'inscritos', 'presentes', 'certificados')
+    )
+    return [
+        {'evento': pk, 'nome': nome, 'inscritos': inscritos, 'presentes': presentes,
+         'taxa_presenca': _taxa(presentes, inscritos), 'certificados': certificados}
+        for pk, nome, inscritos, presentes, certificados in linhas
+    ]
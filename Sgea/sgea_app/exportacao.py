@@ -0,0 +1,185 @@
+# sgea_app/exportacao.py
+"""
+Exportação da lista de participantes de um evento em CSV ou XLSX, gerada em fluxo para uso em
+StreamingHttpResponse.
+
+As inscrições são lidas com values_list(...).iterator(chunk_size=...): só um bloco de linhas fica
+em memória, sem instanciar models. O cabeçalho é enviado antes da consulta, então o primeiro byte
+sai imediatamente. O XLSX (um ZIP de XMLs) é escrito com zipfile sobre a mesma saída incremental
+da exportação de certificados (certificados.SaidaZip), com a planilha gravada linha a linha.
+"""
+
+import csv
+import re
+import zipfile
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from django.utils import timezone
+
+from .certificados import SaidaZip
+from .models import Inscricao, Usuario
+
+TAMANHO_BLOCO = 2000  # linhas lidas do banco por vez
+LINHAS_POR_ENVIO = 500  # linhas acumuladas antes de entregar um pedaço ao cliente
+
+COLUNAS = (
+    'Nome', 'Usuário', 'E-mail', 'Telefone', 'Instituição', 'Perfil',
+    'Data de Inscrição', 'Presença', 'Código do Certificado',
+)
+PERFIS = dict(Usuario.PERFIL_CHOICES)
+
+
+# --- Linhas ---
+
+def linhas_participantes(evento, tamanho_bloco=TAMANHO_BLOCO):
+    """Uma tupla por inscrição do evento, na ordem de COLUNAS (data como datetime local)."""
+    consulta = (
+        Inscricao.objects.filter(evento=evento)
+        .order_by('usuario__first_name', 'usuario__last_name', 'pk')
+        .values_list(
+            'usuario__first_name', 'usuario__last_name', 'usuario__username', 'usuario__email',
+            'usuario__telefone', 'usuario__instituicao_ensino', 'usuario__perfil',
+            'data_inscricao', 'presenca', 'certificado__codigo_validacao',
+        )
+    )
+    for nome, sobrenome, username, email, telefone, instituicao, perfil, data, presenca, codigo in (
+        consulta.iterator(chunk_size=tamanho_bloco)
+    ):
+        yield (
+            f"{nome} {sobrenome}".strip(), username, email, telefone or '', instituicao or '',
+            PERFIS.get(perfil, perfil), timezone.localtime(data), 'Sim' if presenca else 'Não', codigo or '',
+        )
+
+
+# --- CSV ---
+
+class _Eco:
+    """Arquivo cujo write() só devolve o texto: o csv.writer formata e o gerador entrega."""
+
+    def write(self, valor):
+        return valor
+
+
+def _celula_csv(valor):
+    if isinstance(valor, datetime):
+        return valor.strftime('%d/%m/%Y %H:%M')
+    # Evita que planilhas interpretem nomes como "=..." como fórmula
+    if isinstance(valor, str) and valor[:1] in ('=', '+', '-', '@'):
+        return "'" + valor
+    return valor
+
+
+def csv_participantes(linhas):
+    """Gera o CSV (UTF-8 com BOM, separado por ';' como o Excel em português espera) em pedaços de texto."""
+    escritor = csv.writer(_Eco(), delimiter=';')
+    yield '\ufeff' + escritor.writerow(COLUNAS)
+    pedaco = []
+    for linha in linhas:
+        pedaco.append(escritor.writerow([_celula_csv(valor) for valor in linha]))
+        if len(pedaco) >= LINHAS_POR_ENVIO:
+            yield ''.join(pedaco)
+            pedaco = []
+    if pedaco:
+        yield ''.join(pedaco)
+
+
+# --- XLSX ---
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Participantes" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+# Estilos: 0 = padrão, 1 = cabeçalho em negrito, 2 = data e hora (formato embutido 22)
+_ESTILOS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '<xf numFmtId="22" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+    '</styleSheet>'
+)
+_INICIO_PLANILHA = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetViews><sheetView workbookViewId="0">'
+    '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+    '</sheetView></sheetViews>'
+    '<sheetData>'
+)
+_FIM_PLANILHA = '</sheetData></worksheet>'
+
+# Caracteres de controle não são permitidos em XML
+_INVALIDOS_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+_EPOCA_EXCEL = datetime(1899, 12, 30)
+
+
+def _celula_xlsx(valor, estilo=0):
+    if isinstance(valor, datetime):
+        dias = (valor.replace(tzinfo=None) - _EPOCA_EXCEL).total_seconds() / 86400
+        return f'<c s="2"><v>{dias:.6f}</v></c>'
+    texto = escape(_INVALIDOS_XML.sub('', str(valor)))
+    atributo_estilo = f' s="{estilo}"' if estilo else ''
+    return f'<c t="inlineStr"{atributo_estilo}><is><t xml:space="preserve">{texto}</t></is></c>'
+
+
+def _linha_xlsx(valores, estilo=0):
+    return '<row>' + ''.join(_celula_xlsx(valor, estilo) for valor in valores) + '</row>'
+
+
+def xlsx_participantes(linhas):
+    """
+    Gera o XLSX em pedaços de bytes. As partes fixas vão primeiro; a planilha é comprimida e
+    enviada a cada LINHAS_POR_ENVIO linhas, então a memória usada não depende do total de linhas.
+    """
+    saida = SaidaZip()
+    with zipfile.ZipFile(saida, 'w', compression=zipfile.ZIP_DEFLATED) as arquivo_zip:
+        arquivo_zip.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        arquivo_zip.writestr('_rels/.rels', _RELS)
+        arquivo_zip.writestr('xl/workbook.xml', _WORKBOOK)
+        arquivo_zip.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+        arquivo_zip.writestr('xl/styles.xml', _ESTILOS)
+        with arquivo_zip.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as planilha:
+            planilha.write((_INICIO_PLANILHA + _linha_xlsx(COLUNAS, estilo=1)).encode('utf-8'))
+            yield saida.esvaziar()
+            pedaco = []
+            for linha in linhas:
+                pedaco.append(_linha_xlsx(linha))
+                if len(pedaco) >= LINHAS_POR_ENVIO:
+                    planilha.write(''.join(pedaco).encode('utf-8'))
+                    pedaco = []
+                    yield saida.esvaziar()
+            planilha.write((''.join(pedaco) + _FIM_PLANILHA).encode('utf-8'))
+        yield saida.esvaziar()
+    yield saida.esvaziar()
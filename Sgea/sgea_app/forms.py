@@ -36,7 +36,8 @@ class UsuarioCreationForm(UserCreationForm):
     def clean_email(self):
         # Validação para garantir que o email seja único no sistema
         email = self.cleaned_data.get('email')
-        if email and Usuario.objects.filter(email=email).exists():
+        # Sem diferenciar maiúsculas: o login por e-mail também não diferencia
+        if email and Usuario.objects.com_email(email).exists():
             raise forms.ValidationError("Este endereço de email já está em uso por outro usuário.")
         return email
 
@@ -0,0 +1,121 @@
+# sgea_app/identidade.py
+"""
+Cache das identidades autenticadas.
+
+Guarda os dados do Usuario por um tempo limitado, evitando a consulta ao banco em cada requisição
+autenticada: tanto na sessão (EmailOrUsernameModelBackend.get_user) quanto no token da API
+(TokenAuthenticationEmCache). As entradas são removidas por sinais quando o usuário é salvo ou
+excluído (troca de senha, desativação, edição de perfil), no logout e quando o token é excluído.
+
+Só é usado com um cache compartilhado entre os processos (settings.CACHE_ARMAZENAMENTO='redis'):
+com o LocMemCache a remoção valeria apenas para o próprio processo, e uma senha trocada ou uma
+conta desativada em outro worker continuaria aceita por até IDENTIDADE_CACHE_TTL segundos. Nesse
+caso toda busca vai ao banco.
+
+O hash da senha não vai para o cache. No lugar dele é guardado o hash de sessão derivado dele
+(Usuario.get_session_auth_hash), que é o que a sessão compara; o Usuario montado a partir do
+cache tem a senha adiada (deferred), lida do banco só se for acessada, e save() não a sobrescreve.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+PREFIXO_USUARIO = 'sgea:identidade:usuario:'
+PREFIXO_TOKEN = 'sgea:identidade:token:'
+
+
+def _ttl():
+    return getattr(settings, 'IDENTIDADE_CACHE_TTL', 300)
+
+
+def em_cache():
+    """True se o cache padrão é compartilhado entre os processos (invalidação vista por todos)."""
+    return bool(_ttl()) and not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def _chave_token(chave):
+    # O token em si não vai para o cache (nem para as chaves de um cache compartilhado)
+    return PREFIXO_TOKEN + hashlib.sha256(chave.encode('utf-8')).hexdigest()
+
+
+# --- Cópia sem a senha ---
+
+def _para_cache(usuario):
+    dados = {
+        campo.attname: getattr(usuario, campo.attname)
+        for campo in usuario._meta.concrete_fields if campo.attname != 'password'
+    }
+    dados['hash_sessao'] = usuario.get_session_auth_hash()
+    return dados
+
+
+def _do_cache(dados):
+    dados = dict(dados)
+    hash_sessao = dados.pop('hash_sessao')
+    usuario = get_user_model().from_db(DEFAULT_DB_ALIAS, list(dados), list(dados.values()))
+    usuario.hash_sessao = hash_sessao
+    return usuario
+
+
+# --- Consultas ---
+
+def obter_usuario(user_id):
+    """Usuario pelo id, do cache ou do banco (None se não existir)."""
+    if not em_cache():
+        return get_user_model()._default_manager.filter(pk=user_id).first()
+    dados = cache.get(f"{PREFIXO_USUARIO}{user_id}")
+    if dados is not None:
+        return _do_cache(dados)
+    usuario = get_user_model()._default_manager.filter(pk=user_id).first()
+    if usuario is not None:
+        cache.set(f"{PREFIXO_USUARIO}{user_id}", _para_cache(usuario), _ttl())
+    return usuario
+
+
+def obter_usuario_do_token(chave):
+    """Usuario dono do token, do cache ou do banco (None se o token não existir)."""
+    if em_cache():
+        user_id = cache.get(_chave_token(chave))
+        if user_id is not None:
+            usuario = obter_usuario(user_id)
+            if usuario is not None:
+                return usuario
+
+    token = Token.objects.select_related('user').filter(key=chave).first()
+    if token is None:
+        return None
+    if em_cache():
+        cache.set(_chave_token(chave), token.user_id, _ttl())
+        cache.set(f"{PREFIXO_USUARIO}{token.user_id}", _para_cache(token.user), _ttl())
+    return token.user
+
+
+def invalidar_usuario(user_id):
+    cache.delete(f"{PREFIXO_USUARIO}{user_id}")
+
+
+def invalidar_token(chave):
+    cache.delete(_chave_token(chave))
+
+
+class TokenAuthenticationEmCache(TokenAuthentication):
+    """TokenAuthentication do DRF resolvendo token -> usuário pelo cache de identidades."""
+
+    def authenticate_credentials(self, key):
+        usuario = obter_usuario_do_token(key)
+        if usuario is None:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        if not usuario.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        # request.auth recebe um Token equivalente, sem nova consulta
+        return (usuario, Token(key=key, user=usuario))
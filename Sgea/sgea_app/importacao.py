@@ -0,0 +1,237 @@
+# sgea_app/importacao.py
+"""
+Importação em massa de usuários a partir de CSV.
+
+O arquivo é lido em fluxo, em blocos: cada bloco é validado com as mesmas regras do
+UsuarioCreationForm (com duas consultas ao banco por bloco para unicidade), as senhas são
+transformadas em hash em um pool de processos e os usuários são gravados com bulk_create.
+Enquanto os hashes de um bloco são calculados, o próximo já é lido e validado.
+"""
+
+import csv
+import multiprocessing
+import os
+import unicodedata
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import validate_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+
+from .models import Usuario
+
+COLUNAS = ('username', 'email', 'nome', 'perfil', 'telefone', 'instituicao_ensino', 'senha')
+COLUNAS_OBRIGATORIAS = ('username', 'email', 'nome', 'senha')
+PERFIS = dict(Usuario.PERFIL_CHOICES)
+_validar_username = UnicodeUsernameValidator()
+
+
+class ArquivoInvalido(Exception):
+    """O CSV não pode ser importado (ex: cabeçalho sem as colunas obrigatórias)."""
+
+
+# --- Hash de senhas em processos ---
+
+def _gerar_hashes(senhas):
+    return [make_password(senha) for senha in senhas]
+
+
+class _HashSequencial:
+    """Mesma interface do pool, para lotes pequenos ou ambientes com um único processo."""
+
+    def submit(self, funcao, *args):
+        futuro = Future()
+        futuro.set_result(funcao(*args))
+        return futuro
+
+    def shutdown(self, wait=True):
+        pass
+
+
+def _fatiar(lista, partes):
+    tamanho = max(1, -(-len(lista) // partes))
+    return [lista[i:i + tamanho] for i in range(0, len(lista), tamanho)]
+
+
+# --- Validação ---
+
+def _validar_linha(dados):
+    """Regras do UsuarioCreationForm que não dependem do banco. Retorna a lista de erros."""
+    erros = []
+    for coluna in COLUNAS_OBRIGATORIAS:
+        if not dados[coluna]:
+            erros.append(f"{coluna}: campo obrigatório.")
+
+    if dados['username']:
+        try:
+            _validar_username(dados['username'])
+            if len(dados['username']) > 150:
+                raise ValidationError("Máximo de 150 caracteres.")
+        except ValidationError as erro:
+            erros.extend(f"username: {mensagem}" for mensagem in erro.messages)
+    if dados['email']:
+        try:
+            validate_email(dados['email'])
+        except ValidationError:
+            erros.append("email: Informe um endereço de email válido.")
+    if len(dados['nome']) > 150:
+        erros.append("nome: Máximo de 150 caracteres.")
+    if dados['perfil'] not in PERFIS:
+        erros.append(f"perfil: '{dados['perfil']}' inválido (use {', '.join(PERFIS)}).")
+    if dados['perfil'] in ['aluno', 'professor'] and not dados['instituicao_ensino']:
+        erros.append("instituicao_ensino: Instituição de ensino é obrigatória para alunos e professores.")
+    if dados['telefone'] and not 14 <= len(dados['telefone']) <= 15:
+        erros.append("telefone: Por favor, insira um número de telefone válido com DDD.")
+
+    if dados['senha'] and not erros:
+        usuario = Usuario(username=dados['username'], email=dados['email'], first_name=dados['nome'])
+        try:
+            validate_password(dados['senha'], usuario)
+        except ValidationError as erro:
+            erros.extend(f"senha: {mensagem}" for mensagem in erro.messages)
+    return erros
+
+
+def _validar_bloco(bloco, usernames_vistos, emails_vistos):
+    """
+    Valida um bloco de (numero_linha, dados). Retorna (validos, erros), onde erros são
+    dicts prontos para o relatório. A unicidade é checada contra o banco (uma consulta por
+    campo) e contra as linhas anteriores do próprio arquivo.
+    """
+    usernames = {dados['username'].lower() for _, dados in bloco if dados['username']}
+    emails = {dados['email'].lower() for _, dados in bloco if dados['email']}
+    # Comparações por Lower(), como no login, resolvidas pelos índices funcionais de Usuario
+    usernames_existentes = set(
+        Usuario.objects.annotate(username_lower=Lower('username'))
+        .filter(username_lower__in=usernames).values_list('username_lower', flat=True)
+    )
+    emails_existentes = set(
+        Usuario.objects.annotate(email_lower=Lower('email'))
+        .filter(email_lower__in=emails).values_list('email_lower', flat=True)
+    )
+
+    validos, erros = [], []
+    for linha, dados in bloco:
+        mensagens = _validar_linha(dados)
+        username = dados['username'].lower()
+        if username in usernames_existentes or username in usernames_vistos:
+            mensagens.append("username: Já existe um usuário com este nome de usuário.")
+        email = dados['email'].lower()
+        if email in emails_existentes or email in emails_vistos:
+            mensagens.append("email: Este endereço de email já está em uso por outro usuário.")
+
+        if mensagens:
+            erros.append({'linha': linha, 'username': dados['username'], 'email': dados['email'],
+                          'erros': ' | '.join(mensagens)})
+        else:
+            validos.append((linha, dados))
+            usernames_vistos.add(username)
+            emails_vistos.add(email)
+    return validos, erros
+
+
+# --- Importação ---
+
+def _ler_linhas(arquivo):
+    """Gera (numero_linha, dados) a partir de um arquivo texto CSV (separador ',' ou ';')."""
+    amostra = arquivo.read(4096)
+    arquivo.seek(0)
+    try:
+        dialeto = csv.Sniffer().sniff(amostra, delimiters=',;')
+    except csv.Error:
+        dialeto = csv.excel
+    leitor = csv.DictReader(arquivo, dialect=dialeto)
+    cabecalho = [coluna.strip().lower() for coluna in (leitor.fieldnames or [])]
+    faltando = [coluna for coluna in COLUNAS_OBRIGATORIAS if coluna not in cabecalho]
+    if faltando:
+        raise ArquivoInvalido(f"Colunas obrigatórias ausentes no cabeçalho: {', '.join(faltando)}.")
+    leitor.fieldnames = cabecalho
+
+    for numero, linha in enumerate(leitor, start=2):  # linha 1 é o cabeçalho
+        dados = {coluna: (linha.get(coluna) or '').strip() for coluna in COLUNAS}
+        dados['username'] = unicodedata.normalize('NFKC', dados['username'])  # como o UsernameField
+        dados['perfil'] = dados['perfil'].lower() or 'aluno'
+        yield numero, dados
+
+
+def _gravar(validos, hashes):
+    """Grava o bloco já validado. Em caso de conflito (cadastro concorrente), o bloco inteiro é recusado."""
+    usuarios = [
+        Usuario(
+            username=dados['username'], email=dados['email'], first_name=dados['nome'],
+            perfil=dados['perfil'], telefone=dados['telefone'] or None,
+            instituicao_ensino=dados['instituicao_ensino'] or None, password=senha_hash,
+        )
+        for (_, dados), senha_hash in zip(validos, hashes)
+    ]
+    try:
+        with transaction.atomic():
+            Usuario.objects.bulk_create(usuarios)
+    except IntegrityError:
+        return 0, [
+            {'linha': linha, 'username': dados['username'], 'email': dados['email'],
+             'erros': "Conflito com um cadastro feito durante a importação; importe esta linha novamente."}
+            for linha, dados in validos
+        ]
+    return len(usuarios), []
+
+
+def importar_usuarios(arquivo, tamanho_bloco=500, processos=None):
+    """
+    Importa usuários de um arquivo texto CSV com cabeçalho (colunas: username, email, nome,
+    perfil, telefone, instituicao_ensino, senha). Retorna (total_criados, erros), onde erros
+    é a lista de linhas recusadas, no formato de escrever_relatorio().
+    """
+    if processos is None:
+        processos = getattr(settings, 'IMPORTACAO_PROCESSOS', None) or os.cpu_count() or 1
+    if processos > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=processos, mp_context=multiprocessing.get_context('spawn'),
+            initializer=django.setup,  # o próprio initializer não pode depender dos models
+        )
+    else:
+        pool = _HashSequencial()
+
+    criados, erros = 0, []
+    usernames_vistos, emails_vistos = set(), set()
+    linhas = _ler_linhas(arquivo)
+    anterior = None  # (validos, futuros) do bloco cujos hashes ainda estão sendo calculados
+    try:
+        while True:
+            bloco = list(islice(linhas, tamanho_bloco))
+            atual = None
+            if bloco:
+                validos, erros_bloco = _validar_bloco(bloco, usernames_vistos, emails_vistos)
+                erros.extend(erros_bloco)
+                if validos:
+                    senhas = [dados['senha'] for _, dados in validos]
+                    atual = (validos, [pool.submit(_gerar_hashes, parte) for parte in _fatiar(senhas, processos)])
+
+            if anterior:
+                validos_anteriores, futuros = anterior
+                hashes = [senha_hash for futuro in futuros for senha_hash in futuro.result()]
+                total, erros_gravacao = _gravar(validos_anteriores, hashes)
+                criados += total
+                erros.extend(erros_gravacao)
+            anterior = atual
+            if not bloco:
+                break
+    finally:
+        pool.shutdown(wait=True)
+
+    erros.sort(key=lambda erro: erro['linha'])
+    return criados, erros
+
+
+def escrever_relatorio(erros, saida):
+    """Escreve o relatório de linhas recusadas como CSV (linha, username, email, erros)."""
+    escritor = csv.DictWriter(saida, fieldnames=['linha', 'username', 'email', 'erros'])
+    escritor.writeheader()
+    escritor.writerows(erros)
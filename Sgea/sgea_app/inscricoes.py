@@ -0,0 +1,238 @@
+# sgea_app/inscricoes.py
+
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef
+from django.utils import timezone
+
+from . import cache_eventos, estatisticas, painel, replicas
+from .certificados import emitir_certificados_pendentes
+from .models import Evento, Inscricao, subconsulta_contagem
+
+
+# --- Exceções do Serviço de Inscrição ---
+
+class InscricaoRecusada(Exception):
+    """Erro base: a inscrição não pôde ser realizada."""
+    mensagem = "Não foi possível realizar a inscrição."
+
+    def __init__(self, evento):
+        self.evento = evento
+        super().__init__(self.mensagem)
+
+
+class InscricoesEncerradas(InscricaoRecusada):
+    mensagem = "As inscrições para este evento estão encerradas."
+
+
+class VagasEsgotadas(InscricaoRecusada):
+    mensagem = "As vagas para este evento estão esgotadas."
+
+
+class JaInscrito(InscricaoRecusada):
+    mensagem = "Você já está inscrito neste evento."
+
+
+# --- Serviço de Inscrição ---
+
+def inscrever(usuario, evento):
+    """
+    Inscreve o usuário no evento sem risco de ultrapassar o limite de vagas.
+
+    A vaga é reservada com um único UPDATE condicional sobre Evento.vagas_ocupadas
+    (sem ler o total antes), que também avança data_atualizacao (usada no ETag da API).
+    A inscrição duplicada é detectada pela própria restrição unique_together, e a
+    reserva é desfeita junto com a transação.
+    """
+    if evento.data_fim < timezone.now():
+        raise InscricoesEncerradas(evento)
+
+    try:
+        with transaction.atomic():
+            reservou = Evento.objects.filter(
+                pk=evento.pk,
+                vagas_ocupadas__lt=F('quantidade_participantes'),
+            ).update(vagas_ocupadas=F('vagas_ocupadas') + 1, data_atualizacao=timezone.now())
+            if not reservou:
+                raise VagasEsgotadas(evento)
+
+            return Inscricao.objects.create(usuario=usuario, evento=evento)
+    except IntegrityError:
+        raise JaInscrito(evento)
+
+
+def cancelar(usuario, evento):
+    """
+    Remove a inscrição (se existir). Retorna True se algo foi cancelado.
+    A vaga é devolvida pelo sinal post_delete de Inscricao (sgea_app.signals), como em qualquer exclusão.
+    """
+    removidas, _ = Inscricao.objects.filter(usuario=usuario, evento=evento).delete()
+    return bool(removidas)
+
+
+# --- Inscrição em Lote ---
+
+# Situações devolvidas item a item por inscrever_em_lote()
+INSCRITO = 'inscrito'
+JA_INSCRITO = 'ja_inscrito'
+DUPLICADO = 'duplicado_na_requisicao'
+VAGAS_ESGOTADAS = 'vagas_esgotadas'
+ENCERRADO = 'inscricoes_encerradas'
+EVENTO_INEXISTENTE = 'evento_inexistente'
+USUARIO_INEXISTENTE = 'usuario_inexistente'
+SEM_PERMISSAO = 'sem_permissao'
+
+
+def _contar_inscricoes(eventos_ids):
+    return dict(
+        Inscricao.objects.filter(evento_id__in=eventos_ids).order_by().values('evento_id')
+        .annotate(total=Count('pk')).values_list('evento_id', 'total')
+    )
+
+
+def inscrever_em_lote(pares, organizador=None):
+    """
+    Inscreve vários pares (usuario_id, evento_id) de uma vez e devolve o resultado de cada um,
+    na mesma ordem, como dicts {'usuario', 'evento', 'situacao'}.
+
+    Se `organizador` for informado, só aceita eventos organizados por ele.
+    Tudo roda em uma transação com um número fixo de consultas, independente do tamanho do lote:
+    trava os eventos, lê eventos/usuários/inscrições existentes, conta as inscrições dos eventos
+    afetados, um bulk_create, um UPDATE que recalcula o contador de vagas desses eventos e a
+    leitura dos novos contadores.
+    """
+    resultados = [{'usuario': u, 'evento': e, 'situacao': None} for u, e in pares]
+    eventos_ids = {e for _, e in pares}
+    usuarios_ids = {u for u, _ in pares}
+    agora = timezone.now()
+
+    with transaction.atomic():
+        # 1. Trava as linhas dos eventos (no SQLite, o lock de escrita do banco) antes de ler as vagas
+        Evento.objects.filter(pk__in=eventos_ids).update(vagas_ocupadas=F('vagas_ocupadas'))
+
+        eventos = {
+            evento['pk']: evento for evento in Evento.objects.filter(pk__in=eventos_ids).values(
+                'pk', 'data_fim', 'quantidade_participantes', 'vagas_ocupadas', 'organizador_id'
+            )
+        }
+        usuarios = set(
+            get_user_model().objects.filter(pk__in=usuarios_ids).values_list('pk', flat=True)
+        )
+        existentes = set(
+            Inscricao.objects.filter(evento_id__in=eventos_ids, usuario_id__in=usuarios_ids)
+            .values_list('usuario_id', 'evento_id')
+        )
+
+        # 2. Decide item a item, na ordem recebida, quem ocupa as vagas restantes
+        livres = {pk: evento['quantidade_participantes'] - evento['vagas_ocupadas'] for pk, evento in eventos.items()}
+        vistos = set()
+        novas = []
+        for item in resultados:
+            par = (item['usuario'], item['evento'])
+            evento = eventos.get(item['evento'])
+            if par in vistos:
+                item['situacao'] = DUPLICADO
+            elif evento is None:
+                item['situacao'] = EVENTO_INEXISTENTE
+            elif organizador is not None and evento['organizador_id'] != organizador.pk:
+                item['situacao'] = SEM_PERMISSAO
+            elif item['usuario'] not in usuarios:
+                item['situacao'] = USUARIO_INEXISTENTE
+            elif evento['data_fim'] < agora:
+                item['situacao'] = ENCERRADO
+            elif par in existentes:
+                item['situacao'] = JA_INSCRITO
+            elif livres[item['evento']] <= 0:
+                item['situacao'] = VAGAS_ESGOTADAS
+            else:
+                item['situacao'] = INSCRITO
+                livres[item['evento']] -= 1
+                novas.append(Inscricao(usuario_id=item['usuario'], evento_id=item['evento']))
+            vistos.add(par)
+
+        # 3. Grava tudo e recalcula os contadores a partir da tabela (exato mesmo com conflitos ignorados)
+        if novas:
+            afetados = {inscricao.evento_id for inscricao in novas}
+            antes = _contar_inscricoes(afetados)
+            Inscricao.objects.bulk_create(novas, ignore_conflicts=True)
+            Evento.objects.filter(pk__in=afetados).update(
+                vagas_ocupadas=subconsulta_contagem(Inscricao.objects.filter(evento=OuterRef('pk'))),
+                data_atualizacao=timezone.now(),
+            )
+            # bulk_create não dispara post_save: atualiza as estatísticas e invalida os caches diretamente.
+            # Os deltas são as linhas que de fato entraram (contagem antes x contador recalculado):
+            # com ignore_conflicts podem ser menos que len(novas)
+            hoje = estatisticas.dia_local(agora)
+            for evento_id, total in Evento.objects.filter(pk__in=afetados).values_list('pk', 'vagas_ocupadas'):
+                inseridas = total - antes.get(evento_id, 0)
+                if inseridas:
+                    estatisticas.atualizar(evento_id, inscritos=inseridas, dia=hoje)
+            transaction.on_commit(cache_eventos.invalidar)
+            inscritos = {inscricao.usuario_id for inscricao in novas}
+            transaction.on_commit(partial(painel.invalidar_usuarios, inscritos))
+            transaction.on_commit(partial(replicas.fixar_no_primario, inscritos))
+
+    return resultados
+
+
+# --- Presença em Lote ---
+
+def atualizar_presencas(evento, situacoes):
+    """
+    Aplica de uma vez a presença de várias inscrições do evento: `situacoes` é {inscricao_id: bool}.
+
+    Uma consulta lê as inscrições e um bulk_update grava só as que mudaram, na mesma transação;
+    as estatísticas e as versões de cache (listagem e painel) são atualizadas diretamente.
+    Inscrições de outros eventos (ou inexistentes) e as que já têm certificado (presença confirmada)
+    são ignoradas. Se o evento já terminou, a emissão dos certificados de quem passou a estar
+    presente é feita uma única vez, após o commit.
+    Retorna (alteradas, ignoradas): listas de inscrições alteradas e de ids ignorados.
+    """
+    with transaction.atomic():
+        encontradas = {
+            inscricao.pk: inscricao for inscricao in
+            Inscricao.objects.filter(evento=evento, pk__in=situacoes, certificado__isnull=True)
+            .select_related('usuario').only('id', 'presenca', 'usuario__username')
+        }
+        alteradas = []
+        for pk, presente in situacoes.items():
+            inscricao = encontradas.get(pk)
+            if inscricao is not None and inscricao.presenca != presente:
+                inscricao.presenca = presente
+                alteradas.append(inscricao)
+        Inscricao.objects.bulk_update(alteradas, ['presenca'], batch_size=500)
+        estatisticas.atualizar(evento.pk, presentes=sum(1 if inscricao.presenca else -1 for inscricao in alteradas))
+        if alteradas:
+            # bulk_update não dispara sinais: renova a listagem e o painel de quem teve a presença alterada
+            transaction.on_commit(cache_eventos.invalidar)
+            transaction.on_commit(partial(painel.invalidar_usuarios, [inscricao.usuario_id for inscricao in alteradas]))
+
+        presentes = [inscricao.pk for inscricao in alteradas if inscricao.presenca]
+        if presentes and evento.expirado:
+            transaction.on_commit(partial(emitir_certificados_pendentes, Inscricao.objects.filter(pk__in=presentes)))
+
+    ignoradas = [pk for pk in situacoes if pk not in encontradas]
+    return alteradas, ignoradas
+
+
+def resumo_presencas(evento, alteradas):
+    """Detalhes do registro de auditoria único de uma chamada de presença em lote."""
+    presentes = [inscricao.usuario.username for inscricao in alteradas if inscricao.presenca]
+    ausentes = [inscricao.usuario.username for inscricao in alteradas if not inscricao.presenca]
+    partes = [f"Presença em lote no evento {evento.nome} (ID: {evento.pk})"]
+    if presentes:
+        partes.append(f"{len(presentes)} presente(s): {', '.join(presentes)}")
+    if ausentes:
+        partes.append(f"{len(ausentes)} ausente(s): {', '.join(ausentes)}")
+    return ". ".join(partes)
+
+
+def recalcular_vagas_ocupadas(eventos=None):
+    """Reconstrói o contador a partir da tabela de inscrições (ex: após edições pelo admin)."""
+    if eventos is None:
+        eventos = Evento.objects.all()
+    return eventos.update(
+        vagas_ocupadas=subconsulta_contagem(Inscricao.objects.filter(evento=OuterRef('pk')))
+    )
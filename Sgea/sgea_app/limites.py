@@ -0,0 +1,205 @@
+# sgea_app/limites.py
+"""
+Limites de requisições da API (throttling) com contadores de janela deslizante em um
+armazenamento compartilhado entre processos.
+
+Em vez da lista de horários por cliente do SimpleRateThrottle (que cresce com o limite e fica
+no LocMemCache de cada processo), cada par cliente/escopo guarda só dois contadores: o da janela
+fixa atual e o da anterior. A estimativa é anterior * (fração que falta da janela atual) + atual.
+
+Armazenamentos (LIMITES_ARMAZENAMENTO):
+- 'sqlite': arquivo SQLite próprio (LIMITES_SQLITE_CAMINHO), compartilhado pelos workers da máquina;
+- 'redis': servidor Redis (ou compatível) em LIMITES_REDIS_URL, compartilhado entre máquinas
+  (requer o pacote opcional 'redis');
+- 'memoria': dicionário do próprio processo (testes e servidor de desenvolvimento).
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.throttling import ScopedRateThrottle
+
+
+def _janela(agora, duracao):
+    """Número da janela fixa atual e a fração dela já decorrida."""
+    return int(agora // duracao), (agora % duracao) / duracao
+
+
+def _decidir(anterior, atual, fracao, limite, duracao):
+    """
+    Aplica a janela deslizante a uma nova requisição. Retorna (permitido, espera em segundos).
+    A espera é o tempo até a estimativa abrir espaço para mais uma requisição.
+    """
+    if anterior * (1 - fracao) + atual + 1 <= limite:
+        return True, None
+    if atual + 1 <= limite:
+        # Só o peso da janela anterior impede: espera até ele diminuir o suficiente
+        fracao_livre = 1 - (limite - atual - 1) / anterior
+        return False, max((fracao_livre - fracao) * duracao, 0)
+    # A janela atual já está cheia: espera a próxima e o peso dela (que vira a "anterior") cair
+    fracao_livre = 1 - (limite - 1) / atual if limite >= 1 else 1
+    return False, (1 - fracao) * duracao + fracao_livre * duracao
+
+
+class ArmazenamentoMemoria:
+    """Contadores em um dicionário do processo (não compartilhado)."""
+
+    def __init__(self):
+        self._contadores = {}  # chave -> (janela, atual, anterior, expira_em)
+        self._trava = threading.Lock()
+        self._operacoes = 0
+
+    def registrar(self, chave, limite, duracao):
+        agora = time.time()
+        janela, fracao = _janela(agora, duracao)
+        with self._trava:
+            salva, atual, anterior, _ = self._contadores.get(chave, (janela, 0, 0, 0))
+            if salva != janela:
+                anterior, atual = (atual if salva == janela - 1 else 0), 0
+            permitido, espera = _decidir(anterior, atual, fracao, limite, duracao)
+            if permitido:
+                atual += 1
+            self._contadores[chave] = (janela, atual, anterior, (janela + 2) * duracao)
+
+            self._operacoes += 1
+            if self._operacoes % 10000 == 0:
+                self._contadores = {k: v for k, v in self._contadores.items() if v[3] > agora}
+        return permitido, espera
+
+
+class ArmazenamentoSQLite:
+    """
+    Contadores em um arquivo SQLite separado do banco principal (WAL, uma linha por cliente/escopo).
+    Cada registro é uma transação BEGIN IMMEDIATE: consistente entre threads e processos da máquina.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._local = threading.local()
+        self._operacoes = 0
+        self._conexao().execute(
+            "CREATE TABLE IF NOT EXISTS limites ("
+            " chave TEXT PRIMARY KEY, janela INTEGER NOT NULL, atual INTEGER NOT NULL,"
+            " anterior INTEGER NOT NULL, expira_em REAL NOT NULL)"
+        )
+
+    def _conexao(self):
+        # Uma conexão por thread, recriada se o processo foi copiado por fork (workers do gunicorn)
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None or self._local.pid != os.getpid():
+            conexao = sqlite3.connect(self.caminho, timeout=10, isolation_level=None, check_same_thread=False)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexao, self._local.pid = conexao, os.getpid()
+        return conexao
+
+    def registrar(self, chave, limite, duracao):
+        agora = time.time()
+        janela, fracao = _janela(agora, duracao)
+        conexao = self._conexao()
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            linha = conexao.execute(
+                "SELECT janela, atual, anterior FROM limites WHERE chave = ?", (chave,)
+            ).fetchone()
+            salva, atual, anterior = linha or (janela, 0, 0)
+            if salva != janela:
+                anterior, atual = (atual if salva == janela - 1 else 0), 0
+            permitido, espera = _decidir(anterior, atual, fracao, limite, duracao)
+            if permitido:
+                atual += 1
+            conexao.execute(
+                "INSERT INTO limites (chave, janela, atual, anterior, expira_em) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(chave) DO UPDATE SET janela = excluded.janela, atual = excluded.atual, "
+                "anterior = excluded.anterior, expira_em = excluded.expira_em",
+                (chave, janela, atual, anterior, (janela + 2) * duracao),
+            )
+            self._operacoes += 1
+            if self._operacoes % 10000 == 0:
+                conexao.execute("DELETE FROM limites WHERE expira_em < ?", (agora,))
+            conexao.execute("COMMIT")
+        except BaseException:
+            conexao.execute("ROLLBACK")
+            raise
+        return permitido, espera
+
+
+class ArmazenamentoRedis:
+    """
+    Contadores no Redis: uma chave por janela fixa, com expiração de duas janelas.
+    O INCR vem antes da decisão (a contagem já inclui as requisições concorrentes, então o limite
+    nunca é ultrapassado); se a requisição for recusada, o incremento é desfeito com DECR.
+    Usa só INCR/DECR, GET e PEXPIRE, sem scripts Lua (funciona em servidores compatíveis simples).
+    """
+    PREFIXO = 'sgea:limites:'
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured("LIMITES_ARMAZENAMENTO='redis' requer o pacote 'redis' instalado.")
+        self.cliente = redis.Redis.from_url(url)
+
+    def registrar(self, chave, limite, duracao):
+        agora = time.time()
+        janela, fracao = _janela(agora, duracao)
+        chave_atual = f"{self.PREFIXO}{chave}:{janela}"
+        pipe = self.cliente.pipeline(transaction=False)
+        pipe.incr(chave_atual)
+        pipe.pexpire(chave_atual, int(duracao * 2000))
+        pipe.get(f"{self.PREFIXO}{chave}:{janela - 1}")
+        atual, _, anterior = pipe.execute()
+        # _decidir considera a requisição nova como "+1": desconta o INCR já feito
+        permitido, espera = _decidir(int(anterior or 0), atual - 1, fracao, limite, duracao)
+        if not permitido:
+            self.cliente.decr(chave_atual)
+        return permitido, espera
+
+
+_armazenamento = None
+_armazenamento_trava = threading.Lock()
+
+
+def criar_armazenamento(tipo, sqlite_caminho=None, redis_url=None):
+    if tipo == 'memoria':
+        return ArmazenamentoMemoria()
+    if tipo == 'sqlite':
+        return ArmazenamentoSQLite(sqlite_caminho or settings.LIMITES_SQLITE_CAMINHO)
+    if tipo == 'redis':
+        return ArmazenamentoRedis(redis_url or settings.LIMITES_REDIS_URL)
+    raise ImproperlyConfigured(f"LIMITES_ARMAZENAMENTO inválido: {tipo!r}")
+
+
+def obter_armazenamento():
+    global _armazenamento
+    if _armazenamento is None:
+        with _armazenamento_trava:
+            if _armazenamento is None:
+                _armazenamento = criar_armazenamento(getattr(settings, 'LIMITES_ARMAZENAMENTO', 'memoria'))
+    return _armazenamento
+
+
+class ScopedRateThrottleCompartilhado(ScopedRateThrottle):
+    """ScopedRateThrottle do DRF (mesmos escopos e taxas) contado no armazenamento compartilhado."""
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        permitido, self._espera = obter_armazenamento().registrar(self.key, self.num_requests, self.duration)
+        return permitido
+
+    def wait(self):
+        return self._espera
@@ -0,0 +1,86 @@
+import gzip
+import json
+import os
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from sgea_app.models import LogAuditoria
+
+CAMPOS = ('id', 'data_hora', 'usuario_id', 'usuario__username', 'acao', 'detalhes', 'ip_usuario')
+
+
+class Command(BaseCommand):
+    help = (
+        "Move os logs de auditoria mais antigos que a janela de retenção para arquivos "
+        "JSONL compactados (um por dia: <destino>/AAAA/MM/logs-AAAA-MM-DD.jsonl.gz) e os "
+        "remove do banco em lotes pequenos, sem manter transações longas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=getattr(settings, 'AUDITORIA_RETENCAO_DIAS', 180),
+                            help="Mantém no banco apenas os logs dos últimos N dias.")
+        parser.add_argument('--destino', default=getattr(settings, 'AUDITORIA_DIR_ARQUIVO', None),
+                            help="Diretório raiz dos arquivos gerados.")
+        parser.add_argument('--lote', type=int, default=1000, help="Registros arquivados/removidos por vez.")
+        parser.add_argument('--pausa', type=float, default=0.0,
+                            help="Segundos de espera entre lotes (libera o banco para outras escritas).")
+        parser.add_argument('--dry-run', action='store_true', help="Apenas conta o que seria arquivado.")
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(days=options['dias'])
+        antigos = LogAuditoria.objects.filter(data_hora__lt=limite)
+
+        if options['dry_run']:
+            self.stdout.write(f"{antigos.count()} log(s) anteriores a {limite:%d/%m/%Y %H:%M} seriam arquivados.")
+            return
+
+        destino = options['destino'] or os.path.join(settings.BASE_DIR, 'arquivo_auditoria')
+        total = 0
+        while True:
+            lote = list(antigos.order_by('data_hora', 'id').values(*CAMPOS)[:options['lote']])
+            if not lote:
+                break
+
+            # 1. Grava primeiro no arquivo (com fsync); só depois apaga do banco.
+            #    Se o processo cair entre os dois passos, a próxima execução regrava
+            #    as mesmas linhas: o campo 'id' permite remover duplicatas.
+            for dia, registros in self._agrupar_por_dia(lote).items():
+                self._anexar(destino, dia, registros)
+
+            # 2. Remove o lote em uma transação curta
+            with transaction.atomic():
+                LogAuditoria.objects.filter(pk__in=[registro['id'] for registro in lote]).delete()
+
+            total += len(lote)
+            self.stdout.write(f"{total} log(s) arquivados...")
+            if options['pausa']:
+                time.sleep(options['pausa'])
+
+        self.stdout.write(self.style.SUCCESS(f"Arquivamento concluído: {total} log(s) movidos para {destino}."))
+
+    def _agrupar_por_dia(self, lote):
+        grupos = {}
+        for registro in lote:
+            dia = timezone.localtime(registro['data_hora']).date()
+            grupos.setdefault(dia, []).append(registro)
+        return grupos
+
+    def _anexar(self, destino, dia, registros):
+        pasta = os.path.join(destino, f"{dia:%Y}", f"{dia:%m}")
+        os.makedirs(pasta, exist_ok=True)
+        caminho = os.path.join(pasta, f"logs-{dia:%Y-%m-%d}.jsonl.gz")
+
+        # Cada execução anexa um novo membro gzip; leitores como gzip.open/zcat tratam o arquivo como um só.
+        with open(caminho, 'ab') as bruto:
+            with gzip.GzipFile(fileobj=bruto, mode='ab') as arquivo:
+                for registro in registros:
+                    linha = json.dumps(registro, cls=DjangoJSONEncoder, ensure_ascii=False)
+                    arquivo.write(linha.encode('utf-8') + b'\n')
+            bruto.flush()
+            os.fsync(bruto.fileno())
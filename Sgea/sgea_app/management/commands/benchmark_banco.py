@@ -0,0 +1,174 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from sgea_app import auditoria, estatisticas, inscricoes
+from sgea_app.models import Evento, LogAuditoria, Usuario
+
+# Variáveis de ambiente de cada perfil (lidas por settings.py no processo filho)
+PERFIS = {
+    'sqlite-padrao': {'DB_ENGINE': 'sqlite', 'SQLITE_AJUSTES': '0', 'SQLITE_WAL': '0'},
+    'sqlite-ajustado': {'DB_ENGINE': 'sqlite', 'SQLITE_AJUSTES': '1', 'SQLITE_WAL': '1'},
+    'postgres-sem-reuso': {'DB_ENGINE': 'postgresql', 'DB_CONN_MAX_AGE': '0', 'DB_POOL_MAX': '0'},
+    'postgres-persistente': {'DB_ENGINE': 'postgresql', 'DB_CONN_MAX_AGE': '60', 'DB_POOL_MAX': '0'},
+    'postgres-pool': {'DB_ENGINE': 'postgresql', 'DB_CONN_MAX_AGE': '0'},  # DB_POOL_MAX = --threads
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara a vazão de escrita dos caminhos de inscrição e de auditoria entre configurações do "
+        "banco (SQLite padrão x WAL ajustado; PostgreSQL sem reuso x conexões persistentes x pool). "
+        "Cada perfil roda em um processo próprio; os perfis SQLite usam um banco temporário e os "
+        "PostgreSQL o banco configurado no .env, com dados temporários removidos ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--perfis', nargs='+', choices=sorted(PERFIS),
+                            help="Padrão: os dois perfis do DB_ENGINE configurado.")
+        parser.add_argument('--threads', type=int, default=8, help="Requisições simultâneas.")
+        parser.add_argument('--operacoes', type=int, default=200, help="Operações por thread em cada caminho.")
+        parser.add_argument('--eventos', type=int, default=5, help="Eventos disputados pelas inscrições.")
+        parser.add_argument('--executar', action='store_true', help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['executar']:
+            self.stdout.write(json.dumps(self._executar(options['threads'], options['operacoes'], options['eventos'])))
+            return
+
+        perfis = options['perfis'] or (
+            ['postgres-sem-reuso', 'postgres-persistente', 'postgres-pool']
+            if settings.DB_ENGINE == 'postgresql' else ['sqlite-padrao', 'sqlite-ajustado']
+        )
+        diretorio = tempfile.mkdtemp(prefix='bench_banco_')
+        try:
+            modelo = None
+            for perfil in perfis:
+                ambiente = {**os.environ, **PERFIS[perfil], 'AUDITORIA_MODO': 'sincrono'}
+                if perfil == 'postgres-pool':
+                    ambiente['DB_POOL_MAX'] = str(options['threads'])
+                if perfil.startswith('sqlite'):
+                    if modelo is None:
+                        # Migra uma vez e copia o arquivo para cada perfil: todos partem do mesmo banco vazio
+                        modelo = os.path.join(diretorio, 'modelo.sqlite3')
+                        self.stdout.write("Criando o banco temporário (migrate)...")
+                        self._manage(['migrate', '-v0'], {**ambiente, 'DB_NAME': modelo, 'SQLITE_AJUSTES': '0', 'SQLITE_WAL': '0'})
+                    ambiente['DB_NAME'] = os.path.join(diretorio, f'{perfil}.sqlite3')
+                    shutil.copyfile(modelo, ambiente['DB_NAME'])
+
+                saida = self._manage([
+                    'benchmark_banco', '--executar', '--threads', str(options['threads']),
+                    '--operacoes', str(options['operacoes']), '--eventos', str(options['eventos']),
+                ], ambiente)
+                self._relatorio(perfil, json.loads(saida.strip().splitlines()[-1]))
+        finally:
+            shutil.rmtree(diretorio, ignore_errors=True)
+
+    def _manage(self, argumentos, ambiente):
+        processo = subprocess.run(
+            [sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'), *argumentos],
+            env=ambiente, capture_output=True, text=True,
+        )
+        if processo.returncode:
+            raise CommandError(processo.stderr.strip() or processo.stdout.strip())
+        return processo.stdout
+
+    def _relatorio(self, perfil, resultado):
+        self.stdout.write(f"{perfil}:")
+        for caminho, dados in resultado.items():
+            self.stdout.write(
+                f"  {caminho:11} {dados['por_segundo']:8.0f} escritas/s | p50 {dados['p50']:7.2f} ms | "
+                f"p95 {dados['p95']:7.2f} ms | erros {dados['erros']}"
+            )
+
+    # --- Processo filho ---
+
+    def _executar(self, n_threads, operacoes, n_eventos):
+        prefixo = f"bench_banco_{uuid.uuid4().hex[:8]}"
+        total = n_threads * operacoes
+        agora = timezone.now()
+
+        Usuario.objects.bulk_create([
+            Usuario(username=f"{prefixo}_{i}", email=f"{prefixo}_{i}@teste.local", instituicao_ensino="Teste", password="!")
+            for i in range(total)
+        ], batch_size=1000)
+        usuarios = list(Usuario.objects.filter(username__startswith=prefixo).order_by('pk'))
+        # bulk_create evita o full_clean() de Evento.save(), que exigiria organizador e professor
+        eventos = Evento.objects.bulk_create([
+            Evento(nome=f"{prefixo}_{i}", tipo_evento='outro', local="Benchmark",
+                   data_inicio=agora + timedelta(days=1), data_fim=agora + timedelta(days=2),
+                   quantidade_participantes=total)
+            for i in range(n_eventos)
+        ])
+        estatisticas.criar([evento.pk for evento in eventos])
+        close_old_connections()
+
+        def inscrever(indice):
+            inscricoes.inscrever(usuarios[indice], eventos[indice % n_eventos])
+
+        def auditar(indice):
+            auditoria.registrar(usuarios[indice], 'Benchmark', f"{prefixo} operação {indice}")
+
+        try:
+            return {
+                'inscricao': self._medir(inscrever, n_threads, operacoes),
+                'auditoria': self._medir(auditar, n_threads, operacoes),
+            }
+        finally:
+            LogAuditoria.objects.filter(detalhes__startswith=prefixo).delete()
+            Evento.objects.filter(nome__startswith=prefixo).delete()
+            Usuario.objects.filter(username__startswith=prefixo).delete()
+
+    def _medir(self, operacao, n_threads, operacoes):
+        duracoes, erros = [], []
+        trava = threading.Lock()
+        largada = threading.Barrier(n_threads + 1)
+
+        def trabalhador(numero):
+            largada.wait()
+            try:
+                for i in range(numero * operacoes, (numero + 1) * operacoes):
+                    inicio = time.perf_counter()
+                    try:
+                        operacao(i)
+                    except Exception as e:  # ex: "database is locked" no SQLite
+                        with trava:
+                            erros.append(str(e))
+                    else:
+                        with trava:
+                            duracoes.append((time.perf_counter() - inicio) * 1000)
+                    # Fim da "requisição": fecha ou devolve a conexão conforme CONN_MAX_AGE / pool
+                    close_old_connections()
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=trabalhador, args=(n,)) for n in range(n_threads)]
+        for thread in threads:
+            thread.start()
+        largada.wait()
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        duracao = time.perf_counter() - inicio
+
+        duracoes.sort()
+        return {
+            'por_segundo': len(duracoes) / duracao,
+            'p50': statistics.median(duracoes) if duracoes else 0.0,
+            'p95': duracoes[int(len(duracoes) * 0.95)] if duracoes else 0.0,
+            'erros': len(erros),
+        }
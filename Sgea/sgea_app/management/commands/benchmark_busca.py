@@ -0,0 +1,91 @@
+import random
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from sgea_app import busca
+from sgea_app.models import Evento
+
+PALAVRAS = (
+    "Seminário", "Computação", "Física", "Química", "Introdução", "Avançado", "Oficina", "Música",
+    "Robótica", "Educação", "Matemática", "Ciência", "Dados", "Inteligência", "Artificial", "Gestão",
+    "Saúde", "Engenharia", "Ambiental", "Programação", "História", "Literatura", "Economia", "Direito",
+    "Biologia", "Genética", "Energia", "Sustentável", "Design", "Inovação", "Tecnologia", "Redes",
+)
+LOCAIS = ("Auditório Central", "Sala 101", "Bloco B", "Laboratório de Informática", "Biblioteca", "Ginásio")
+# Das mais seletivas às mais amplas: o ranking (bm25 / ts_rank) é calculado para cada evento encontrado
+BUSCAS = (
+    "robotica genetica energia", "fisica quimica semin", "inteligencia artificial",
+    "saude dados", "computacao", "auditorio",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede a busca de eventos (sgea_app.busca) sobre uma tabela grande: índice textual "
+        "(FTS5 / tsvector) contra icontains. Os eventos são temporários e removidos ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--eventos', type=int, default=100_000)
+        parser.add_argument('--repeticoes', type=int, default=50)
+
+    def handle(self, *args, **options):
+        if not busca.indice_disponivel():
+            raise CommandError("Índice de busca indisponível: rode 'manage.py migrate' (requer SQLite com FTS5 ou PostgreSQL).")
+
+        total, repeticoes = options['eventos'], options['repeticoes']
+        prefixo = f"bench_busca_{uuid.uuid4().hex[:8]}"
+        aleatorio = random.Random(42)
+        agora = timezone.now()
+
+        try:
+            self.stdout.write(f"Gravando {total} eventos (os triggers alimentam o índice)...")
+            inicio = time.perf_counter()
+            for comeco in range(0, total, 20000):
+                Evento.objects.bulk_create([
+                    Evento(
+                        nome=f"{' '.join(aleatorio.sample(PALAVRAS, 3))} {prefixo}",
+                        local=aleatorio.choice(LOCAIS), tipo_evento='palestra',
+                        data_inicio=agora + timedelta(days=i % 365), data_fim=agora + timedelta(days=i % 365, hours=2),
+                        quantidade_participantes=50,
+                    )
+                    for i in range(comeco, min(comeco + 20000, total))
+                ])
+            self.stdout.write(f"  {time.perf_counter() - inicio:.1f}s")
+
+            def indice(texto):
+                consulta = busca.ranquear(Evento.objects.all(), texto)
+                return consulta.count(), list(consulta[:20])
+
+            def icontains(texto):
+                condicao = Q()
+                for palavra in busca.termos(texto):
+                    condicao &= Q(nome__icontains=palavra) | Q(local__icontains=palavra)
+                consulta = Evento.objects.filter(condicao).order_by('-data_inicio', 'id')
+                return consulta.count(), list(consulta[:20])
+
+            for titulo, consulta in (("Índice textual (ranqueado)", indice), ("icontains (sem índice)", icontains)):
+                # icontains não encontra 'computacao' em 'Computação' (a contagem mostra a diferença)
+                vezes = repeticoes if consulta is indice else max(repeticoes // 10, 1)
+                self.stdout.write(f"{titulo} (contagem + primeira página, mediana de {vezes}):")
+                for texto in BUSCAS:
+                    duracoes = []
+                    for _ in range(vezes):
+                        inicio = time.perf_counter()
+                        encontrados, _pagina = consulta(texto)
+                        duracoes.append((time.perf_counter() - inicio) * 1000)
+                    self.stdout.write(f"  {texto!r:28} {encontrados:>7} eventos | {statistics.median(duracoes):7.2f} ms")
+        finally:
+            # DELETE direto: os eventos de teste não têm inscrições; o trigger limpa o índice
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {connection.ops.quote_name(Evento._meta.db_table)} WHERE nome LIKE %s",
+                    [f"% {prefixo}"],
+                )
@@ -0,0 +1,129 @@
+import socketserver
+import threading
+import time
+import uuid
+
+from django.core.mail import EmailMessage
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test.utils import override_settings
+
+from sgea_app import emails
+from sgea_app.models import EmailPendente
+
+
+class _ServidorSMTPFalso(socketserver.ThreadingTCPServer):
+    """Servidor SMTP mínimo em memória: aceita tudo, conta conexões e mensagens."""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, latencia, falhar_a_cada):
+        super().__init__(('127.0.0.1', 0), _SessaoSMTP)
+        self.latencia = latencia
+        self.falhar_a_cada = falhar_a_cada
+        self.conexoes = self.mensagens = self.destinatarios = 0
+        self.trava = threading.Lock()
+
+
+class _SessaoSMTP(socketserver.StreamRequestHandler):
+    def responder(self, linha, atrasar=True):
+        if atrasar and self.server.latencia:
+            time.sleep(self.server.latencia)  # simula a ida e volta até um servidor remoto
+        self.wfile.write(linha.encode() + b"\r\n")
+
+    def handle(self):
+        servidor = self.server
+        with servidor.trava:
+            servidor.conexoes += 1
+        self.responder("220 localhost SMTP de teste")
+        while True:
+            linha = self.rfile.readline()
+            if not linha:
+                return
+            comando = linha.decode('utf-8', 'replace').strip().upper()
+            if comando.startswith(('EHLO', 'HELO')):
+                self.responder("250 localhost")
+            elif comando.startswith('RCPT'):
+                with servidor.trava:
+                    servidor.destinatarios += 1
+                    recusar = servidor.falhar_a_cada and servidor.destinatarios % servidor.falhar_a_cada == 0
+                self.responder("451 Tente mais tarde" if recusar else "250 OK")
+            elif comando == 'DATA':
+                self.responder("354 Envie a mensagem", atrasar=False)
+                while self.rfile.readline() not in (b".\r\n", b".\n", b""):
+                    pass
+                with servidor.trava:
+                    servidor.mensagens += 1
+                self.responder("250 OK")
+            elif comando == 'QUIT':
+                self.responder("221 Tchau", atrasar=False)
+                return
+            else:  # MAIL, RSET, NOOP...
+                self.responder("250 OK")
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara o envio da caixa de saída (uma conexão SMTP por lote, com retentativas) com o envio "
+        "de uma conexão por e-mail, contra um servidor SMTP falso local. Os e-mails são temporários."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--emails', type=int, default=500)
+        parser.add_argument('--latencia', type=float, default=5.0,
+                            help="Atraso (ms) simulado em cada resposta do servidor SMTP.")
+        parser.add_argument('--falhar-a-cada', type=int, default=50,
+                            help="Recusa temporariamente (451) um a cada N destinatários. 0 desativa.")
+
+    def handle(self, *args, **options):
+        if EmailPendente.objects.filter(situacao='pendente').exists():
+            raise CommandError("Há e-mails reais pendentes na caixa de saída; esvazie-a antes do benchmark.")
+
+        total = options['emails']
+        servidor = _ServidorSMTPFalso(options['latencia'] / 1000, options['falhar_a_cada'])
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        assunto = f"bench_{uuid.uuid4().hex[:8]}"
+        config_smtp = dict(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1', EMAIL_PORT=servidor.server_address[1],
+            EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='', EMAIL_USE_TLS=False, EMAIL_USE_SSL=False,
+            EMAILS_ESPERA_BASE=0,  # falhas voltam à fila imediatamente
+        )
+
+        try:
+            with override_settings(**config_smtp):
+                # Referência: uma conexão SMTP nova por e-mail (como o cadastro fazia antes)
+                inicio = time.perf_counter()
+                for i in range(total):
+                    try:
+                        EmailMessage(assunto, "corpo", to=[f"{assunto}_{i}@exemplo.com"]).send()
+                    except Exception:
+                        pass
+                self._relatorio("Uma conexão por e-mail", total, time.perf_counter() - inicio, servidor)
+
+                servidor.conexoes = servidor.mensagens = servidor.destinatarios = 0
+                emails.enfileirar(assunto, "corpo", [f"{assunto}_{i}@exemplo.com" for i in range(total)])
+                inicio = time.perf_counter()
+                rodadas = 0
+                while True:
+                    enviados, falhas = emails.enviar_pendentes()
+                    if not (enviados or falhas):
+                        break
+                    rodadas += 1
+                duracao = time.perf_counter() - inicio
+                self._relatorio("Caixa de saída em lotes", total, duracao, servidor)
+                situacoes = dict(
+                    EmailPendente.objects.filter(assunto=assunto).order_by()
+                    .values_list('situacao').annotate(total=Count('id'))
+                )
+                self.stdout.write(f"  {rodadas} lote(s) | situação final: {situacoes}")
+        finally:
+            servidor.shutdown()
+            servidor.server_close()
+            EmailPendente.objects.filter(assunto=assunto).delete()
+
+    def _relatorio(self, titulo, total, duracao, servidor):
+        self.stdout.write(
+            f"{titulo}: {servidor.mensagens}/{total} entregues em {duracao:.2f}s "
+            f"({servidor.mensagens / duracao:,.0f} e-mails/s) | {servidor.conexoes} conexão(ões) SMTP"
+        )
@@ -0,0 +1,170 @@
+import multiprocessing
+import os
+import socketserver
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+
+from sgea_app.limites import criar_armazenamento
+
+
+class _ServidorRedisFalso(socketserver.ThreadingTCPServer):
+    """Servidor mínimo compatível com Redis (RESP2/RESP3): só os comandos usados por ArmazenamentoRedis."""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _SessaoRedis)
+        self.dados = {}  # chave -> (valor, expira_em)
+        self.trava = threading.Lock()
+
+    def executar(self, comando, argumentos):
+        agora = time.time()
+        with self.trava:
+            if comando in (b'INCR', b'INCRBY', b'DECR', b'DECRBY', b'GET', b'PEXPIRE'):
+                valor, expira = self.dados.get(argumentos[0], (None, None))
+                if expira is not None and expira <= agora:
+                    valor, expira = None, None
+                if comando == b'GET':
+                    return valor
+                if comando == b'PEXPIRE':
+                    if valor is None:
+                        return 0
+                    self.dados[argumentos[0]] = (valor, agora + int(argumentos[1]) / 1000)
+                    return 1
+                passo = int(argumentos[1]) if comando.endswith(b'BY') else 1
+                novo = int(valor or 0) + (passo if comando.startswith(b'INCR') else -passo)
+                self.dados[argumentos[0]] = (str(novo).encode(), expira)
+                return novo
+        if comando == b'PING':
+            return 'PONG'
+        if comando == b'HELLO':
+            return {b'server': b'redis', b'version': b'7.0.0', b'proto': int(argumentos[0]) if argumentos else 2}
+        return 'OK'  # CLIENT SETINFO, SELECT e afins do handshake do cliente
+
+
+class _SessaoRedis(socketserver.StreamRequestHandler):
+    disable_nagle_algorithm = True  # respostas pequenas e separadas do pipeline, como o Redis real
+    def handle(self):
+        self.resp3 = False
+        while True:
+            linha = self.rfile.readline()
+            if not linha:
+                return
+            partes = []
+            for _ in range(int(linha[1:])):
+                tamanho = int(self.rfile.readline()[1:])
+                partes.append(self.rfile.read(tamanho + 2)[:-2])
+            if partes[0].upper() == b'HELLO':
+                self.resp3 = partes[1:2] == [b'3']
+            self.wfile.write(self._codificar(self.server.executar(partes[0].upper(), partes[1:])))
+
+    def _codificar(self, resposta):
+        if isinstance(resposta, dict):  # resposta do HELLO (mapa do RESP3)
+            return b"%%%d\r\n" % len(resposta) + b"".join(
+                self._codificar(chave) + self._codificar(valor) for chave, valor in resposta.items()
+            )
+        if resposta is None:
+            return b"_\r\n" if self.resp3 else b"$-1\r\n"
+        if isinstance(resposta, int):
+            return b":%d\r\n" % resposta
+        if isinstance(resposta, bytes):
+            return b"$%d\r\n%s\r\n" % (len(resposta), resposta)
+        return f"+{resposta}\r\n".encode()
+
+
+def _rodar(tipo, sqlite_caminho, redis_url, chaves, limite, duracao, threads):
+    """Executa as verificações com várias threads; retorna (permitidas por chave, segundos)."""
+    armazenamento = criar_armazenamento(tipo, sqlite_caminho, redis_url)
+    permitidas = Counter()
+
+    def verificar(chave):
+        if armazenamento.registrar(chave, limite, duracao)[0]:
+            return chave
+        return None
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for chave in executor.map(verificar, chaves, chunksize=64):
+            if chave is not None:
+                permitidas[chave] += 1
+    return permitidas, time.perf_counter() - inicio
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede verificações/segundo dos limites da API (janela deslizante) sob concorrência e confere "
+        "que nenhum cliente passa do limite, mesmo com vários processos compartilhando o armazenamento."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--armazenamento', choices=['memoria', 'sqlite', 'redis'], default='sqlite')
+        parser.add_argument('--redis-url', help="Servidor Redis real. Sem ele, sobe um servidor falso local.")
+        parser.add_argument('--verificacoes', type=int, default=20000)
+        parser.add_argument('--clientes', type=int, default=500)
+        parser.add_argument('--limite', type=int, default=20, help="Requisições permitidas por cliente por dia.")
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--processos', type=int, default=1,
+                            help="Processos (workers) simultâneos, cada um com suas threads.")
+
+    def handle(self, *args, **options):
+        tipo, processos = options['armazenamento'], options['processos']
+        if tipo == 'memoria' and processos > 1:
+            self.stderr.write("O armazenamento 'memoria' não é compartilhado: cada processo conta separado.")
+
+        servidor = None
+        redis_url = options['redis_url']
+        if tipo == 'redis' and not redis_url:
+            servidor = _ServidorRedisFalso()
+            threading.Thread(target=servidor.serve_forever, daemon=True).start()
+            redis_url = f"redis://127.0.0.1:{servidor.server_address[1]}/0"
+
+        diretorio = tempfile.mkdtemp(prefix='bench_limites_')
+        sqlite_caminho = os.path.join(diretorio, 'limites.sqlite3')
+        # Escopo/cliente como no DRF; prefixo único para não misturar com contagens reais
+        prefixo = f"throttle_bench{os.getpid()}_user_"
+        chaves = [f"{prefixo}{i % options['clientes']}" for i in range(options['verificacoes'])]
+        # Fatias contíguas: cada processo verifica todos os clientes (que se repetem ao longo da lista)
+        tamanho = -(-len(chaves) // processos)
+        partes = [chaves[i:i + tamanho] for i in range(0, len(chaves), tamanho)]
+        argumentos = (tipo, sqlite_caminho, redis_url)
+
+        try:
+            if processos > 1:
+                contexto = multiprocessing.get_context('spawn')
+                with ProcessPoolExecutor(processos, mp_context=contexto, initializer=django.setup) as executor:
+                    resultados = list(executor.map(
+                        _rodar, *zip(*[argumentos + (parte, options['limite'], 86400, options['threads'])
+                                       for parte in partes])
+                    ))
+            else:
+                resultados = [_rodar(*argumentos, chaves, options['limite'], 86400, options['threads'])]
+
+            permitidas = sum((resultado[0] for resultado in resultados), Counter())
+            duracao = max(resultado[1] for resultado in resultados)
+            excedentes = sum(1 for total in permitidas.values() if total > options['limite'])
+            self.stdout.write(
+                f"{tipo}: {len(chaves):,} verificações em {duracao:.2f}s = {len(chaves) / duracao:,.0f}/s "
+                f"({processos} processo(s) x {options['threads']} threads)"
+            )
+            self.stdout.write(
+                f"  permitidas: {sum(permitidas.values())} (máximo esperado "
+                f"{min(options['clientes'], len(chaves)) * options['limite']}) | clientes acima do limite: {excedentes}"
+            )
+            if tipo == 'sqlite':
+                import sqlite3
+                with sqlite3.connect(sqlite_caminho) as conexao:
+                    linhas = conexao.execute("SELECT COUNT(*) FROM limites").fetchone()[0]
+                self.stdout.write(f"  {linhas} linha(s) no armazenamento (uma por cliente/escopo)")
+        finally:
+            if servidor:
+                servidor.shutdown()
+                servidor.server_close()
+            for nome in os.listdir(diretorio):
+                os.remove(os.path.join(diretorio, nome))
+            os.rmdir(diretorio)
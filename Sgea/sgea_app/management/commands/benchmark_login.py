@@ -0,0 +1,85 @@
+import time
+import uuid
+
+from django.contrib.auth import authenticate
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
+
+from sgea_app.models import Usuario
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede a busca do login (username ou e-mail) sobre uma tabela grande de usuários: "
+        "a consulta antiga (__iexact, LIKE no SQLite) contra a nova (LOWER() com índices funcionais). "
+        "Os usuários são temporários e removidos ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuarios', type=int, default=1_000_000)
+        parser.add_argument('--consultas', type=int, default=200)
+
+    def handle(self, *args, **options):
+        total, consultas = options['usuarios'], options['consultas']
+        prefixo = f"bench_login_{uuid.uuid4().hex[:8]}"
+
+        try:
+            self.stdout.write(f"Gravando {total} usuários...")
+            inicio = time.perf_counter()
+            for comeco in range(0, total, 50000):
+                Usuario.objects.bulk_create([
+                    Usuario(username=f"{prefixo}_{i}", email=f"{prefixo}_{i}@Exemplo.com",
+                            instituicao_ensino="Teste", password="!")
+                    for i in range(comeco, min(comeco + 50000, total))
+                ])
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE" if connection.vendor != 'postgresql' else f"ANALYZE {Usuario._meta.db_table}")
+            self.stdout.write(f"  {time.perf_counter() - inicio:.1f}s")
+
+            passo = max(total // consultas, 1)
+            logins = [
+                f"{prefixo}_{i}".upper() if n % 2 else f"{prefixo}_{i}@exemplo.com"
+                for n, i in enumerate(range(0, total, passo))
+            ][:consultas]
+
+            def antiga(login):
+                return Usuario.objects.filter(Q(username__iexact=login) | Q(email__iexact=login)).order_by('id')
+
+            def nova(login):
+                return Usuario.objects.por_login(login)
+
+            for titulo, consulta in (("Consulta antiga (__iexact)", antiga), ("Consulta nova (LOWER + índices)", nova)):
+                self.stdout.write(f"{titulo}: {self._plano(consulta(logins[0]))}")
+                # A consulta antiga percorre a tabela inteira: limita as repetições
+                # (amostra espalhada pela tabela: com ORDER BY id, logins do começo terminariam cedo)
+                amostra = logins if consulta is nova else logins[::20]
+                inicio = time.perf_counter()
+                encontrados = sum(consulta(login).first() is not None for login in amostra)
+                duracao = time.perf_counter() - inicio
+                self.stdout.write(
+                    f"  {encontrados}/{len(amostra)} encontrados | {duracao / len(amostra) * 1000:.3f} ms por login"
+                )
+
+            # authenticate() completo: uma única consulta (a senha '!' é inutilizável, então o hasher não pesa)
+            reset_queries()
+            with CaptureQueriesContext(connection) as capturadas:
+                authenticate(username=logins[0], password="qualquer")
+            self.stdout.write(f"authenticate(): {len(capturadas)} consulta(s) ao banco")
+        finally:
+            # DELETE direto: os usuários de teste não têm registros relacionados
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {connection.ops.quote_name(Usuario._meta.db_table)} WHERE username LIKE %s",
+                    [f"{prefixo}%"],
+                )
+
+    def _plano(self, queryset):
+        sql, parametros = queryset[:1].query.sql_with_params()
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}", parametros)
+                return ' | '.join(linha[-1] for linha in cursor.fetchall())
+            cursor.execute(f"EXPLAIN {sql}", parametros)
+            return ' | '.join(linha[0] for linha in cursor.fetchall())
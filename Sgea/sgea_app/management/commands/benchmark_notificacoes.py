@@ -0,0 +1,117 @@
+import asyncio
+import time
+import tracemalloc
+import uuid
+
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from sgea_app import notificacoes
+from sgea_app.models import Usuario
+
+
+class Command(BaseCommand):
+    help = (
+        "Abre milhares de conexões SSE simultâneas de ativação de conta direto na aplicação ASGI "
+        "(sem rede), ativa todos os usuários e mede a memória por conexão e o tempo de entrega. "
+        "Os usuários são temporários e removidos ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clientes', type=int, default=2000)
+        parser.add_argument('--timeout', type=float, default=120.0,
+                            help="Tempo máximo (s) para conectar todos e para receber as notificações.")
+
+    def handle(self, *args, **options):
+        total = options['clientes']
+        prefixo = f"bench_sse_{uuid.uuid4().hex[:8]}"
+
+        Usuario.objects.bulk_create(
+            [Usuario(username=f"{prefixo}_{i}", instituicao_ensino="Teste", password="!", is_active=False)
+             for i in range(total)],
+            batch_size=5000,
+        )
+        ids = list(Usuario.objects.filter(username__startswith=prefixo).values_list('pk', flat=True))
+
+        try:
+            with override_settings(ALLOWED_HOSTS=['localhost']):
+                asyncio.run(self._executar(ids, options['timeout']))
+        finally:
+            Usuario.objects.filter(username__startswith=prefixo).delete()
+
+    async def _executar(self, ids, timeout):
+        aplicacao = get_asgi_application()
+        desconectar = asyncio.Event()
+        entregues = {}
+
+        async def cliente(user_id):
+            caminho = reverse('eventos_status_usuario', args=[user_id])
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+                'method': 'GET', 'scheme': 'http', 'path': caminho, 'raw_path': caminho.encode(),
+                'query_string': b'', 'root_path': '',
+                'headers': [(b'host', b'localhost'), (b'accept', b'text/event-stream')],
+                'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+            }
+            pedido_enviado = False
+
+            async def receive():
+                nonlocal pedido_enviado
+                if not pedido_enviado:
+                    pedido_enviado = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await desconectar.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(mensagem):
+                if mensagem['type'] == 'http.response.body' and b'event: ativo' in mensagem.get('body', b''):
+                    entregues[user_id] = time.perf_counter()
+
+            await aplicacao(scope, receive, send)
+
+        tracemalloc.start()
+        base, _ = tracemalloc.get_traced_memory()
+        inicio = time.perf_counter()
+        tarefas = [asyncio.create_task(cliente(user_id)) for user_id in ids]
+
+        # Aguarda todas as conexões estarem assinando o hub (já passaram pela verificação no banco)
+        limite = time.perf_counter() + timeout
+        while notificacoes.hub.total_assinantes() < len(ids) and time.perf_counter() < limite:
+            await asyncio.sleep(0.05)
+        conectados = notificacoes.hub.total_assinantes()
+        memoria, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.stdout.write(
+            f"Conexões abertas: {conectados}/{len(ids)} em {time.perf_counter() - inicio:.2f}s | "
+            f"memória: {(memoria - base) / 1024 / 1024:.1f} MiB "
+            f"(~{(memoria - base) / max(conectados, 1) / 1024:.1f} KiB por conexão, pico {pico / 1024 / 1024:.1f} MiB)"
+        )
+
+        # Ativa as contas como a view activate faz: grava e publica no canal de cada usuário
+        await Usuario.objects.filter(pk__in=ids).aupdate(is_active=True)
+        publicado = time.perf_counter()
+        for user_id in ids:
+            notificacoes.publicar(notificacoes.canal_ativacao(user_id), {'ativo': True})
+
+        try:
+            await asyncio.wait_for(asyncio.gather(*tarefas), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.stderr.write("Tempo esgotado aguardando as entregas.")
+        finally:
+            desconectar.set()
+            for tarefa in tarefas:
+                tarefa.cancel()
+            await asyncio.gather(*tarefas, return_exceptions=True)
+
+        if entregues:
+            atrasos = sorted((momento - publicado) * 1000 for momento in entregues.values())
+            p50 = atrasos[len(atrasos) // 2]
+            p99 = atrasos[min(len(atrasos) - 1, int(len(atrasos) * 0.99))]
+            self.stdout.write(
+                f"Notificações entregues: {len(entregues)}/{len(ids)} | "
+                f"atraso p50 {p50:.1f} ms, p99 {p99:.1f} ms, máx {atrasos[-1]:.1f} ms"
+            )
+        else:
+            self.stdout.write("Nenhuma notificação entregue.")
@@ -0,0 +1,114 @@
+import math
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from sgea_app.certificados import gerar_codigo
+from sgea_app.models import Certificado, Evento, Inscricao, Usuario
+from sgea_app.validacao import IndiceCertificados
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede consultas/segundo do índice de validação de certificados (Bloom + LRU). "
+        "Por padrão o índice é aquecido com códigos sintéticos; com --banco, os certificados "
+        "são gravados de verdade (em dados temporários, removidos ao final)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--certificados', type=int, default=1_000_000)
+        parser.add_argument('--consultas', type=int, default=200_000)
+        parser.add_argument('--banco', action='store_true',
+                            help="Grava os certificados no banco e mede também códigos válidos (banco e LRU).")
+
+    def handle(self, *args, **options):
+        total, consultas = options['certificados'], options['consultas']
+        indice = IndiceCertificados(capacidade_lru=max(consultas, 10000), intervalo_sincronizacao=3600)
+        prefixo = f"bench_{uuid.uuid4().hex[:8]}"
+
+        try:
+            if options['banco']:
+                self.stdout.write(f"Gravando {total} certificados no banco...")
+                codigos = self._popular_banco(prefixo, total)
+                inicio = time.perf_counter()
+                indice.aquecer()
+            else:
+                codigos = [gerar_codigo() for _ in range(total)]
+                inicio = time.perf_counter()
+                indice.aquecer(codigos)
+            duracao = time.perf_counter() - inicio
+            filtro = indice._filtro
+            self.stdout.write(
+                f"Aquecimento: {filtro.tamanho} códigos em {duracao:.2f}s | "
+                f"filtro de {filtro.bits / 8 / 1024 / 1024:.1f} MiB, {filtro.hashes} hashes"
+            )
+
+            desconhecidos = [gerar_codigo() for _ in range(consultas)]
+            with CaptureQueriesContext(connection) as capturadas:
+                taxa = self._medir(indice.consultar, desconhecidos)
+            self.stdout.write(
+                f"Códigos inexistentes: {taxa:,.0f} consultas/s | "
+                f"{len(capturadas)} consultas ao banco (falsos positivos do filtro)"
+            )
+            lote = 100
+            taxa = self._medir(
+                indice.consultar_varios,
+                [desconhecidos[i:i + lote] for i in range(0, len(desconhecidos), lote)],
+            ) * lote
+            self.stdout.write(f"Códigos inexistentes em lotes de {lote}: {taxa:,.0f} códigos/s")
+
+            if options['banco']:
+                amostra = codigos[:min(consultas, len(codigos))]
+                taxa = self._medir(indice.consultar, amostra)
+                self.stdout.write(f"Códigos válidos, 1ª consulta (banco): {taxa:,.0f} consultas/s")
+                taxa = self._medir(indice.consultar, amostra)
+                self.stdout.write(f"Códigos válidos, repetidos (LRU): {taxa:,.0f} consultas/s")
+        finally:
+            if options['banco']:
+                Evento.objects.filter(nome__startswith=prefixo).delete()
+                Usuario.objects.filter(username__startswith=prefixo).delete()
+
+    def _medir(self, funcao, argumentos):
+        inicio = time.perf_counter()
+        for argumento in argumentos:
+            funcao(argumento)
+        return len(argumentos) / (time.perf_counter() - inicio)
+
+    def _popular_banco(self, prefixo, total):
+        # Inscrição é única por (usuário, evento): usa uma grade usuários x eventos
+        lado = math.ceil(math.sqrt(total))
+        agora = timezone.now()
+        Usuario.objects.bulk_create(
+            [Usuario(username=f"{prefixo}_{i}", instituicao_ensino="Teste", password="!") for i in range(lado)],
+            batch_size=5000,
+        )
+        Evento.objects.bulk_create(
+            [Evento(nome=f"{prefixo}_{i}", tipo_evento='outro', local="Benchmark",
+                    data_inicio=agora - timedelta(days=2), data_fim=agora - timedelta(days=1))
+             for i in range(lado)],
+            batch_size=5000,
+        )
+        usuarios = list(Usuario.objects.filter(username__startswith=prefixo).values_list('pk', flat=True))
+        eventos = list(Evento.objects.filter(nome__startswith=prefixo).values_list('pk', flat=True))
+
+        codigos = []
+        pares = ((u, e) for e in eventos for u in usuarios)
+        bloco = 20000
+        while len(codigos) < total:
+            fatia = [next(pares) for _ in range(min(bloco, total - len(codigos)))]
+            with transaction.atomic():
+                criadas = Inscricao.objects.bulk_create(
+                    [Inscricao(usuario_id=u, evento_id=e, presenca=True) for u, e in fatia]
+                )
+                novos = [gerar_codigo() for _ in criadas]
+                Certificado.objects.bulk_create(
+                    [Certificado(inscricao=inscricao, codigo_validacao=codigo)
+                     for inscricao, codigo in zip(criadas, novos)]
+                )
+            codigos.extend(novos)
+        return codigos
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from sgea_app.certificados import emitir_certificados_pendentes
+
+
+class Command(BaseCommand):
+    help = (
+        "Emite em lote os certificados de todas as inscrições com presença confirmada em eventos "
+        "já encerrados. Com --intervalo, roda continuamente como worker periódico."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--intervalo', type=float, default=0,
+                            help="Segundos entre execuções. 0 (padrão) executa uma única vez.")
+        parser.add_argument('--lote', type=int, default=1000, help="Inscrições processadas por bulk_create.")
+
+    def handle(self, *args, **options):
+        intervalo = options['intervalo']
+        while True:
+            emitidos = emitir_certificados_pendentes(tamanho_lote=options['lote'])
+            if emitidos or not intervalo:
+                self.stdout.write(self.style.SUCCESS(f"{emitidos} certificado(s) emitido(s)."))
+            if not intervalo:
+                break
+            close_old_connections()
+            time.sleep(intervalo)
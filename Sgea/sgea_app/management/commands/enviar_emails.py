@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from sgea_app.emails import enviar_pendentes
+
+
+class Command(BaseCommand):
+    help = (
+        "Envia os e-mails da caixa de saída em lotes, reutilizando uma conexão SMTP por lote. "
+        "Com --intervalo, roda continuamente como worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--intervalo', type=float, default=0,
+                            help="Segundos de espera quando a fila está vazia. 0 (padrão) esvazia a fila uma vez e sai.")
+        parser.add_argument('--lote', type=int, default=None, help="E-mails por conexão (padrão: EMAILS_TAMANHO_LOTE).")
+
+    def handle(self, *args, **options):
+        intervalo = options['intervalo']
+        total_enviados = total_falhas = 0
+        while True:
+            enviados, falhas = enviar_pendentes(tamanho_lote=options['lote'])
+            total_enviados += enviados
+            total_falhas += falhas
+            if enviados or falhas:
+                self.stdout.write(f"{enviados} e-mail(s) enviado(s), {falhas} reagendado(s).")
+                continue  # ainda pode haver pendentes: segue sem esperar
+            if not intervalo:
+                break
+            close_old_connections()
+            time.sleep(intervalo)
+        self.stdout.write(self.style.SUCCESS(
+            f"Fila vazia. Total: {total_enviados} enviado(s), {total_falhas} reagendado(s)."
+        ))
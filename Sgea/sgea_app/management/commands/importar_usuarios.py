@@ -0,0 +1,34 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from sgea_app.importacao import ArquivoInvalido, escrever_relatorio, importar_usuarios
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa usuários de um CSV (username, email, nome, perfil, telefone, instituicao_ensino, senha) "
+        "com as regras do cadastro. As linhas recusadas vão para o relatório (--relatorio) ou para a saída padrão."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help="Caminho do CSV (UTF-8).")
+        parser.add_argument('--relatorio', help="Caminho do CSV de erros. Padrão: saída padrão.")
+        parser.add_argument('--bloco', type=int, default=500, help="Linhas validadas e gravadas por vez.")
+        parser.add_argument('--processos', type=int, default=None,
+                            help="Processos para o hash das senhas (padrão: IMPORTACAO_PROCESSOS ou nº de CPUs).")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['arquivo'], encoding='utf-8-sig', newline='') as arquivo:
+                criados, erros = importar_usuarios(arquivo, options['bloco'], options['processos'])
+        except (OSError, ArquivoInvalido, UnicodeDecodeError) as e:
+            raise CommandError(str(e))
+
+        if erros:
+            if options['relatorio']:
+                with open(options['relatorio'], 'w', encoding='utf-8-sig', newline='') as saida:
+                    escrever_relatorio(erros, saida)
+            else:
+                escrever_relatorio(erros, sys.stdout)
+        self.stdout.write(self.style.SUCCESS(f"{criados} usuário(s) importado(s), {len(erros)} linha(s) recusada(s)."))
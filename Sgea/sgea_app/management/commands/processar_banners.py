@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from sgea_app.banners import limpar_orfaos, processar_pendentes
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera as versões redimensionadas (WebP e JPEG) dos banners novos ou trocados e apaga as que "
+        "ficaram sem uso. Com --intervalo, roda continuamente como worker periódico."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--intervalo', type=float, default=0,
+                            help="Segundos entre execuções. 0 (padrão) executa uma única vez.")
+        parser.add_argument('--processos', type=int, default=None,
+                            help="Processos para redimensionar as imagens (padrão: BANNERS_PROCESSOS ou nº de CPUs).")
+        parser.add_argument('--limpar-orfaos', action='store_true',
+                            help="Antes de processar, apaga originais e variantes que nenhum evento referencia.")
+
+    def handle(self, *args, **options):
+        if options['limpar_orfaos']:
+            apagados = limpar_orfaos()
+            self.stdout.write(self.style.SUCCESS(f"{apagados} arquivo(s) órfão(s) apagado(s)."))
+
+        intervalo = options['intervalo']
+        while True:
+            processados = processar_pendentes(processos=options['processos'])
+            if processados or not intervalo:
+                self.stdout.write(self.style.SUCCESS(f"{processados} banner(s) processado(s)."))
+            if not intervalo:
+                break
+            close_old_connections()
+            time.sleep(intervalo)
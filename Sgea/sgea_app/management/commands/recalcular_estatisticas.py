@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from sgea_app.estatisticas import reconstruir
+from sgea_app.models import Evento
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstrói as estatísticas dos eventos (inscritos, presentes, certificados e inscrições por dia) "
+        "a partir das inscrições e certificados existentes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('eventos', nargs='*', type=int, help="IDs dos eventos (padrão: todos).")
+
+    def handle(self, *args, **options):
+        eventos = Evento.objects.filter(pk__in=options['eventos']) if options['eventos'] else None
+        total = reconstruir(eventos)
+        self.stdout.write(self.style.SUCCESS(f"Estatísticas recalculadas para {total} evento(s)."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from sgea_app.inscricoes import recalcular_vagas_ocupadas
+
+
+class Command(BaseCommand):
+    help = "Reconstrói o contador Evento.vagas_ocupadas a partir das inscrições existentes."
+
+    def handle(self, *args, **options):
+        total = recalcular_vagas_ocupadas()
+        self.stdout.write(self.style.SUCCESS(f"Contador de vagas recalculado para {total} evento(s)."))
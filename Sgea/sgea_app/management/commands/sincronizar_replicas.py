@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from sgea_app.replicas import aliases_replicas, sincronizar_sqlite
+
+
+class Command(BaseCommand):
+    help = (
+        "Copia o banco SQLite do primário para os arquivos das réplicas (DB_REPLICAS), para testar "
+        "localmente as leituras em réplica. Com --intervalo, repete a cópia simulando o atraso da replicação."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--intervalo', type=float, default=0,
+                            help="Segundos entre cópias. 0 (padrão) copia uma única vez.")
+
+    def handle(self, *args, **options):
+        if not aliases_replicas():
+            raise CommandError("Nenhuma réplica configurada: defina DB_REPLICAS no .env.")
+
+        intervalo = options['intervalo']
+        while True:
+            try:
+                atualizadas = sincronizar_sqlite()
+            except ValueError as e:
+                raise CommandError(str(e))
+            if not intervalo:
+                self.stdout.write(self.style.SUCCESS(f"Réplicas atualizadas: {', '.join(atualizadas)}."))
+                break
+            time.sleep(intervalo)
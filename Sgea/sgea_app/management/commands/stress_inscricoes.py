@@ -0,0 +1,139 @@
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from sgea_app import estatisticas, inscricoes
+from sgea_app.models import Evento, Inscricao, Usuario
+
+
+class Command(BaseCommand):
+    help = (
+        "Teste de estresse do serviço de inscrição: centenas de threads disputando as vagas de um "
+        "único evento, com a vazão em inscrições/s. No SQLite roda em um banco temporário (migrado a "
+        "cada execução); no PostgreSQL usa o banco do .env, com dados temporários removidos ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=300, help="Quantidade de threads concorrentes.")
+        parser.add_argument('--vagas', type=int, default=100, help="Limite de vagas do evento de teste.")
+        parser.add_argument('--repeticoes', type=int, default=2,
+                            help="Tentativas por thread (a partir da segunda, exercita inscrição duplicada).")
+        parser.add_argument('--executar', action='store_true', help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['executar'] or settings.DB_ENGINE == 'postgresql':
+            self._executar(options['threads'], options['vagas'], options['repeticoes'])
+            return
+
+        # SQLite: o teste roda em outro processo, apontado para uma cópia migrada e vazia do banco
+        diretorio = tempfile.mkdtemp(prefix='stress_inscricoes_')
+        try:
+            ambiente = {**os.environ, 'DB_NAME': os.path.join(diretorio, 'stress.sqlite3')}
+            self.stdout.write("Criando o banco temporário (migrate)...")
+            processo = self._manage(['migrate', '-v0'], ambiente)
+            if processo.returncode:
+                raise CommandError(processo.stderr.strip() or processo.stdout.strip())
+
+            processo = self._manage([
+                'stress_inscricoes', '--executar', '--threads', str(options['threads']),
+                '--vagas', str(options['vagas']), '--repeticoes', str(options['repeticoes']),
+            ], ambiente)
+            self.stdout.write(processo.stdout, ending='')
+            if processo.returncode:
+                raise CommandError(processo.stderr.strip() or "O teste de estresse falhou.")
+        finally:
+            shutil.rmtree(diretorio, ignore_errors=True)
+
+    def _manage(self, argumentos, ambiente):
+        return subprocess.run(
+            [sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'), *argumentos],
+            env=ambiente, capture_output=True, text=True,
+        )
+
+    # --- Execução ---
+
+    def _executar(self, n_threads, vagas, repeticoes):
+        prefixo = f"stress_{uuid.uuid4().hex[:8]}"
+
+        Usuario.objects.bulk_create([
+            Usuario(username=f"{prefixo}_{i}", email=f"{prefixo}_{i}@teste.local",
+                    instituicao_ensino="Teste", password="!")
+            for i in range(n_threads)
+        ], batch_size=1000)
+        usuarios = list(Usuario.objects.filter(username__startswith=prefixo))
+        agora = timezone.now()
+        # bulk_create evita o full_clean() de Evento.save(), que exigiria organizador e professor
+        evento, = Evento.objects.bulk_create([Evento(
+            nome=prefixo, tipo_evento='outro', local="Teste de estresse",
+            data_inicio=agora + timedelta(days=1), data_fim=agora + timedelta(days=2),
+            quantidade_participantes=vagas,
+        )])
+        estatisticas.criar([evento.pk])
+
+        resultados = {'ok': 0, 'esgotado': 0, 'duplicado': 0, 'erro': 0}
+        trava = threading.Lock()
+        largada = threading.Barrier(n_threads + 1)
+
+        def participante(usuario):
+            largada.wait()
+            try:
+                for _ in range(repeticoes):
+                    try:
+                        inscricoes.inscrever(usuario, evento)
+                        chave = 'ok'
+                    except inscricoes.VagasEsgotadas:
+                        chave = 'esgotado'
+                    except inscricoes.JaInscrito:
+                        chave = 'duplicado'
+                    except Exception as e:  # ex: "database is locked" no SQLite
+                        chave = 'erro'
+                        self.stderr.write(f"{usuario.username}: {e}")
+                    with trava:
+                        resultados[chave] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=participante, args=(u,)) for u in usuarios]
+        for t in threads:
+            t.start()
+        # O relógio começa quando todas as threads já existem e são liberadas juntas
+        largada.wait()
+        inicio = time.perf_counter()
+        for t in threads:
+            t.join()
+        duracao = time.perf_counter() - inicio
+
+        try:
+            inscritos = Inscricao.objects.filter(evento=evento).count()
+            evento.refresh_from_db()
+            tentativas = n_threads * repeticoes
+
+            self.stdout.write(f"Threads: {n_threads} | Vagas: {vagas} | Tentativas: {tentativas}")
+            self.stdout.write(
+                f"Sucesso: {resultados['ok']} | Esgotado: {resultados['esgotado']} | "
+                f"Duplicado: {resultados['duplicado']} | Erros: {resultados['erro']}"
+            )
+            self.stdout.write(f"Inscrições no banco: {inscritos} | Contador vagas_ocupadas: {evento.vagas_ocupadas}")
+            self.stdout.write(
+                f"Tempo: {duracao:.2f}s | {tentativas / duracao:.0f} tentativas/s | "
+                f"{resultados['ok'] / duracao:.0f} inscrições/s"
+            )
+
+            if inscritos > vagas or inscritos != evento.vagas_ocupadas or inscritos != resultados['ok']:
+                raise CommandError("Inconsistência detectada: houve overselling ou o contador divergiu.")
+            self.stdout.write(self.style.SUCCESS("Nenhuma vaga vendida além do limite."))
+        finally:
+            evento.delete()
+            Usuario.objects.filter(username__startswith=prefixo).delete()
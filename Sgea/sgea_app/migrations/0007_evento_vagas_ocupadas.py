@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:49
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def preencher_vagas_ocupadas(apps, schema_editor):
+    Evento = apps.get_model('sgea_app', 'Evento')
+    Inscricao = apps.get_model('sgea_app', 'Inscricao')
+    total = (
+        Inscricao.objects.filter(evento=OuterRef('pk'))
+        .order_by().values('evento').annotate(total=Count('pk')).values('total')
+    )
+    Evento.objects.update(
+        vagas_ocupadas=Coalesce(Subquery(total, output_field=IntegerField()), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sgea_app', '0006_alter_logauditoria_acao_alter_logauditoria_detalhes_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evento',
+            name='vagas_ocupadas',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Contador de inscrições mantido por sgea_app.inscricoes (não editar manualmente).'),
+        ),
+        migrations.RunPython(preencher_vagas_ocupadas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sgea_app', '0008_logauditoria_data_hora_default'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='logauditoria',
+            index=models.Index(fields=['-data_hora', '-id'], name='log_data_hora_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logauditoria',
+            index=models.Index(fields=['acao', '-data_hora'], name='log_acao_data_hora_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logauditoria',
+            index=models.Index(fields=['usuario', '-data_hora'], name='log_usuario_data_hora_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sgea_app', '0009_logauditoria_indices'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='certificado',
+            name='data_emissao',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sgea_app', '0010_certificado_data_emissao_indice'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['data_inicio', 'id'], name='evento_data_inicio_idx'),
+        ),
+    ]
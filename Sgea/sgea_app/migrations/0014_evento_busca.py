@@ -0,0 +1,151 @@
+from django.db import migrations
+
+# Índice de busca textual de eventos (nome, local, tipo e nome do professor responsável),
+# mantido por triggers no próprio banco: cobre save/delete pelo ORM, bulk_create e SQL direto.
+
+# Cópia do SQL de sgea_app.busca.SQLITE_TRIGGERS na época desta migração: importar o módulo faria
+# qualquer mudança posterior nele alterar o que esta migração executa.
+SQLITE_TRIGGERS = {
+    'evento_busca_insercao': """
+        CREATE TRIGGER evento_busca_insercao AFTER INSERT ON evento BEGIN
+            INSERT INTO evento_busca (rowid, nome, local, tipo, professor)
+            VALUES (new.id, new.nome, new.local, new.tipo_evento, COALESCE(
+                (SELECT first_name || ' ' || last_name FROM usuario WHERE id = new.professor_responsavel_id), ''
+            ));
+        END
+    """,
+    'evento_busca_alteracao': """
+        CREATE TRIGGER evento_busca_alteracao AFTER UPDATE OF nome, local, tipo_evento, professor_responsavel_id ON evento BEGIN
+            UPDATE evento_busca SET nome = new.nome, local = new.local, tipo = new.tipo_evento, professor = COALESCE(
+                (SELECT first_name || ' ' || last_name FROM usuario WHERE id = new.professor_responsavel_id), ''
+            ) WHERE rowid = new.id;
+        END
+    """,
+    'evento_busca_exclusao': """
+        CREATE TRIGGER evento_busca_exclusao AFTER DELETE ON evento BEGIN
+            DELETE FROM evento_busca WHERE rowid = old.id;
+        END
+    """,
+    'evento_busca_professor': """
+        CREATE TRIGGER evento_busca_professor AFTER UPDATE OF first_name, last_name ON usuario BEGIN
+            UPDATE evento_busca SET professor = new.first_name || ' ' || new.last_name
+            WHERE rowid IN (SELECT id FROM evento WHERE professor_responsavel_id = new.id);
+        END
+    """,
+}
+
+SQLITE_CRIAR = [
+    """
+    CREATE VIRTUAL TABLE evento_busca USING fts5(
+        nome, local, tipo, professor,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    INSERT INTO evento_busca (rowid, nome, local, tipo, professor)
+    SELECT e.id, e.nome, e.local, e.tipo_evento, COALESCE(u.first_name || ' ' || u.last_name, '')
+    FROM evento e LEFT JOIN usuario u ON u.id = e.professor_responsavel_id
+    """,
+    *SQLITE_TRIGGERS.values(),
+]
+
+SQLITE_REMOVER = [
+    *(f"DROP TRIGGER IF EXISTS {nome}" for nome in reversed(list(SQLITE_TRIGGERS))),
+    "DROP TABLE IF EXISTS evento_busca",
+]
+
+# PostgreSQL: tsvector com pesos (nome > professor > local > tipo), configuração em português sem acentos
+POSTGRES_CRIAR = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    "CREATE TEXT SEARCH CONFIGURATION sgea_pt (COPY = portuguese)",
+    "ALTER TEXT SEARCH CONFIGURATION sgea_pt ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem",
+    "CREATE TABLE evento_busca (evento_id integer PRIMARY KEY, documento tsvector NOT NULL)",
+    "CREATE INDEX evento_busca_documento_idx ON evento_busca USING GIN (documento)",
+    """
+    CREATE FUNCTION evento_busca_atualizar(alvo integer) RETURNS void AS $$
+        INSERT INTO evento_busca (evento_id, documento)
+        SELECT e.id,
+               setweight(to_tsvector('sgea_pt', e.nome), 'A')
+               || setweight(to_tsvector('sgea_pt', COALESCE(u.first_name || ' ' || u.last_name, '')), 'B')
+               || setweight(to_tsvector('sgea_pt', e.local), 'C')
+               || setweight(to_tsvector('sgea_pt', e.tipo_evento), 'D')
+        FROM evento e LEFT JOIN usuario u ON u.id = e.professor_responsavel_id
+        WHERE e.id = alvo
+        ON CONFLICT (evento_id) DO UPDATE SET documento = excluded.documento;
+    $$ LANGUAGE sql
+    """,
+    """
+    CREATE FUNCTION evento_busca_sincronizar() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            DELETE FROM evento_busca WHERE evento_id = OLD.id;
+        ELSE
+            PERFORM evento_busca_atualizar(NEW.id);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER evento_busca_sincronizar
+    AFTER INSERT OR DELETE OR UPDATE OF nome, local, tipo_evento, professor_responsavel_id ON evento
+    FOR EACH ROW EXECUTE FUNCTION evento_busca_sincronizar()
+    """,
+    """
+    CREATE FUNCTION evento_busca_professor() RETURNS trigger AS $$
+    BEGIN
+        PERFORM evento_busca_atualizar(id) FROM evento WHERE professor_responsavel_id = NEW.id;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER evento_busca_professor
+    AFTER UPDATE OF first_name, last_name ON usuario
+    FOR EACH ROW EXECUTE FUNCTION evento_busca_professor()
+    """,
+    "SELECT evento_busca_atualizar(id) FROM evento",
+]
+
+POSTGRES_REMOVER = [
+    "DROP TRIGGER IF EXISTS evento_busca_professor ON usuario",
+    "DROP TRIGGER IF EXISTS evento_busca_sincronizar ON evento",
+    "DROP FUNCTION IF EXISTS evento_busca_professor()",
+    "DROP FUNCTION IF EXISTS evento_busca_sincronizar()",
+    "DROP FUNCTION IF EXISTS evento_busca_atualizar(integer)",
+    "DROP TABLE IF EXISTS evento_busca",
+    "DROP TEXT SEARCH CONFIGURATION IF EXISTS sgea_pt",
+]
+
+
+def _executar(schema_editor, comandos):
+    for comando in comandos:
+        schema_editor.execute(comando)
+
+
+def criar_indice_busca(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _executar(schema_editor, SQLITE_CRIAR)
+    elif vendor == 'postgresql':
+        _executar(schema_editor, POSTGRES_CRIAR)
+    # Outros bancos: sgea_app.busca recorre a icontains
+
+
+def remover_indice_busca(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _executar(schema_editor, SQLITE_REMOVER)
+    elif vendor == 'postgresql':
+        _executar(schema_editor, POSTGRES_REMOVER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sgea_app', '0013_usuario_indices_login'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice_busca, remover_indice_busca),
+    ]
@@ -0,0 +1,70 @@
+from django.db import migrations, models
+
+# No SQLite, adicionar coluna NOT NULL recria a tabela evento: os triggers do índice de busca
+# (0014) sobre evento seriam descartados e o de usuario impede a troca de tabela. Eles são
+# removidos antes e recriados depois; o SQL é copiado de sgea_app.busca.SQLITE_TRIGGERS (o da
+# época desta migração) para que mudanças posteriores no módulo não a alterem.
+
+SQLITE_TRIGGERS = {
+    'evento_busca_insercao': """
+        CREATE TRIGGER evento_busca_insercao AFTER INSERT ON evento BEGIN
+            INSERT INTO evento_busca (rowid, nome, local, tipo, professor)
+            VALUES (new.id, new.nome, new.local, new.tipo_evento, COALESCE(
+                (SELECT first_name || ' ' || last_name FROM usuario WHERE id = new.professor_responsavel_id), ''
+            ));
+        END
+    """,
+    'evento_busca_alteracao': """
+        CREATE TRIGGER evento_busca_alteracao AFTER UPDATE OF nome, local, tipo_evento, professor_responsavel_id ON evento BEGIN
+            UPDATE evento_busca SET nome = new.nome, local = new.local, tipo = new.tipo_evento, professor = COALESCE(
+                (SELECT first_name || ' ' || last_name FROM usuario WHERE id = new.professor_responsavel_id), ''
+            ) WHERE rowid = new.id;
+        END
+    """,
+    'evento_busca_exclusao': """
+        CREATE TRIGGER evento_busca_exclusao AFTER DELETE ON evento BEGIN
+            DELETE FROM evento_busca WHERE rowid = old.id;
+        END
+    """,
+    'evento_busca_professor': """
+        CREATE TRIGGER evento_busca_professor AFTER UPDATE OF first_name, last_name ON usuario BEGIN
+            UPDATE evento_busca SET professor = new.first_name || ' ' || new.last_name
+            WHERE rowid IN (SELECT id FROM evento WHERE professor_responsavel_id = new.id);
+        END
+    """,
+}
+
+
+def remover_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for nome in reversed(list(SQLITE_TRIGGERS)):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {nome}")
+
+
+def criar_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        remover_triggers(apps, schema_editor)
+        for comando in SQLITE_TRIGGERS.values():
+            schema_editor.execute(comando)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sgea_app', '0015_evento_data_fim_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(remover_triggers, criar_triggers),
+        migrations.AddField(
+            model_name='evento',
+            name='banner_processado',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Banner cujas variantes estão em banner_variantes (mantido por sgea_app.banners).', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='evento',
+            name='banner_variantes',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Versões redimensionadas do banner geradas por sgea_app.banners (não editar manualmente).'),
+        ),
+        migrations.RunPython(criar_triggers, remover_triggers),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def preencher_estatisticas(apps, schema_editor):
+    Evento = apps.get_model('sgea_app', 'Evento')
+    Inscricao = apps.get_model('sgea_app', 'Inscricao')
+    Certificado = apps.get_model('sgea_app', 'Certificado')
+    EstatisticaEvento = apps.get_model('sgea_app', 'EstatisticaEvento')
+    EstatisticaDia = apps.get_model('sgea_app', 'EstatisticaDia')
+
+    totais = {
+        linha['evento_id']: linha for linha in Inscricao.objects.order_by().values('evento_id').annotate(
+            inscritos=Count('pk'), presentes=Count('pk', filter=Q(presenca=True))
+        )
+    }
+    certificados = dict(
+        Certificado.objects.order_by().values('inscricao__evento_id').annotate(total=Count('pk'))
+        .values_list('inscricao__evento_id', 'total')
+    )
+    EstatisticaEvento.objects.bulk_create([
+        EstatisticaEvento(
+            evento_id=pk,
+            inscritos=totais.get(pk, {}).get('inscritos', 0),
+            presentes=totais.get(pk, {}).get('presentes', 0),
+            certificados=certificados.get(pk, 0),
+        )
+        for pk in Evento.objects.values_list('pk', flat=True)
+    ], batch_size=1000)
+    EstatisticaDia.objects.bulk_create([
+        EstatisticaDia(evento_id=pk, dia=dia, inscricoes=total)
+        for pk, dia, total in Inscricao.objects.order_by()
+        .annotate(dia=TruncDate('data_inscricao', tzinfo=timezone.get_default_timezone()))
+        .values('evento_id', 'dia').annotate(total=Count('pk')).values_list('evento_id', 'dia', 'total')
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sgea_app', '0016_evento_banner_variantes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstatisticaEvento',
+            fields=[
+                ('evento', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='estatistica', serialize=False, to='sgea_app.evento')),
+                ('inscritos', models.PositiveIntegerField(default=0)),
+                ('presentes', models.PositiveIntegerField(default=0)),
+                ('certificados', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Estatística de Evento',
+                'verbose_name_plural': 'Estatísticas de Eventos',
+                'db_table': 'estatistica_evento',
+            },
+        ),
+        migrations.CreateModel(
+            name='EstatisticaDia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField()),
+                ('inscricoes', models.PositiveIntegerField(default=0)),
+                ('evento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='estatisticas_dia', to='sgea_app.evento')),
+            ],
+            options={
+                'verbose_name': 'Inscrições por Dia',
+                'verbose_name_plural': 'Inscrições por Dia',
+                'db_table': 'estatistica_dia',
+                'ordering': ['evento', 'dia'],
+                'unique_together': {('evento', 'dia')},
+            },
+        ),
+        migrations.RunPython(preencher_estatisticas, migrations.RunPython.noop),
+    ]
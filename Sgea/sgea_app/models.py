@@ -1,12 +1,35 @@
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.conf import settings
 from django.core.validators import FileExtensionValidator, MinValueValidator
 from django.core.exceptions import ValidationError
 from django.utils import timezone
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest, Lower
 
 # --- Modelos de Usuário ---
 
+class UsuarioManager(UserManager):
+    def por_login(self, login):
+        """
+        Usuários cujo username ou e-mail coincide com `login`, sem diferenciar maiúsculas, com quem
+        tem esse username primeiro e, depois, do cadastro mais antigo ao mais novo: o username de um
+        usuário igual ao e-mail de outro continua levando ao dono do username.
+        Compara LOWER(coluna) = LOWER(valor) para usar os índices funcionais de Usuario
+        (o __iexact do SQLite vira LIKE e percorre a tabela inteira).
+        """
+        valor = Lower(Value(login))
+        return self.alias(username_lower=Lower('username'), email_lower=Lower('email')).filter(
+            Q(username_lower=valor) | Q(email_lower=valor)
+        ).alias(
+            pelo_email=Case(When(username_lower=valor, then=Value(0)), default=Value(1))
+        ).order_by('pelo_email', 'id')
+
+    def com_email(self, email):
+        """Usuários com o e-mail informado, sem diferenciar maiúsculas (usa o índice de e-mail)."""
+        return self.alias(email_lower=Lower('email')).filter(email_lower=Lower(Value(email)))
+
+
 class Usuario(AbstractUser):
     PERFIL_CHOICES = (
         ('aluno', 'Aluno'),
@@ -18,8 +41,15 @@ class Usuario(AbstractUser):
     instituicao_ensino = models.CharField(max_length=255, blank=True, null=True, help_text="Instituição de ensino (obrigatório para alunos e professores).")
     perfil = models.CharField(max_length=15, choices=PERFIL_CHOICES, default='aluno', help_text="Perfil do usuário no sistema.")
 
+    objects = UsuarioManager()
+
     class Meta:
         db_table = "usuario"
+        indexes = [
+            # Login por username ou e-mail sem diferenciar maiúsculas (UsuarioManager.por_login)
+            models.Index(Lower('username'), name='usuario_username_lower_idx'),
+            models.Index(Lower('email'), name='usuario_email_lower_idx'),
+        ]
         verbose_name = "Usuário"
         verbose_name_plural = "Usuários"
 
@@ -32,11 +62,62 @@ class Usuario(AbstractUser):
             raise ValueError("Instituição de ensino é obrigatória para alunos e professores.")
         super().save(*args, **kwargs)
 
+    def get_session_auth_hash(self):
+        # Cópias do cache de identidades não trazem a senha, só o hash de sessão derivado dela
+        # (válido enquanto a senha não for carregada ou trocada nesta instância)
+        hash_sessao = self.__dict__.get('hash_sessao')
+        if hash_sessao is not None and 'password' not in self.__dict__:
+            return hash_sessao
+        return super().get_session_auth_hash()
+
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.username})"
 
 # --- Modelos de Evento ---
 
+def subconsulta_contagem(queryset):
+    """Transforma um queryset correlacionado com o evento em uma subconsulta COUNT(*)."""
+    subconsulta = queryset.order_by().values('evento').annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(subconsulta, output_field=IntegerField()), Value(0))
+
+
+class EventoQuerySet(models.QuerySet):
+    def com_vagas(self):
+        """Anota inscritos e vagas restantes a partir do contador vagas_ocupadas (sem subconsultas)."""
+        return self.annotate(
+            inscritos=F('vagas_ocupadas'),
+            vagas_restantes=Greatest(F('quantidade_participantes') - F('vagas_ocupadas'), Value(0)),
+        )
+
+    def com_ocupacao(self):
+        """
+        Anota inscritos, presentes, certificados emitidos e vagas restantes.
+        Tudo é resolvido na mesma consulta da listagem, evitando um COUNT por linha no template.
+        """
+        inscricoes = Inscricao.objects.filter(evento=OuterRef('pk'))
+        return self.com_vagas().annotate(
+            presentes=subconsulta_contagem(inscricoes.filter(presenca=True)),
+            certificados_emitidos=subconsulta_contagem(inscricoes.filter(certificado__isnull=False)),
+        )
+
+    def com_estatisticas(self):
+        """
+        Como com_ocupacao(), mas lendo presentes e certificados de EstatisticaEvento
+        (um LEFT JOIN em vez de duas subconsultas de contagem por linha).
+        """
+        return self.com_vagas().annotate(
+            presentes=Coalesce('estatistica__presentes', 0),
+            certificados_emitidos=Coalesce('estatistica__certificados', 0),
+        )
+
+    def abertos(self):
+        """Eventos que ainda não terminaram e têm vagas."""
+        return self.filter(
+            data_fim__gte=timezone.now(),
+            vagas_ocupadas__lt=F('quantidade_participantes'),
+        )
+
+
 class Evento(models.Model):
     """
     Modelo para armazenar as informações dos eventos.
@@ -58,6 +139,10 @@ class Evento(models.Model):
         default=0,
         validators=[MinValueValidator(0)],
         help_text="Número máximo de participantes permitidos.")
+    vagas_ocupadas = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Contador de inscrições mantido por sgea_app.inscricoes (não editar manualmente).")
     banner = models.ImageField(
         upload_to='eventos/banners/',
         blank=True,
@@ -65,6 +150,17 @@ class Evento(models.Model):
         help_text="Imagem promocional do evento (apenas .jpg, .png, .jpeg).",
         validators=[FileExtensionValidator(allowed_extensions=['jpg', 'jpeg', 'png'])]
     )
+    banner_processado = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        editable=False,
+        help_text="Banner cujas variantes estão em banner_variantes (mantido por sgea_app.banners).")
+    banner_variantes = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text="Versões redimensionadas do banner geradas por sgea_app.banners (não editar manualmente).")
     organizador = models.ForeignKey(
         settings.AUTH_USER_MODEL, 
         on_delete=models.SET_NULL, 
@@ -90,9 +186,17 @@ class Evento(models.Model):
     data_criacao = models.DateTimeField(auto_now_add=True)
     data_atualizacao = models.DateTimeField(auto_now=True)
 
+    objects = EventoQuerySet.as_manager()
+
     class Meta:
         db_table = "evento"
         ordering = ["-data_inicio", "nome"]
+        indexes = [
+            # Paginação por cursor da API (/api/eventos/)
+            models.Index(fields=['data_inicio', 'id'], name='evento_data_inicio_idx'),
+            # Eventos ainda não encerrados (painel do participante, ?abertos=1 da API)
+            models.Index(fields=['data_fim'], name='evento_data_fim_idx'),
+        ]
         verbose_name = "Evento"
         verbose_name_plural = "Eventos"
 
@@ -107,6 +211,12 @@ class Evento(models.Model):
 
     def save(self, *args, **kwargs):
         self.full_clean()  # Chama o clean() antes de salvar
+        # Em edições, nunca sobrescreve o contador de vagas com o valor (possivelmente antigo) da instância.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                campo.name for campo in self._meta.concrete_fields
+                if not campo.primary_key and campo.name != 'vagas_ocupadas'
+            ]
         super().save(*args, **kwargs)
 
     @property
@@ -144,7 +254,8 @@ class Certificado(models.Model):
     """
     inscricao = models.OneToOneField(Inscricao, on_delete=models.CASCADE, primary_key=True, help_text="A inscrição que deu origem a este certificado.")
     codigo_validacao = models.CharField(max_length=50, unique=True, help_text="Código único para validação do certificado.")
-    data_emissao = models.DateTimeField(auto_now_add=True)
+    # Indexado para a sincronização incremental do índice de validação (sgea_app.validacao)
+    data_emissao = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
         db_table = "certificado"
@@ -154,6 +265,47 @@ class Certificado(models.Model):
     def __str__(self):
         return f"Certificado para {self.inscricao.usuario.username} no evento {self.inscricao.evento.nome}"
 
+
+class EstatisticaEvento(models.Model):
+    """Totais do evento mantidos de forma incremental por sgea_app.estatisticas (não editar manualmente)."""
+    evento = models.OneToOneField(Evento, on_delete=models.CASCADE, primary_key=True, related_name='estatistica')
+    inscritos = models.PositiveIntegerField(default=0)
+    presentes = models.PositiveIntegerField(default=0)
+    certificados = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "estatistica_evento"
+        verbose_name = "Estatística de Evento"
+        verbose_name_plural = "Estatísticas de Eventos"
+
+    @property
+    def taxa_presenca(self):
+        """Percentual de inscritos presentes (None sem inscritos)."""
+        if not self.inscritos:
+            return None
+        return round(100 * self.presentes / self.inscritos, 1)
+
+    def __str__(self):
+        return f"Estatísticas de {self.evento_id}: {self.inscritos} inscritos, {self.presentes} presentes"
+
+
+class EstatisticaDia(models.Model):
+    """Inscrições atuais do evento por dia em que foram feitas (canceladas saem do dia de origem)."""
+    evento = models.ForeignKey(Evento, on_delete=models.CASCADE, related_name='estatisticas_dia')
+    dia = models.DateField()
+    inscricoes = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "estatistica_dia"
+        unique_together = ('evento', 'dia')
+        ordering = ['evento', 'dia']
+        verbose_name = "Inscrições por Dia"
+        verbose_name_plural = "Inscrições por Dia"
+
+    def __str__(self):
+        return f"Evento {self.evento_id} em {self.dia}: {self.inscricoes} inscrição(ões)"
+
+
 class LogAuditoria(models.Model):
     ACAO_CHOICES = (
         ('criacao_usuario', 'Criação de Usuário'),
@@ -176,13 +328,53 @@ class LogAuditoria(models.Model):
     )
     acao = models.CharField(max_length=50, choices=ACAO_CHOICES)
     detalhes = models.TextField(blank=True, null=True)
-    data_hora = models.DateTimeField(auto_now_add=True)
+    # default (e não auto_now_add) para preservar o horário da ação quando o log é gravado em lote
+    data_hora = models.DateTimeField(default=timezone.now, editable=False)
     ip_usuario = models.GenericIPAddressField(blank=True, null=True)
 
     class Meta:
         ordering = ['-data_hora']
+        indexes = [
+            # Listagem e paginação por chave (data_hora, id) no painel de auditoria
+            models.Index(fields=['-data_hora', '-id'], name='log_data_hora_idx'),
+            models.Index(fields=['acao', '-data_hora'], name='log_acao_data_hora_idx'),
+            models.Index(fields=['usuario', '-data_hora'], name='log_usuario_data_hora_idx'),
+        ]
         verbose_name = "Log de Auditoria"
         verbose_name_plural = "Logs de Auditoria"
 
     def __str__(self):
-        return f"[{self.data_hora}] {self.usuario} - {self.get_acao_display()}"
\ No newline at end of file
+        return f"[{self.data_hora}] {self.usuario} - {self.get_acao_display()}"
+
+class EmailPendente(models.Model):
+    """Caixa de saída: e-mails gravados na mesma transação da ação e enviados depois pelo worker."""
+    SITUACAO_CHOICES = (
+        ('pendente', 'Pendente'),
+        ('enviado', 'Enviado'),
+        ('falhou', 'Falhou'),
+    )
+
+    destinatario = models.EmailField()
+    assunto = models.CharField(max_length=255)
+    corpo = models.TextField()
+    html = models.BooleanField(default=True)
+    situacao = models.CharField(max_length=10, choices=SITUACAO_CHOICES, default='pendente')
+    tentativas = models.PositiveSmallIntegerField(default=0)
+    proxima_tentativa = models.DateTimeField(default=timezone.now)
+    # Identifica o worker que reservou o e-mail (evita envio duplicado com vários workers)
+    reservado_por = models.CharField(max_length=32, blank=True, default='')
+    ultimo_erro = models.TextField(blank=True, default='')
+    data_criacao = models.DateTimeField(auto_now_add=True)
+    data_envio = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "email_pendente"
+        indexes = [
+            # Busca do worker: pendentes cuja próxima tentativa já venceu
+            models.Index(fields=['situacao', 'proxima_tentativa'], name='email_pendente_fila_idx'),
+        ]
+        verbose_name = "E-mail Pendente"
+        verbose_name_plural = "E-mails Pendentes"
+
+    def __str__(self):
+        return f"{self.assunto} -> {self.destinatario} ({self.get_situacao_display()})"
@@ -0,0 +1,129 @@
+# sgea_app/notificacoes.py
+"""
+Hub de notificações em processo para conexões de longa duração (SSE via ASGI).
+
+Cada conexão em espera é apenas um asyncio.Future registrado em um canal; publicar
+em um canal resolve todos os futures daquele canal (de qualquer thread).
+Para vários processos/servidores, o backend 'redis' replica as publicações via pub/sub.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+logger = logging.getLogger(__name__)
+
+
+class HubNotificacoes:
+    def __init__(self):
+        self._assinantes = defaultdict(set)
+        self._trava = threading.Lock()
+
+    def assinar(self, canal):
+        """Registra a conexão atual no canal e retorna o Future que será resolvido na publicação."""
+        futuro = asyncio.get_running_loop().create_future()
+        with self._trava:
+            self._assinantes[canal].add(futuro)
+        return futuro
+
+    def cancelar(self, canal, futuro):
+        with self._trava:
+            assinantes = self._assinantes.get(canal)
+            if assinantes is not None:
+                assinantes.discard(futuro)
+                if not assinantes:
+                    del self._assinantes[canal]
+
+    def entregar(self, canal, mensagem):
+        """Resolve todos os assinantes do canal neste processo (seguro para chamar de qualquer thread)."""
+        with self._trava:
+            assinantes = self._assinantes.pop(canal, ())
+        for futuro in assinantes:
+            futuro.get_loop().call_soon_threadsafe(_resolver, futuro, mensagem)
+        return len(assinantes)
+
+    def total_assinantes(self):
+        with self._trava:
+            return sum(len(assinantes) for assinantes in self._assinantes.values())
+
+
+def _resolver(futuro, mensagem):
+    if not futuro.done():
+        futuro.set_result(mensagem)
+
+
+# --- Backends de Publicação ---
+
+class BackendLocal:
+    """Entrega apenas às conexões deste processo."""
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    def publicar(self, canal, mensagem):
+        self.hub.entregar(canal, mensagem)
+
+
+class BackendRedis:
+    """
+    Replica as publicações entre processos via Redis pub/sub.
+    Cada processo mantém uma thread escutando o padrão de canais e repassa ao hub local.
+    Requer o pacote opcional 'redis' (pip install redis).
+    """
+    PREFIXO = 'sgea:notificacoes:'
+
+    def __init__(self, hub, url):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured("NOTIFICACOES_BACKEND='redis' requer o pacote 'redis' instalado.")
+        self.hub = hub
+        self.cliente = redis.Redis.from_url(url)
+        self._thread = threading.Thread(target=self._escutar, name='notificacoes-redis', daemon=True)
+        self._thread.start()
+
+    def publicar(self, canal, mensagem):
+        self.cliente.publish(self.PREFIXO + canal, json.dumps(mensagem))
+
+    def _escutar(self):
+        pubsub = self.cliente.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(self.PREFIXO + '*')
+        for item in pubsub.listen():
+            try:
+                canal = item['channel'].decode('utf-8')[len(self.PREFIXO):]
+                self.hub.entregar(canal, json.loads(item['data']))
+            except Exception:
+                logger.exception("Mensagem de notificação inválida recebida do Redis.")
+
+
+hub = HubNotificacoes()
+_backend = None
+_backend_trava = threading.Lock()
+
+
+def obter_backend():
+    global _backend
+    if _backend is None:
+        with _backend_trava:
+            if _backend is None:
+                tipo = getattr(settings, 'NOTIFICACOES_BACKEND', 'local')
+                if tipo == 'local':
+                    _backend = BackendLocal(hub)
+                elif tipo == 'redis':
+                    _backend = BackendRedis(hub, settings.NOTIFICACOES_REDIS_URL)
+                else:
+                    raise ImproperlyConfigured(f"NOTIFICACOES_BACKEND inválido: {tipo!r}")
+    return _backend
+
+
+def publicar(canal, mensagem):
+    obter_backend().publicar(canal, mensagem)
+
+
+def canal_ativacao(user_id):
+    return f"usuario:{user_id}:ativacao"
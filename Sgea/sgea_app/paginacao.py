@@ -0,0 +1,84 @@
+# sgea_app/paginacao.py
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import Q
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+_EPOCA = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_MICROSSEGUNDO = timedelta(microseconds=1)
+
+
+# --- Cursores ---
+
+def codificar_cursor(data_hora, pk):
+    """Cursor opaco e seguro para URL: '<microssegundos desde a época>-<pk>'."""
+    return f"{(data_hora - _EPOCA) // _MICROSSEGUNDO}-{pk}"
+
+
+def decodificar_cursor(cursor):
+    """Retorna (data_hora, pk) ou None se o cursor for inválido."""
+    try:
+        micros, pk = cursor.split('-', 1)
+        return _EPOCA + timedelta(microseconds=int(micros)), int(pk)
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+
+# --- Paginação por Chave (Keyset / Seek) ---
+
+def paginar_keyset(queryset, campo, antes=None, apos=None, por_pagina=50):
+    """
+    Pagina um queryset em ordem decrescente de (campo, pk) sem OFFSET.
+
+    'antes' navega para itens mais antigos que o cursor e 'apos' para mais recentes.
+    Cada página é uma única consulta por faixa de índice, com custo constante
+    independentemente de quantas páginas já foram percorridas.
+    """
+    cursor_antes = decodificar_cursor(antes) if antes else None
+    cursor_apos = decodificar_cursor(apos) if apos else None
+
+    if cursor_apos:
+        valor, pk = cursor_apos
+        itens = list(
+            queryset.filter(Q(**{f'{campo}__gt': valor}) | Q(**{campo: valor, 'pk__gt': pk}))
+            .order_by(campo, 'pk')[:por_pagina + 1]
+        )
+        tem_mais_recentes = len(itens) > por_pagina
+        itens = itens[:por_pagina][::-1]
+        tem_mais_antigos = True
+    else:
+        if cursor_antes:
+            valor, pk = cursor_antes
+            queryset = queryset.filter(Q(**{f'{campo}__lt': valor}) | Q(**{campo: valor, 'pk__lt': pk}))
+        itens = list(queryset.order_by(f'-{campo}', '-pk')[:por_pagina + 1])
+        tem_mais_antigos = len(itens) > por_pagina
+        itens = itens[:por_pagina]
+        tem_mais_recentes = cursor_antes is not None
+
+    def cursor_de(item):
+        return codificar_cursor(getattr(item, campo), item.pk)
+
+    return {
+        'itens': itens,
+        'proximo': cursor_de(itens[-1]) if itens and tem_mais_antigos else None,
+        'anterior': cursor_de(itens[0]) if itens and tem_mais_recentes else None,
+    }
+
+
+# --- Paginação da API ---
+
+class EventoCursorPagination(CursorPagination):
+    """Cursor opaco sobre (data_inicio, id): custo por página constante, sem COUNT(*) da tabela."""
+    ordering = ('data_inicio', 'id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class EventoBuscaPagination(PageNumberPagination):
+    """Resultados da busca por relevância: páginas numeradas (a ordem não é um índice de data)."""
+    page_size = 20
+    page_query_param = 'pagina'
+    page_size_query_param = 'por_pagina'
+    max_page_size = 100
@@ -0,0 +1,123 @@
+# sgea_app/painel.py
+"""
+Seções do painel do participante (inscrições, eventos disponíveis, responsabilidade do professor e
+certificados), paginadas e carregadas separadamente pela página, com o HTML de cada página de
+seção em cache por usuário.
+
+A chave do fragmento inclui versões guardadas no cache, incrementadas pelos sinais (sgea_app.signals)
+e pelas operações em lote que não disparam sinais:
+- versão do usuário: inscrições e certificados dele;
+- versão dos eventos: save/delete de Evento (nome, datas, local...);
+- versão da listagem (cache_eventos): qualquer inscrição; só para a ocupação vista pelo professor.
+Eventos que terminam saem de "disponíveis" sem alteração no banco: TEMPO_FRAGMENTO limita esse atraso.
+"""
+
+import hashlib
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Exists, F, OuterRef
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from . import busca, cache_eventos, checkin
+from .models import Certificado, Evento, Inscricao
+
+CHAVE_VERSAO_EVENTOS = 'sgea:painel:eventos'
+PREFIXO_VERSAO_USUARIO = 'sgea:painel:usuario:'
+PREFIXO_FRAGMENTO = 'sgea:painel:fragmento'
+TEMPO_FRAGMENTO = 300  # segundos
+POR_PAGINA = 10
+
+# O token CSRF muda a cada login: o fragmento é guardado com um marcador, trocado na entrega
+_MARCADOR_CSRF = 'SGEA-CSRF-TOKEN'
+
+SECOES = ('responsavel', 'inscritos', 'disponiveis', 'certificados')
+
+
+# --- Versões ---
+
+def _incrementar(chave):
+    try:
+        cache.incr(chave)
+    except ValueError:
+        cache.set(chave, 1, None)
+
+
+def invalidar_eventos():
+    _incrementar(CHAVE_VERSAO_EVENTOS)
+
+
+def invalidar_usuarios(usuarios_ids):
+    for usuario_id in set(usuarios_ids):
+        _incrementar(f"{PREFIXO_VERSAO_USUARIO}{usuario_id}")
+
+
+def _versoes(usuario_id):
+    chave_usuario = f"{PREFIXO_VERSAO_USUARIO}{usuario_id}"
+    versoes = cache.get_many([CHAVE_VERSAO_EVENTOS, chave_usuario])
+    return versoes.get(CHAVE_VERSAO_EVENTOS, 0), versoes.get(chave_usuario, 0)
+
+
+# --- Consultas de cada seção ---
+
+def _consulta(secao, usuario, busca_texto):
+    if secao == 'responsavel':
+        return (
+            Evento.objects.com_vagas().filter(professor_responsavel=usuario)
+            .only('id', 'nome', 'local', 'data_inicio', 'data_fim', 'quantidade_participantes')
+            .order_by('-data_inicio', 'id')
+        )
+    if secao == 'inscritos':
+        # A anotação reaproveita o JOIN do filtro: id da inscrição do próprio usuário (para o ingresso)
+        return (
+            Evento.objects.filter(inscricoes__usuario=usuario)
+            .annotate(inscricao_id=F('inscricoes__id'))
+            .only('id', 'nome', 'data_inicio', 'data_fim', 'local')
+            .order_by('-data_inicio', 'id')
+        )
+    if secao == 'disponiveis':
+        # NOT EXISTS pelo índice único (usuario, evento); data_fim pelo evento_data_fim_idx
+        eventos = Evento.objects.filter(data_fim__gte=timezone.now()).exclude(
+            Exists(Inscricao.objects.filter(usuario=usuario, evento=OuterRef('pk')))
+        ).only('id', 'nome', 'tipo_evento', 'data_inicio', 'local', 'banner', 'banner_processado', 'banner_variantes')
+        if busca_texto:
+            return busca.ranquear(eventos, busca_texto)
+        return eventos.order_by('data_inicio', 'id')
+    return (
+        Certificado.objects.filter(inscricao__usuario=usuario)
+        .select_related('inscricao__evento')
+        .only('codigo_validacao', 'data_emissao', 'inscricao__evento__nome')
+        .order_by('-data_emissao', 'pk')
+    )
+
+
+# --- Fragmentos ---
+
+def _renderizar(secao, usuario, pagina, busca_texto):
+    pagina_obj = Paginator(_consulta(secao, usuario, busca_texto), POR_PAGINA).get_page(pagina)
+    if secao == 'inscritos':
+        for evento in pagina_obj:
+            evento.ingresso = checkin.gerar_ingresso(evento.inscricao_id, evento.pk)
+    return render_to_string(f'sgea_app/dashboard/painel/{secao}.html', {
+        'pagina': pagina_obj,
+        'busca_texto': busca_texto,
+        'csrf_token': _MARCADOR_CSRF,
+    })
+
+
+def fragmento(request, secao, pagina=None, busca_texto=''):
+    """HTML de uma página da seção para o usuário da requisição (do cache quando possível)."""
+    usuario = request.user
+    versao_eventos, versao_usuario = _versoes(usuario.pk)
+    partes = [secao, usuario.pk, versao_eventos, versao_usuario, pagina or 1, busca_texto]
+    if secao == 'responsavel':
+        partes.append(cache_eventos.versao())
+    chave = f"{PREFIXO_FRAGMENTO}:{hashlib.sha256(repr(partes).encode('utf-8')).hexdigest()}"
+
+    html = cache.get(chave)
+    if html is None:
+        html = _renderizar(secao, usuario, pagina, busca_texto)
+        cache.set(chave, html, TEMPO_FRAGMENTO)
+    return html.replace(_MARCADOR_CSRF, get_token(request))
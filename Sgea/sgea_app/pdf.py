@@ -0,0 +1,103 @@
+# sgea_app/pdf.py
+"""
+Renderização do certificado em PDF usando apenas o Pillow (já dependência do projeto).
+
+Este módulo não importa nada do Django de propósito: as funções recebem dados
+simples (dict/str) para poderem rodar em processos separados (ProcessPoolExecutor).
+"""
+
+import io
+import os
+import tempfile
+import textwrap
+
+from PIL import Image, ImageDraw, ImageFont
+
+# A4 paisagem a 150 dpi
+LARGURA, ALTURA = 1754, 1240
+DPI = 150
+
+COR_PRIMARIA = (10, 35, 66)      # #0a2342
+COR_SECUNDARIA = (197, 157, 95)  # #c59d5f
+COR_TEXTO = (51, 51, 51)
+COR_RODAPE = (119, 119, 119)
+
+# Incrementar quando o layout mudar: invalida todos os PDFs em cache
+VERSAO_LAYOUT = 1
+
+
+def _fonte(tamanho):
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", tamanho)
+    except OSError:
+        return ImageFont.load_default(size=tamanho)
+
+
+def _centralizado(desenho, y, texto, fonte, cor):
+    largura = desenho.textlength(texto, font=fonte)
+    desenho.text(((LARGURA - largura) / 2, y), texto, font=fonte, fill=cor)
+
+
+def renderizar_certificado(dados):
+    """Gera o PDF do certificado e retorna os bytes. `dados` vem de certificados.dados_certificado()."""
+    imagem = Image.new('RGB', (LARGURA, ALTURA), 'white')
+    desenho = ImageDraw.Draw(imagem)
+
+    desenho.rectangle([30, 30, LARGURA - 30, ALTURA - 30], outline=COR_PRIMARIA, width=10)
+    desenho.rectangle([52, 52, LARGURA - 52, ALTURA - 52], outline=COR_SECUNDARIA, width=4)
+
+    _centralizado(desenho, 140, "Certificado", _fonte(120), COR_PRIMARIA)
+    _centralizado(desenho, 300, "D E   P A R T I C I P A Ç Ã O", _fonte(40), COR_SECUNDARIA)
+
+    corpo = _fonte(36)
+    destaque = _fonte(52)
+    _centralizado(desenho, 420, "Certificamos que", corpo, COR_TEXTO)
+    _centralizado(desenho, 480, dados['participante'], destaque, COR_PRIMARIA)
+    _centralizado(desenho, 570, "participou com êxito do evento", corpo, COR_TEXTO)
+
+    y = 630
+    for linha in textwrap.wrap(dados['evento'], width=48)[:2]:
+        _centralizado(desenho, y, linha, destaque, COR_PRIMARIA)
+        y += 66
+    _centralizado(
+        desenho, y + 20,
+        f"realizado em {dados['local']}, no período de {dados['data_inicio']} a {dados['data_fim']}.",
+        corpo, COR_TEXTO,
+    )
+
+    assinaturas = [(dados['organizador'], "Organizador(a)")]
+    if dados.get('professor'):
+        assinaturas.append((dados['professor'], "Professor(a) Responsável"))
+    fonte_assinatura = _fonte(30)
+    for indice, (nome, papel) in enumerate(assinaturas):
+        centro = LARGURA * (indice + 1) / (len(assinaturas) + 1)
+        desenho.line([centro - 220, 960, centro + 220, 960], fill='black', width=2)
+        for deslocamento, texto in ((975, nome), (1015, papel)):
+            largura = desenho.textlength(texto, font=fonte_assinatura)
+            desenho.text((centro - largura / 2, deslocamento), texto, font=fonte_assinatura, fill=COR_TEXTO)
+
+    rodape = _fonte(24)
+    _centralizado(desenho, 1090, f"Certificado emitido em {dados['data_emissao']}.", rodape, COR_RODAPE)
+    _centralizado(desenho, 1125, f"Código de Validação: {dados['codigo']}", rodape, COR_RODAPE)
+    _centralizado(desenho, 1160, "UniEvents - Gestão Acadêmica", rodape, COR_RODAPE)
+
+    saida = io.BytesIO()
+    imagem.save(saida, 'PDF', resolution=DPI, title=f"Certificado {dados['codigo']}")
+    return saida.getvalue()
+
+
+def renderizar_para_arquivo(dados, caminho):
+    """
+    Renderiza e grava de forma atômica (arquivo temporário + os.replace), para que
+    leitores concorrentes nunca vejam um PDF pela metade. Retorna o caminho.
+    """
+    if os.path.exists(caminho):
+        return caminho
+    conteudo = renderizar_certificado(dados)
+    pasta = os.path.dirname(caminho)
+    os.makedirs(pasta, exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=pasta, suffix='.tmp')
+    with os.fdopen(descritor, 'wb') as arquivo:
+        arquivo.write(conteudo)
+    os.replace(temporario, caminho)
+    return caminho
@@ -0,0 +1,200 @@
+# sgea_app/replicas.py
+"""
+Leituras em réplicas do banco.
+
+settings.DB_REPLICAS cria os aliases 'replica1', 'replica2'... ao lado de 'default'. Só as views
+marcadas com @leitura_em_replica (ou APIViews com leitura_em_replica = True) leem de uma réplica,
+e apenas em GET/HEAD; todo o resto, inclusive qualquer escrita, usa o primário. Dentro dessas
+views a leitura volta ao primário quando:
+- a consulta está dentro de uma transação no primário (leituras feitas junto com escritas);
+- o usuário escreveu há menos de REPLICAS_FIXAR_SEGUNDOS (fixar_no_primario): o ReplicaMiddleware
+  fixa o autor de toda requisição que não seja GET/HEAD/OPTIONS, e os sinais de Inscricao e
+  inscrever_em_lote fixam os inscritos (que podem não ser o autor), para que cada um veja as
+  próprias alterações mesmo com a réplica atrasada.
+
+Views cujo resultado é guardado em cache compartilhado (ex: os fragmentos de sgea_app.painel, com
+chave pelas versões do primário) não devem ser marcadas: uma leitura atrasada ficaria em cache
+sob a versão nova.
+
+A réplica é sorteada uma vez por requisição. Com REPLICAS_CONTAR_CONSULTAS (padrão: DEBUG), o
+ReplicaMiddleware devolve no cabeçalho X-Consultas-Banco quantas consultas cada alias executou.
+
+No PostgreSQL as réplicas são mantidas pela replicação do próprio banco. Para testar localmente
+com SQLite, sincronizar_sqlite() (ou 'manage.py sincronizar_replicas') copia o arquivo do
+primário para o de cada réplica; nos testes a réplica é um arquivo próprio (settings.py).
+"""
+
+import contextvars
+import logging
+import random
+import sqlite3
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject, empty
+
+logger = logging.getLogger(__name__)
+
+PREFIXO_FIXADO = 'sgea:replicas:primario:'
+METODOS_SEGUROS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+_estado = contextvars.ContextVar('sgea_replicas', default=None)
+
+
+def aliases_replicas():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica')]
+
+
+# --- Views ---
+
+def leitura_em_replica(view):
+    """Marca uma view de função (somente leitura) para ler de uma réplica."""
+    view.leitura_em_replica = True
+    return view
+
+
+def _view_usa_replica(view):
+    classe = getattr(view, 'cls', None)  # APIView.as_view() guarda a classe em view.cls
+    return getattr(classe if classe is not None else view, 'leitura_em_replica', False)
+
+
+# --- Leitura após escrita ---
+
+def fixar_no_primario(usuarios_ids):
+    """Faz as próximas requisições desses usuários lerem do primário por REPLICAS_FIXAR_SEGUNDOS."""
+    if not aliases_replicas():
+        return
+    segundos = getattr(settings, 'REPLICAS_FIXAR_SEGUNDOS', 10)
+    cache.set_many({f"{PREFIXO_FIXADO}{pk}": True for pk in set(usuarios_ids)}, segundos)
+    estado = _estado.get()
+    if estado is not None:
+        estado.primario = True
+
+
+class _Estado:
+    """Decisão de roteamento da requisição corrente."""
+
+    def __init__(self, request, replica):
+        self.request = request
+        self.replica = replica
+        self.primario = False
+        self.usuario_verificado = False
+
+    def usuario_fixado(self):
+        """
+        True/False se o usuário está fixado no primário; None enquanto a autenticação não foi
+        resolvida (as consultas da própria autenticação vão ao primário).
+        """
+        usuario = self.request.__dict__.get('user')
+        if usuario is None or (isinstance(usuario, SimpleLazyObject) and usuario._wrapped is empty):
+            return None
+        self.usuario_verificado = True
+        return bool(usuario.is_authenticated and cache.get(f"{PREFIXO_FIXADO}{usuario.pk}"))
+
+
+# --- Roteador ---
+
+class RoteadorReplicas:
+    """DATABASE_ROUTERS: escritas no primário; leituras das views marcadas em uma réplica."""
+
+    def db_for_read(self, model, **hints):
+        estado = _estado.get()
+        if estado is None or estado.primario or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if not estado.usuario_verificado:
+            fixado = estado.usuario_fixado()
+            if fixado is None:
+                return DEFAULT_DB_ALIAS
+            estado.primario = fixado
+            if fixado:
+                return DEFAULT_DB_ALIAS
+        return estado.replica
+
+    def db_for_write(self, model, **hints):
+        # Também é consultado ao associar objetos relacionados, sem escrita real: não altera o estado
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primário e réplicas têm os mesmos dados
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # As réplicas recebem o esquema pela replicação (ou pela cópia do SQLite)
+        return None if db == DEFAULT_DB_ALIAS else False
+
+
+# --- Contagem de consultas ---
+
+@contextmanager
+def contar_consultas(aliases=None):
+    """Conta as consultas executadas por alias nesta thread: with contar_consultas() as contagem: ..."""
+    contagem = Counter()
+
+    def contador(alias):
+        def executar(execute, sql, params, many, context):
+            contagem[alias] += 1
+            return execute(sql, params, many, context)
+        return executar
+
+    with ExitStack() as pilha:
+        for alias in aliases or settings.DATABASES:
+            pilha.enter_context(connections[alias].execute_wrapper(contador(alias)))
+        yield contagem
+
+
+class ReplicaMiddleware(MiddlewareMixin):
+    """Ativa o roteamento para réplica nas views marcadas e, opcionalmente, conta as consultas."""
+
+    def process_request(self, request):
+        _estado.set(None)
+        if getattr(settings, 'REPLICAS_CONTAR_CONSULTAS', False):
+            request._replicas_pilha = ExitStack()
+            request._replicas_contagem = request._replicas_pilha.enter_context(contar_consultas())
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        replicas = aliases_replicas()
+        if replicas and request.method in ('GET', 'HEAD') and _view_usa_replica(view_func):
+            _estado.set(_Estado(request, random.choice(replicas)))
+
+    def process_response(self, request, response):
+        _estado.set(None)
+        usuario = getattr(request, 'user', None)
+        if request.method not in METODOS_SEGUROS and usuario is not None and usuario.is_authenticated:
+            fixar_no_primario([usuario.pk])
+        pilha = getattr(request, '_replicas_pilha', None)
+        if pilha is not None:
+            pilha.close()
+            contagem = request._replicas_contagem
+            resumo = ', '.join(f"{alias}={contagem[alias]}" for alias in settings.DATABASES)
+            response['X-Consultas-Banco'] = resumo
+            logger.debug("%s %s: consultas por banco: %s", request.method, request.path, resumo)
+        return response
+
+
+# --- Réplicas locais (SQLite) ---
+
+def sincronizar_sqlite():
+    """
+    Copia o banco SQLite do primário para o arquivo de cada réplica com a API de backup do SQLite
+    (cópia consistente mesmo com escritas em andamento). Retorna os aliases atualizados.
+    """
+    if connections[DEFAULT_DB_ALIAS].vendor != 'sqlite':
+        raise ValueError("A sincronização local só se aplica ao SQLite; no PostgreSQL use a replicação do banco.")
+    origem = sqlite3.connect(str(connections[DEFAULT_DB_ALIAS].settings_dict['NAME']))
+    try:
+        atualizados = []
+        for alias in aliases_replicas():
+            connections[alias].close()  # a conexão desta thread reabre já com o arquivo novo
+            destino = sqlite3.connect(str(connections[alias].settings_dict['NAME']))
+            try:
+                origem.backup(destino)
+            finally:
+                destino.close()
+            atualizados.append(alias)
+        return atualizados
+    finally:
+        origem.close()
@@ -6,10 +6,24 @@ from .models import Evento, Inscricao
 class EventoSerializer(serializers.ModelSerializer):
     # Exibe o nome do organizador em vez do ID
     organizador = serializers.StringRelatedField()
+    # Valores anotados por Evento.objects.com_vagas()
+    inscritos = serializers.IntegerField(read_only=True)
+    vagas_restantes = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Evento
-        fields = ['id', 'nome', 'data_inicio', 'local', 'organizador']
+        fields = [
+            'id', 'nome', 'tipo_evento', 'data_inicio', 'data_fim', 'local',
+            'organizador', 'inscritos', 'vagas_restantes',
+        ]
+
+    def __init__(self, *args, **kwargs):
+        # Sparse fieldset: ?fields=id,nome devolve somente esses campos
+        campos = kwargs.pop('campos', None)
+        super().__init__(*args, **kwargs)
+        if campos is not None:
+            for nome in set(self.fields) - set(campos):
+                self.fields.pop(nome)
 
 class InscricaoSerializer(serializers.ModelSerializer):
     class Meta:
@@ -18,4 +32,49 @@ class InscricaoSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         # A lógica de pegar o usuário logado será feita na View
-        return Inscricao.objects.create(**validated_data)
\ No newline at end of file
+        return Inscricao.objects.create(**validated_data)
+
+
+class ItemInscricaoLoteSerializer(serializers.Serializer):
+    usuario = serializers.IntegerField(min_value=1)
+    evento = serializers.IntegerField(min_value=1)
+
+
+class InscricaoLoteSerializer(serializers.Serializer):
+    """
+    Aceita uma das formas:
+      {"inscricoes": [{"usuario": 1, "evento": 2}, ...]}  (organizador, em seus eventos)
+      {"eventos": [2, 3, 4]}                               (o próprio usuário em vários eventos)
+    """
+    MAXIMO_ITENS = 1000
+
+    inscricoes = ItemInscricaoLoteSerializer(many=True, required=False)
+    eventos = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False)
+
+    def validate(self, data):
+        if ('inscricoes' in data) == ('eventos' in data):
+            raise serializers.ValidationError("Informe 'inscricoes' ou 'eventos' (apenas um dos dois).")
+        itens = data.get('inscricoes', data.get('eventos'))
+        if not itens:
+            raise serializers.ValidationError("A lista não pode ser vazia.")
+        if len(itens) > self.MAXIMO_ITENS:
+            raise serializers.ValidationError(f"Máximo de {self.MAXIMO_ITENS} itens por requisição.")
+        return data
+
+
+class PresencaLoteSerializer(serializers.Serializer):
+    """{"presentes": [inscricao_id, ...], "ausentes": [inscricao_id, ...]} (ao menos uma das listas)."""
+    MAXIMO_ITENS = 5000
+
+    presentes = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, default=list)
+    ausentes = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, default=list)
+
+    def validate(self, data):
+        total = len(data['presentes']) + len(data['ausentes'])
+        if not total:
+            raise serializers.ValidationError("Informe 'presentes' e/ou 'ausentes'.")
+        if total > self.MAXIMO_ITENS:
+            raise serializers.ValidationError(f"Máximo de {self.MAXIMO_ITENS} itens por requisição.")
+        if set(data['presentes']) & set(data['ausentes']):
+            raise serializers.ValidationError("Uma inscrição não pode estar em 'presentes' e 'ausentes'.")
+        return data
@@ -0,0 +1,168 @@
+# sgea_app/signals.py
+
+from functools import partial
+
+from django.contrib.auth.signals import user_logged_out
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from . import banners, cache_eventos, estatisticas, identidade, painel, replicas
+from .models import Certificado, Evento, Inscricao, Usuario
+from .validacao import obter_indice
+
+
+# --- Índice de Validação de Certificados ---
+
+@receiver(post_save, sender=Certificado)
+def indexar_certificado(sender, instance, created, **kwargs):
+    if created:
+        codigo = instance.codigo_validacao
+        transaction.on_commit(lambda: obter_indice().adicionar([codigo]))
+
+
+@receiver(post_delete, sender=Certificado)
+def desindexar_certificado(sender, instance, **kwargs):
+    obter_indice().remover(instance.codigo_validacao)
+
+
+# --- Cache da API de Eventos ---
+
+@receiver(post_save, sender=Evento)
+@receiver(post_delete, sender=Evento)
+@receiver(post_save, sender=Inscricao)
+@receiver(post_delete, sender=Inscricao)
+def invalidar_cache_eventos(sender, **kwargs):
+    transaction.on_commit(cache_eventos.invalidar)
+
+
+# --- Cache do Painel do Participante ---
+
+@receiver(post_save, sender=Evento)
+@receiver(post_delete, sender=Evento)
+def invalidar_painel_eventos(sender, **kwargs):
+    transaction.on_commit(painel.invalidar_eventos)
+
+
+@receiver(post_save, sender=Inscricao)
+@receiver(post_delete, sender=Inscricao)
+def invalidar_painel_inscricao(sender, instance, **kwargs):
+    usuario_id = instance.usuario_id
+    transaction.on_commit(lambda: painel.invalidar_usuarios([usuario_id]))
+
+
+@receiver(post_save, sender=Certificado)
+@receiver(post_delete, sender=Certificado)
+def invalidar_painel_certificado(sender, instance, **kwargs):
+    usuarios_ids = list(Inscricao.objects.filter(pk=instance.inscricao_id).values_list('usuario_id', flat=True))
+    transaction.on_commit(lambda: painel.invalidar_usuarios(usuarios_ids))
+
+
+# --- Contador de Vagas ---
+# inscricoes.inscrever reserva a vaga; aqui ela é devolvida em toda exclusão de Inscricao
+# (cancelamento, admin, exclusão do usuário em cascata, QuerySet.delete()).
+
+@receiver(post_delete, sender=Inscricao)
+def devolver_vaga(sender, instance, **kwargs):
+    Evento.objects.filter(pk=instance.evento_id, vagas_ocupadas__gt=0).update(
+        vagas_ocupadas=F('vagas_ocupadas') - 1, data_atualizacao=timezone.now()
+    )
+
+
+# --- Réplicas de Leitura ---
+# inscrever_em_lote (bulk_create) chama sgea_app.replicas diretamente.
+
+@receiver(post_save, sender=Inscricao)
+@receiver(post_delete, sender=Inscricao)
+def fixar_inscrito_no_primario(sender, instance, **kwargs):
+    usuario_id = instance.usuario_id
+    transaction.on_commit(lambda: replicas.fixar_no_primario([usuario_id]))
+
+
+# --- Estatísticas dos Eventos ---
+# Operações em lote (sem sinais) chamam sgea_app.estatisticas diretamente.
+
+@receiver(post_save, sender=Evento)
+def criar_estatistica_evento(sender, instance, created, **kwargs):
+    if created:
+        estatisticas.criar([instance.pk])
+
+
+@receiver(pre_save, sender=Inscricao)
+def guardar_presenca_anterior(sender, instance, **kwargs):
+    # Edição de uma inscrição existente (ex: admin): a variação de presentes depende do valor antigo
+    if not instance._state.adding:
+        instance._presenca_anterior = (
+            Inscricao.objects.filter(pk=instance.pk).values_list('presenca', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Inscricao)
+def contar_inscricao(sender, instance, created, **kwargs):
+    if created:
+        estatisticas.atualizar(
+            instance.evento_id, inscritos=1, presentes=int(instance.presenca),
+            dia=estatisticas.dia_local(instance.data_inscricao),
+        )
+    else:
+        anterior = getattr(instance, '_presenca_anterior', None)
+        if anterior is not None and anterior != instance.presenca:
+            estatisticas.atualizar(instance.evento_id, presentes=1 if instance.presenca else -1)
+
+
+@receiver(post_delete, sender=Inscricao)
+def descontar_inscricao(sender, instance, **kwargs):
+    estatisticas.atualizar(
+        instance.evento_id, inscritos=-1, presentes=-int(instance.presenca),
+        dia=estatisticas.dia_local(instance.data_inscricao),
+    )
+
+
+def _evento_do_certificado(certificado):
+    return Inscricao.objects.filter(pk=certificado.inscricao_id).values_list('evento_id', flat=True).first()
+
+
+@receiver(post_save, sender=Certificado)
+def contar_certificado(sender, instance, created, **kwargs):
+    if created:
+        estatisticas.atualizar(_evento_do_certificado(instance), certificados=1)
+
+
+@receiver(post_delete, sender=Certificado)
+def descontar_certificado(sender, instance, **kwargs):
+    evento_id = _evento_do_certificado(instance)
+    if evento_id is not None:
+        estatisticas.atualizar(evento_id, certificados=-1)
+
+
+# --- Arquivos de Banner ---
+
+@receiver(post_delete, sender=Evento)
+def apagar_arquivos_banner(sender, instance, **kwargs):
+    nomes = [nome for nome in (instance.banner.name if instance.banner else '', instance.banner_processado) if nome]
+    transaction.on_commit(partial(banners.apagar_arquivos, instance.pk, nomes))
+
+
+# --- Cache de Identidades ---
+
+@receiver(post_save, sender=Usuario)
+@receiver(post_delete, sender=Usuario)
+def invalidar_identidade(sender, instance, **kwargs):
+    # Troca de senha, desativação e edição de perfil passam por save(). Remove de novo após o
+    # commit: uma requisição concorrente pode ter recolocado a versão antiga nesse intervalo.
+    identidade.invalidar_usuario(instance.pk)
+    transaction.on_commit(lambda: identidade.invalidar_usuario(instance.pk))
+
+
+@receiver(user_logged_out)
+def invalidar_identidade_logout(sender, request, user, **kwargs):
+    if user is not None:
+        identidade.invalidar_usuario(user.pk)
+
+
+@receiver(post_delete, sender=Token)
+def invalidar_token(sender, instance, **kwargs):
+    identidade.invalidar_token(instance.key)
@@ -0,0 +1,40 @@
+# sgea_app/templatetags/banners.py
+
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from .. import banners
+
+register = template.Library()
+
+# Largura com que cada tamanho aparece na página (atributo sizes): o navegador escolhe a variante
+LARGURA_EXIBIDA = {
+    'miniatura': '96px',
+    'cartao': '(max-width: 700px) 100vw, 640px',
+    'destaque': '100vw',
+}
+
+
+@register.simple_tag
+def banner(evento, tamanho='destaque', **atributos):
+    """
+    {% banner evento 'cartao' style="..." %}: <picture> com srcset WebP e JPEG das variantes do
+    banner (sgea_app.banners), ou <img> com o original enquanto elas não foram geradas.
+    """
+    dados = banners.imagem(evento, tamanho)
+    if dados is None:
+        return ''
+    atributos.setdefault('alt', f"Banner {evento.nome}")
+    atributos.setdefault('loading', 'lazy' if tamanho != 'destaque' else 'eager')
+    extras = format_html_join(' ', '{}="{}"', sorted(atributos.items()))
+
+    if not dados['srcset']:
+        return format_html('<img src="{}" {}>', dados['src'], extras)
+
+    sizes = LARGURA_EXIBIDA.get(tamanho, '100vw')
+    return format_html(
+        '<picture style="display: contents;"><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" {}></picture>',
+        dados['srcset']['webp'], sizes,
+        dados['src'], dados['srcset']['jpeg'], sizes, dados['largura'], dados['altura'], extras,
+    )
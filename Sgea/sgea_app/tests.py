@@ -1,3 +1,1629 @@
-from django.test import TestCase
+# sgea_app/tests.py
 
-# Create your tests here.
+import asyncio
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import smtplib
+import tempfile
+import threading
+import zipfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from datetime import timedelta
+from unittest import mock, skipUnless
+from xml.etree import ElementTree
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.tokens import default_token_generator
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.mail import get_connection
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends import locmem
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from PIL import Image
+from rest_framework.authtoken.models import Token
+
+from . import (
+    auditoria, banco, busca, cache_eventos, checkin, emails, estatisticas, identidade, inscricoes, limites, painel,
+    replicas, validacao,
+)
+from . import banners, certificados, exportacao, importacao, notificacoes, pdf, views
+from .certificados import gerar_codigo
+from .paginacao import codificar_cursor, decodificar_cursor, paginar_keyset
+from .models import Certificado, EmailPendente, EstatisticaEvento, Evento, Inscricao, LogAuditoria, Usuario
+
+SENHA = 'Segura!123'
+
+
+# --- Dados de teste ---
+
+def criar_usuario(username, perfil='aluno', **campos):
+    campos.setdefault('instituicao_ensino', 'Universidade Teste')
+    campos.setdefault('email', f"{username}@teste.local")
+    return Usuario.objects.create_user(username, password=SENHA, perfil=perfil, **campos)
+
+
+def criar_usuarios(prefixo, quantidade):
+    """Usuários em lote (sem hash de senha), em ordem de pk."""
+    Usuario.objects.bulk_create([
+        Usuario(username=f"{prefixo}{i}", email=f"{prefixo}{i}@teste.local",
+                instituicao_ensino='Universidade Teste', password='!')
+        for i in range(quantidade)
+    ])
+    return list(Usuario.objects.filter(username__startswith=prefixo).order_by('pk'))
+
+
+def criar_evento(organizador, professor=None, nome='Evento', vagas=50, inicio_em=timedelta(days=1), **campos):
+    agora = timezone.now()
+    campos.setdefault('local', 'Auditório')
+    return Evento.objects.create(
+        nome=nome, tipo_evento='palestra',
+        data_inicio=agora + inicio_em, data_fim=agora + inicio_em + timedelta(hours=2),
+        quantidade_participantes=vagas, organizador=organizador,
+        professor_responsavel=professor, **campos,
+    )
+
+
+def cabecalho_token(usuario):
+    """Cabeçalho de autenticação da API (a API não aceita sessão)."""
+    token, _ = Token.objects.get_or_create(user=usuario)
+    return {'HTTP_AUTHORIZATION': f"Token {token.key}"}
+
+
+def encerrar(evento):
+    """Move o evento para o passado sem passar pelo clean() (que recusa datas passadas)."""
+    agora = timezone.now()
+    Evento.objects.filter(pk=evento.pk).update(data_inicio=agora - timedelta(days=2), data_fim=agora - timedelta(days=1))
+    evento.refresh_from_db()
+
+
+def reiniciar_estado():
+    """Caches e singletons em memória compartilhados entre os testes do mesmo processo."""
+    cache.clear()
+    limites._armazenamento = None
+    validacao._indice = None
+    checkin._registro = None
+
+
+class BaseTestCase(TestCase):
+    def setUp(self):
+        reiniciar_estado()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizador = criar_usuario('organizador', perfil='organizador')
+        cls.professor = criar_usuario('professor', perfil='professor')
+        cls.aluno = criar_usuario('aluno')
+
+
+# --- Validação de certificados (sgea_app.validacao) ---
+
+class IndiceCertificadosTests(BaseTestCase):
+    def emitir(self, quantidade):
+        evento = criar_evento(self.organizador, self.professor, vagas=quantidade)
+        usuarios = criar_usuarios(f"cert{Certificado.objects.count()}_", quantidade)
+        inscricoes = Inscricao.objects.bulk_create([Inscricao(usuario=u, evento=evento) for u in usuarios])
+        certificados = Certificado.objects.bulk_create(
+            [Certificado(inscricao=inscricao, codigo_validacao=gerar_codigo()) for inscricao in inscricoes]
+        )
+        return [certificado.codigo_validacao for certificado in certificados]
+
+    def test_codigo_valido_e_inexistente(self):
+        codigos = self.emitir(3)
+        indice = validacao.IndiceCertificados()
+        resultado = indice.consultar_varios(codigos + ['NAOEXISTE'])
+        self.assertIsNone(resultado['NAOEXISTE'])
+        self.assertEqual(resultado[codigos[0]]['codigo'], codigos[0])
+        # Segunda consulta vem do LRU
+        with self.assertNumQueries(0):
+            self.assertIsNotNone(indice.consultar(codigos[1]))
+
+    def test_sincronizacao_repetida_nao_infla_o_filtro(self):
+        indice = validacao.IndiceCertificados(intervalo_sincronizacao=0)
+        indice.consultar('NAOEXISTE')
+        codigos = self.emitir(600)
+        # Os mesmos códigos chegam pelo on_commit e por várias sincronizações (janela de 1 minuto)
+        indice.adicionar(codigos)
+        for _ in range(3):
+            indice.consultar_varios(['NAOEXISTE'])
+        self.assertEqual(indice._filtro.tamanho, 600)
+        self.assertFalse(indice._redimensionar)
+        self.assertIsNotNone(indice.consultar(codigos[-1]))
+
+    def test_capacidade_excedida_reconstroi_antes_da_consulta(self):
+        indice = validacao.IndiceCertificados(intervalo_sincronizacao=3600)
+        indice.consultar('NAOEXISTE')
+        capacidade = indice._filtro.capacidade
+        codigos = self.emitir(capacidade + 10)
+        indice.adicionar(codigos)
+        self.assertTrue(indice._redimensionar)
+
+        resultado = indice.consultar_varios(['NAOEXISTE', codigos[0]])
+        self.assertIsNone(resultado['NAOEXISTE'])
+        self.assertIsNotNone(resultado[codigos[0]])
+        self.assertFalse(indice._redimensionar)
+        self.assertGreater(indice._filtro.capacidade, capacidade)
+
+    def test_codigo_adicionado_durante_a_carga_nao_se_perde(self):
+        indice = validacao.IndiceCertificados()
+        codigo = self.emitir(1)[0]
+        carregar = validacao.FiltroBloom.adicionar
+
+        def adicionar_durante_a_carga(filtro, chave):
+            # Simula uma emissão confirmada (on_commit) enquanto o filtro novo é montado
+            if indice._adicionados_na_carga == []:
+                indice.adicionar(['EMITIDONACARGA'])
+            carregar(filtro, chave)
+
+        with mock.patch.object(validacao.FiltroBloom, 'adicionar', adicionar_durante_a_carga):
+            indice.aquecer([codigo])
+        self.assertIn('EMITIDONACARGA', indice._filtro)
+
+    def test_api_de_validacao(self):
+        codigo = self.emitir(1)[0]
+        response = self.client.get('/api/certificados/validar/', {'codigo': [codigo.lower(), 'nope']})
+        self.assertEqual(response.status_code, 200)
+        resultados = {item['codigo']: item['valido'] for item in response.json()['resultados']}
+        self.assertEqual(resultados, {codigo: True, 'NOPE': False})
+
+
+# --- Consultas por página (ocupação anotada, sem N+1) ---
+
+class ConsultasConstantesTests(BaseTestCase):
+    """O número de consultas de cada página não depende de quantos eventos/inscritos existem."""
+
+    def povoar(self, eventos, inscritos_por_evento=2):
+        usuarios = criar_usuarios(f"pov{Evento.objects.count()}_", inscritos_por_evento)
+        criados = []
+        for i in range(eventos):
+            evento = criar_evento(self.organizador, self.professor, nome=f"Evento {Evento.objects.count()}")
+            for usuario in usuarios:
+                inscricoes.inscrever(usuario, evento)
+            criados.append(evento)
+        cache.clear()
+        return criados
+
+    def contar(self, url, **extra):
+        cache.clear()
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url, **extra)
+        self.assertEqual(response.status_code, 200)
+        # Sessão/token, usuário e as consultas da página: poucas e fixas
+        self.assertLessEqual(len(consultas), 8)
+        return len(consultas)
+
+    def test_organizador_dashboard(self):
+        self.client.force_login(self.organizador)
+        self.povoar(2)
+        poucos = self.contar(reverse('organizador_dashboard'))
+        self.povoar(8)
+        cache.clear()
+        with self.assertNumQueries(poucos):
+            self.client.get(reverse('organizador_dashboard'))
+
+    def test_secao_do_professor(self):
+        self.client.force_login(self.professor)
+        url = reverse('participantes_dashboard_secao', args=['responsavel'])
+        self.povoar(2)
+        poucos = self.contar(url)
+        self.povoar(8)
+        cache.clear()
+        with self.assertNumQueries(poucos):
+            response = self.client.get(url)
+        self.assertContains(response, '2 / 50')
+
+    def test_detalhes_evento(self):
+        self.client.force_login(self.aluno)
+        evento, = self.povoar(1, inscritos_por_evento=2)
+        outro, = self.povoar(1, inscritos_por_evento=20)
+        poucos = self.contar(reverse('detalhes_evento', args=[evento.pk]))
+        cache.clear()
+        with self.assertNumQueries(poucos):
+            self.client.get(reverse('detalhes_evento', args=[outro.pk]))
+
+    def test_api_eventos(self):
+        cabecalho = cabecalho_token(self.aluno)
+        self.povoar(2)
+        poucos = self.contar('/api/eventos/', **cabecalho)
+        self.povoar(8)
+        cache.clear()
+        with self.assertNumQueries(poucos):
+            response = self.client.get('/api/eventos/', **cabecalho)
+        self.assertEqual(len(response.json()['results']), 10)
+
+
+# --- Serviço de inscrição (sgea_app.inscricoes) ---
+
+class InscricaoServicoTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.evento = criar_evento(self.organizador, self.professor, vagas=1)
+
+    def test_inscricao_ocupa_vaga(self):
+        inscricao = inscricoes.inscrever(self.aluno, self.evento)
+        self.evento.refresh_from_db()
+        self.assertEqual(inscricao.evento, self.evento)
+        self.assertEqual(self.evento.vagas_ocupadas, 1)
+
+    def test_vagas_esgotadas(self):
+        inscricoes.inscrever(self.aluno, self.evento)
+        with self.assertRaises(inscricoes.VagasEsgotadas):
+            inscricoes.inscrever(self.professor, self.evento)
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.vagas_ocupadas, 1)
+
+    def test_inscricao_duplicada(self):
+        self.evento.quantidade_participantes = 5
+        self.evento.save()
+        inscricoes.inscrever(self.aluno, self.evento)
+        with self.assertRaises(inscricoes.JaInscrito):
+            inscricoes.inscrever(self.aluno, self.evento)
+        self.evento.refresh_from_db()
+        # A reserva da tentativa duplicada é desfeita com a transação
+        self.assertEqual(self.evento.vagas_ocupadas, 1)
+
+    def test_evento_encerrado(self):
+        encerrar(self.evento)
+        with self.assertRaises(inscricoes.InscricoesEncerradas):
+            inscricoes.inscrever(self.aluno, self.evento)
+
+    def test_cancelamento_libera_a_vaga(self):
+        inscricoes.inscrever(self.aluno, self.evento)
+        self.assertTrue(inscricoes.cancelar(self.aluno, self.evento))
+        self.assertFalse(inscricoes.cancelar(self.aluno, self.evento))
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.vagas_ocupadas, 0)
+        inscricoes.inscrever(self.professor, self.evento)
+
+    def test_qualquer_exclusao_libera_a_vaga(self):
+        self.evento.quantidade_participantes = 3
+        self.evento.save()
+        inscricao = inscricoes.inscrever(self.aluno, self.evento)
+        usuario = criar_usuario('excluido')
+        inscricoes.inscrever(usuario, self.evento)
+        inscricoes.inscrever(self.professor, self.evento)
+
+        inscricao.delete()  # admin
+        usuario.delete()    # cascata
+        Inscricao.objects.filter(usuario=self.professor).delete()
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.vagas_ocupadas, 0)
+
+
+class InscricaoLoteTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.evento = criar_evento(self.organizador, self.professor, vagas=3)
+        self.alunos = criar_usuarios('lote', 4)
+
+    def situacoes(self, resultados):
+        return [item['situacao'] for item in resultados]
+
+    def test_lote_com_situacao_por_item(self):
+        inscricoes.inscrever(self.alunos[0], self.evento)
+        encerrado = criar_evento(self.organizador, self.professor, nome='Encerrado')
+        encerrar(encerrado)
+        a = self.alunos
+        pares = [
+            (a[0].pk, self.evento.pk), (a[1].pk, self.evento.pk), (a[1].pk, self.evento.pk),
+            (a[2].pk, self.evento.pk), (a[3].pk, self.evento.pk), (a[1].pk, encerrado.pk),
+            (a[1].pk, 999999), (999999, self.evento.pk),
+        ]
+        resultados = inscricoes.inscrever_em_lote(pares, organizador=self.organizador)
+        self.assertEqual(self.situacoes(resultados), [
+            inscricoes.JA_INSCRITO, inscricoes.INSCRITO, inscricoes.DUPLICADO, inscricoes.INSCRITO,
+            inscricoes.VAGAS_ESGOTADAS, inscricoes.ENCERRADO, inscricoes.EVENTO_INEXISTENTE,
+            inscricoes.USUARIO_INEXISTENTE,
+        ])
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.vagas_ocupadas, 3)
+        self.assertEqual(estatisticas.do_evento(self.evento)['inscritos'], 3)
+
+    def test_organizador_so_inscreve_em_seus_eventos(self):
+        outro = criar_usuario('outro_org', perfil='organizador')
+        resultados = inscricoes.inscrever_em_lote([(self.alunos[0].pk, self.evento.pk)], organizador=outro)
+        self.assertEqual(self.situacoes(resultados), [inscricoes.SEM_PERMISSAO])
+
+    def test_conflito_ignorado_nao_infla_as_estatisticas(self):
+        pares = [(aluno.pk, self.evento.pk) for aluno in self.alunos[:2]]
+        contar = inscricoes._contar_inscricoes
+
+        def com_conflito(eventos_ids):
+            # Outra gravação (ex: o admin, que conta a própria inscrição) insere o primeiro par
+            # depois da leitura das existentes: o bulk_create do lote o ignora
+            Inscricao.objects.create(usuario_id=pares[0][0], evento_id=pares[0][1])
+            return contar(eventos_ids)
+
+        with mock.patch.object(inscricoes, '_contar_inscricoes', side_effect=com_conflito):
+            inscricoes.inscrever_em_lote(pares)
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.vagas_ocupadas, 2)
+        self.assertEqual(estatisticas.do_evento(self.evento)['inscritos'], 2)
+
+    def test_api_restringe_lote_de_terceiros_ao_organizador(self):
+        def enviar(usuario, corpo):
+            return self.client.post('/api/inscrever/lote/', corpo, content_type='application/json', **cabecalho_token(usuario))
+
+        corpo = {'inscricoes': [{'usuario': self.alunos[0].pk, 'evento': self.evento.pk}]}
+        self.assertEqual(enviar(self.aluno, corpo).status_code, 403)
+        response = enviar(self.organizador, corpo)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['inscritos'], 1)
+
+        response = enviar(self.aluno, {'eventos': [self.evento.pk]})
+        self.assertEqual(response.json()['resultados'][0]['situacao'], inscricoes.INSCRITO)
+
+
+class InscricaoConcorrenteTests(TransactionTestCase):
+    """Várias threads disputando as vagas de um evento: o contador nunca passa do limite."""
+    THREADS = 40
+    VAGAS = 15
+
+    def setUp(self):
+        reiniciar_estado()
+        organizador = criar_usuario('organizador', perfil='organizador')
+        professor = criar_usuario('professor', perfil='professor')
+        self.evento = criar_evento(organizador, professor, vagas=self.VAGAS)
+        self.usuarios = criar_usuarios('concorrente', self.THREADS)
+
+    def test_sem_vendas_alem_do_limite(self):
+        resultados = Counter()
+        erros = []
+        trava = threading.Lock()
+        largada = threading.Barrier(self.THREADS)
+        fim_da_primeira = threading.Barrier(self.THREADS)
+
+        def participante(usuario):
+            largada.wait()
+            try:
+                # Duas rodadas: na segunda o evento já está lotado, inclusive para quem já se inscreveu
+                for rodada in range(2):
+                    if rodada:
+                        fim_da_primeira.wait()
+                    try:
+                        inscricoes.inscrever(usuario, self.evento)
+                        chave = 'ok'
+                    except inscricoes.VagasEsgotadas:
+                        chave = 'esgotado'
+                    except inscricoes.JaInscrito:
+                        chave = 'duplicado'
+                    except Exception as e:
+                        chave = 'erro'
+                        erros.append(repr(e))
+                    with trava:
+                        resultados[chave] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=participante, args=(usuario,)) for usuario in self.usuarios]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.evento.refresh_from_db()
+        inscritos = Inscricao.objects.filter(evento=self.evento).count()
+        self.assertEqual(erros, [])
+        self.assertLessEqual(self.evento.vagas_ocupadas, self.evento.quantidade_participantes)
+        self.assertEqual(inscritos, self.VAGAS)
+        self.assertEqual(self.evento.vagas_ocupadas, inscritos)
+        self.assertEqual(resultados['ok'], inscritos)
+        self.assertEqual(resultados['esgotado'], 2 * self.THREADS - self.VAGAS)
+
+    def test_comando_de_estresse(self):
+        saida = io.StringIO()
+        call_command('stress_inscricoes', '--executar', '--threads', '30', '--vagas', '10', stdout=saida)
+        self.assertIn('Inscrições no banco: 10 | Contador vagas_ocupadas: 10', saida.getvalue())
+        self.assertIn('inscrições/s', saida.getvalue())
+        # Os dados temporários são removidos ao final
+        self.assertFalse(Usuario.objects.filter(username__startswith='stress_').exists())
+
+
+# --- Réplicas de leitura (sgea_app.replicas) ---
+
+@override_settings(REPLICAS_CONTAR_CONSULTAS=True)
+class ReplicaLeituraTests(TransactionTestCase):
+    """Primário e réplica em arquivos SQLite distintos: a réplica só muda com sincronizar_sqlite()."""
+    databases = {'default', 'replica1'}
+
+    def setUp(self):
+        reiniciar_estado()
+        self.organizador = criar_usuario('org_replica', perfil='organizador')
+        self.professor = criar_usuario('prof_replica', perfil='professor')
+        criar_evento(self.organizador, self.professor, nome='Evento replicado')
+        replicas.sincronizar_sqlite()
+        self.client.force_login(self.organizador)
+
+    def consultas(self, response):
+        return {alias: int(n) for alias, n in (par.split('=') for par in response['X-Consultas-Banco'].split(', '))}
+
+    def dados_evento(self, nome):
+        inicio = timezone.localtime() + timedelta(days=3)
+        return {
+            'nome': nome, 'tipo_evento': 'palestra', 'professor_responsavel': self.professor.pk,
+            'data_inicio': inicio.strftime('%Y-%m-%dT%H:%M'),
+            'data_fim': (inicio + timedelta(hours=2)).strftime('%Y-%m-%dT%H:%M'),
+            'local': 'Auditório', 'quantidade_participantes': 30,
+        }
+
+    def test_leitura_vem_da_replica_atrasada(self):
+        criar_evento(self.organizador, self.professor, nome='Evento ainda não replicado')
+        response = self.client.get(reverse('organizador_dashboard'))
+        self.assertContains(response, 'Evento replicado')
+        self.assertNotContains(response, 'Evento ainda não replicado')
+        self.assertGreater(self.consultas(response)['replica1'], 0)
+
+        replicas.sincronizar_sqlite()
+        self.assertContains(self.client.get(reverse('organizador_dashboard')), 'Evento ainda não replicado')
+
+    def test_escrita_fixa_o_autor_no_primario(self):
+        response = self.client.post(reverse('criar_evento'), self.dados_evento('Evento recém-criado'))
+        self.assertRedirects(response, reverse('organizador_dashboard'), fetch_redirect_response=False)
+
+        # A réplica ainda não tem o evento, mas o autor lê do primário até REPLICAS_FIXAR_SEGUNDOS
+        response = self.client.get(reverse('organizador_dashboard'))
+        self.assertContains(response, 'Evento recém-criado')
+        self.assertEqual(self.consultas(response)['replica1'], 0)
+
+        # Outro usuário (que não escreveu) continua lendo da réplica
+        outro = criar_usuario('org_replica_2', perfil='organizador')
+        self.client.force_login(outro)
+        self.assertGreater(self.consultas(self.client.get(reverse('organizador_dashboard')))['replica1'], 0)
+
+    def test_fixacao_expira(self):
+        self.client.post(reverse('criar_evento'), self.dados_evento('Evento recém-criado'))
+        cache.delete(f"{replicas.PREFIXO_FIXADO}{self.organizador.pk}")  # como após REPLICAS_FIXAR_SEGUNDOS
+        response = self.client.get(reverse('organizador_dashboard'))
+        self.assertNotContains(response, 'Evento recém-criado')
+        self.assertGreater(self.consultas(response)['replica1'], 0)
+
+    def test_secao_do_painel_le_do_primario(self):
+        aluno = criar_usuario('aluno_replica')
+        self.client.force_login(aluno)
+        response = self.client.get(reverse('participantes_dashboard_secao', args=['disponiveis']))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.consultas(response)['replica1'], 0)
+
+
+# --- Caixa de saída de e-mails (sgea_app.emails) ---
+
+class ConexaoEmailTeste(locmem.EmailBackend):
+    """Backend locmem que conta as aberturas e falha para os destinatários em `falhas`."""
+
+    def __init__(self, falhas=None, **kwargs):
+        super().__init__(**kwargs)
+        self.falhas = falhas or {}
+        self.aberturas = 0
+
+    def open(self):
+        self.aberturas += 1
+        return True
+
+    def send_messages(self, mensagens):
+        for mensagem in mensagens:
+            if mensagem.to[0] in self.falhas:
+                raise self.falhas[mensagem.to[0]]
+        return super().send_messages(mensagens)
+
+
+@override_settings(EMAILS_MAX_TENTATIVAS=3, EMAILS_ESPERA_BASE=60, EMAILS_ESPERA_MAXIMA=3600)
+class CaixaSaidaEmailTests(BaseTestCase):
+    def situacoes(self):
+        return {p.destinatario: (p.situacao, p.tentativas) for p in EmailPendente.objects.all()}
+
+    def vencer_todos(self):
+        EmailPendente.objects.update(proxima_tentativa=timezone.now())
+
+    def test_lote_usa_uma_conexao(self):
+        emails.enfileirar("Aviso", "<p>Olá</p>", ['a@teste.local', 'b@teste.local', 'c@teste.local'])
+        with mock.patch.object(emails, 'get_connection', wraps=get_connection) as fabrica:
+            self.assertEqual(emails.enviar_pendentes(), (3, 0))
+        self.assertEqual(fabrica.call_count, 1)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].content_subtype, 'html')
+        self.assertEqual(set(self.situacoes().values()), {('enviado', 1)})
+        self.assertEqual(emails.enviar_pendentes(), (0, 0))
+
+    def test_falha_reagenda_com_espera_exponencial(self):
+        emails.enfileirar("Aviso", "Olá", ['a@teste.local', 'recusa@teste.local'])
+        conexao = ConexaoEmailTeste(falhas={'recusa@teste.local': smtplib.SMTPRecipientsRefused({})})
+        antes = timezone.now()
+        self.assertEqual(emails.enviar_pendentes(conexao=conexao), (1, 1))
+        self.assertEqual(conexao.aberturas, 1)  # recusa de um destinatário não derruba a conexão
+
+        falhou = EmailPendente.objects.get(destinatario='recusa@teste.local')
+        self.assertEqual((falhou.situacao, falhou.tentativas, falhou.reservado_por), ('pendente', 1, ''))
+        self.assertGreaterEqual(falhou.proxima_tentativa, antes + timedelta(seconds=60))
+        self.assertTrue(falhou.ultimo_erro)
+        # Ainda não venceu: o próximo lote não o reenvia
+        self.assertEqual(emails.enviar_pendentes(conexao=conexao), (0, 0))
+
+        self.assertEqual([emails.espera_para(n).total_seconds() for n in (1, 2, 3, 10)], [60, 120, 240, 3600])
+
+    def test_desiste_apos_maximo_de_tentativas(self):
+        emails.enfileirar("Aviso", "Olá", 'recusa@teste.local')
+        conexao = ConexaoEmailTeste(falhas={'recusa@teste.local': smtplib.SMTPDataError(550, 'recusado')})
+        with self.assertLogs('sgea_app.emails', 'ERROR'):
+            for _ in range(3):
+                self.vencer_todos()
+                self.assertEqual(emails.enviar_pendentes(conexao=conexao), (0, 1))
+        self.assertEqual(self.situacoes()['recusa@teste.local'], ('falhou', 3))
+        self.vencer_todos()
+        self.assertEqual(emails.enviar_pendentes(conexao=conexao), (0, 0))
+
+    def test_conexao_caida_e_reaberta_para_o_resto_do_lote(self):
+        emails.enfileirar("Aviso", "Olá", ['cai@teste.local', 'b@teste.local'])
+        conexao = ConexaoEmailTeste(falhas={'cai@teste.local': smtplib.SMTPServerDisconnected()})
+        self.assertEqual(emails.enviar_pendentes(conexao=conexao), (1, 1))
+        self.assertEqual(conexao.aberturas, 2)
+        self.assertEqual(self.situacoes(), {'cai@teste.local': ('pendente', 1), 'b@teste.local': ('enviado', 1)})
+
+    def test_reserva_nao_entrega_o_mesmo_email_a_dois_workers(self):
+        emails.enfileirar("Aviso", "Olá", [f"{i}@teste.local" for i in range(3)])
+        primeiro = emails.reservar_lote(2)
+        segundo = emails.reservar_lote(2)
+        self.assertEqual(len(primeiro), 2)
+        self.assertEqual(len(segundo), 1)
+        self.assertFalse({p.pk for p in primeiro} & {p.pk for p in segundo})
+        self.assertEqual(emails.reservar_lote(), [])
+
+    def test_reserva_disputada_fica_com_um_worker(self):
+        emails.enfileirar("Aviso", "Olá", ['a@teste.local', 'b@teste.local'])
+        outro_worker = {}
+        uuid4 = emails.uuid.uuid4
+
+        def token():
+            # Entre a seleção dos ids e o UPDATE deste worker, outro worker reserva os mesmos e-mails
+            if 'lote' not in outro_worker:
+                outro_worker['lote'] = None
+                outro_worker['lote'] = emails.reservar_lote()
+            return uuid4()
+
+        with mock.patch.object(emails.uuid, 'uuid4', side_effect=token):
+            reservados = emails.reservar_lote()
+        self.assertEqual(reservados, [])
+        self.assertEqual(len(outro_worker['lote']), 2)
+
+    def test_reserva_expirada_volta_para_a_fila(self):
+        emails.enfileirar("Aviso", "Olá", 'a@teste.local')
+        self.assertEqual(len(emails.reservar_lote()), 1)  # worker interrompido antes de enviar
+        self.assertEqual(emails.reservar_lote(), [])
+        self.vencer_todos()  # como após EMAILS_TEMPO_RESERVA
+        self.assertEqual(len(emails.reservar_lote()), 1)
+
+
+# --- Cache de identidades (sgea_app.identidade) ---
+
+class IdentidadeCacheTests(BaseTestCase):
+    def usar_cache_compartilhado(self):
+        # FileBasedCache: visto por todos os processos, como o Redis em produção
+        diretorio = tempfile.mkdtemp(prefix='sgea_identidade_')
+        self.addCleanup(shutil.rmtree, diretorio, ignore_errors=True)
+        configuracao = self.settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': diretorio,
+        }})
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+    def test_cache_local_nao_e_usado(self):
+        self.assertFalse(identidade.em_cache())
+        identidade.obter_usuario(self.aluno.pk)
+        with self.assertNumQueries(1):
+            identidade.obter_usuario(self.aluno.pk)
+
+    def test_copia_em_cache_sem_senha(self):
+        self.usar_cache_compartilhado()
+        identidade.obter_usuario(self.aluno.pk)
+        dados = cache.get(f"{identidade.PREFIXO_USUARIO}{self.aluno.pk}")
+        self.assertNotIn('password', dados)
+        self.assertNotIn(self.aluno.password, dados.values())
+
+        with self.assertNumQueries(0):
+            usuario = identidade.obter_usuario(self.aluno.pk)
+        self.assertEqual((usuario.username, usuario.perfil), ('aluno', 'aluno'))
+        self.assertEqual(usuario.get_deferred_fields(), {'password'})
+        self.assertEqual(usuario.get_session_auth_hash(), self.aluno.get_session_auth_hash())
+
+    def test_salvar_copia_em_cache_preserva_a_senha(self):
+        self.usar_cache_compartilhado()
+        identidade.obter_usuario(self.aluno.pk)
+        usuario = identidade.obter_usuario(self.aluno.pk)
+        usuario.telefone = '11999990000'
+        usuario.save()
+        self.aluno.refresh_from_db()
+        self.assertEqual(self.aluno.telefone, '11999990000')
+        self.assertTrue(self.aluno.check_password(SENHA))
+
+    def test_sessao_usa_o_cache_e_cai_apos_troca_de_senha(self):
+        self.usar_cache_compartilhado()
+        self.client.force_login(self.aluno)
+        url = reverse('participantes_dashboard')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.get(url).status_code, 200)  # hash de sessão vindo do cache
+
+        # Troca de senha feita por outro processo: a entrada do cache compartilhado é removida
+        usuario = Usuario.objects.get(pk=self.aluno.pk)
+        usuario.set_password('Outra!456')
+        usuario.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(f"?next={url}", response.url)
+
+    def test_token_de_usuario_desativado_e_recusado(self):
+        self.usar_cache_compartilhado()
+        token = Token.objects.create(user=self.aluno)
+        cabecalho = {'HTTP_AUTHORIZATION': f"Token {token.key}"}
+        self.assertEqual(self.client.get('/api/eventos/', **cabecalho).status_code, 200)
+        self.assertIsNotNone(cache.get(identidade._chave_token(token.key)))
+
+        usuario = Usuario.objects.get(pk=self.aluno.pk)
+        usuario.is_active = False
+        usuario.save()
+        self.assertEqual(self.client.get('/api/eventos/', **cabecalho).status_code, 401)
+
+    def test_token_excluido_e_recusado(self):
+        self.usar_cache_compartilhado()
+        token = Token.objects.create(user=self.aluno)
+        cabecalho = {'HTTP_AUTHORIZATION': f"Token {token.key}"}
+        self.assertEqual(self.client.get('/api/eventos/', **cabecalho).status_code, 200)
+        token.delete()
+        self.assertEqual(self.client.get('/api/eventos/', **cabecalho).status_code, 401)
+
+
+# --- Ajustes das conexões SQLite (sgea_app.banco) ---
+
+class PragmasSqliteTests(TestCase):
+    def pragma(self, nome):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {nome}")
+            return cursor.fetchone()[0]
+
+    def test_pragmas_aplicados_na_conexao(self):
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        self.assertEqual(self.pragma('mmap_size'), 256 * 1024 * 1024)
+
+    def test_modo_do_arquivo_nao_muda_sem_sqlite_wal(self):
+        self.assertEqual(self.pragma('journal_mode'), 'delete')
+
+    def test_wal_so_quando_ligado(self):
+        with override_settings(SQLITE_WAL=False):
+            self.assertNotIn('journal_mode', banco.pragmas_sqlite())
+        with override_settings(SQLITE_WAL=True):
+            self.assertEqual(list(banco.pragmas_sqlite())[:2], ['journal_mode', 'synchronous'])
+        with override_settings(SQLITE_AJUSTES=False, SQLITE_WAL=True):
+            self.assertEqual(banco.pragmas_sqlite(), {})
+
+
+# --- Busca textual de eventos (sgea_app.busca) ---
+
+class BuscaEventosTests(BaseTestCase):
+    def buscar(self, texto):
+        return list(busca.ranquear(Evento.objects.all(), texto).values_list('nome', flat=True))
+
+    def test_triggers_criados_pelas_migracoes(self):
+        self.assertEqual(busca.triggers_ausentes(), [])
+        self.assertEqual(busca.verificar_triggers(databases=['default']), [])
+
+    def test_busca_sem_acentos_com_prefixo_e_relevancia(self):
+        criar_evento(self.organizador, self.professor, nome='Seminário de Física')
+        criar_evento(self.organizador, self.professor, nome='Oficina de Python', local='Laboratório de Física')
+        self.assertEqual(self.buscar('fisica semin'), ['Seminário de Física'])
+        # Nome pesa mais que local
+        self.assertEqual(self.buscar('física'), ['Seminário de Física', 'Oficina de Python'])
+        self.assertEqual(self.buscar('"; DROP'), [])
+
+    def test_indice_acompanha_alteracoes(self):
+        evento = criar_evento(self.organizador, self.professor, nome='Palestra Inicial')
+        evento.nome = 'Palestra de Robótica'
+        evento.save()
+        self.assertEqual(self.buscar('robotica'), ['Palestra de Robótica'])
+        self.assertEqual(self.buscar('inicial'), [])
+
+        self.professor.first_name, self.professor.last_name = 'Ada', 'Lovelace'
+        self.professor.save()
+        self.assertEqual(self.buscar('lovelace'), ['Palestra de Robótica'])
+
+        evento.delete()
+        self.assertEqual(self.buscar('robotica'), [])
+
+    def test_verificacao_acusa_triggers_ausentes(self):
+        # DDL do SQLite é transacional: o TestCase desfaz a remoção ao final
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER evento_busca_alteracao")
+            erros = busca.verificar_triggers(databases=['default'])
+            self.assertEqual([erro.id for erro in erros], ['sgea.E001'])
+            self.assertIn('evento_busca_alteracao', erros[0].msg)
+
+            busca.criar_triggers(None, SimpleNamespace(connection=connection, execute=cursor.execute))
+        self.assertEqual(busca.triggers_ausentes(), [])
+
+
+# --- API de eventos: GET condicional, throttle e busca ---
+
+class ApiEventosTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cabecalho = cabecalho_token(self.aluno)
+        criar_evento(self.organizador, self.professor, nome='Seminário de Física')
+        criar_evento(self.organizador, self.professor, nome='Oficina de Python', local='Laboratório de Física')
+
+    def test_get_condicional_responde_304(self):
+        response = self.client.get('/api/eventos/', **self.cabecalho)
+        self.assertEqual(response.status_code, 200)
+        condicional = {**self.cabecalho, 'HTTP_IF_NONE_MATCH': response['ETag']}
+        self.assertEqual(self.client.get('/api/eventos/', **condicional).status_code, 304)
+
+        criar_evento(self.organizador, self.professor, nome='Evento novo')
+        self.assertEqual(self.client.get('/api/eventos/', **condicional).status_code, 200)
+
+    def test_304_nao_conta_no_limite(self):
+        with mock.patch.dict(limites.ScopedRateThrottleCompartilhado.THROTTLE_RATES, {'consulta_eventos': '2/day'}):
+            etag = self.client.get('/api/eventos/', **self.cabecalho)['ETag']
+            condicional = {**self.cabecalho, 'HTTP_IF_NONE_MATCH': etag}
+            with mock.patch('sgea_app.api_views.registrar_log') as registrar:
+                situacoes = [self.client.get('/api/eventos/', **condicional).status_code for _ in range(5)]
+            registrar.assert_not_called()
+            # Os 304 não gastaram a cota: ainda cabe uma resposta completa, e só então o limite vale
+            self.assertEqual(self.client.get('/api/eventos/', **self.cabecalho).status_code, 200)
+            self.assertEqual(self.client.get('/api/eventos/', **self.cabecalho).status_code, 429)
+        self.assertEqual(situacoes, [304] * 5)
+
+    def test_anonimo_recebe_401_antes_da_validacao(self):
+        self.assertEqual(self.client.get('/api/eventos/').status_code, 401)
+        self.assertEqual(self.client.get('/api/eventos/busca/').status_code, 401)
+        self.assertEqual(self.client.get('/api/eventos/?inicio_de=ontem').status_code, 401)
+
+    def test_busca_exige_texto(self):
+        response = self.client.get('/api/eventos/busca/?q=%20', **self.cabecalho)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('q', response.json())
+
+    def test_busca_ordenada_por_relevancia(self):
+        response = self.client.get('/api/eventos/busca/?q=fisica', **self.cabecalho)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([evento['nome'] for evento in response.json()['results']], ['Seminário de Física', 'Oficina de Python'])
+
+
+# --- Check-in por QR code (sgea_app.checkin) ---
+
+class CheckinTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.evento = criar_evento(self.organizador, self.professor)
+        self.inscricao = inscricoes.inscrever(self.aluno, self.evento)
+        self.url = reverse('registrar_leituras_checkin', args=[checkin.gerar_chave_quiosque(self.evento.pk)])
+
+    def ler(self, *leituras, url=None):
+        return self.client.post(url or self.url, {'leituras': list(leituras)}, content_type='application/json')
+
+    def situacoes(self, response):
+        return [item['situacao'] for item in response.json()['resultados']]
+
+    def test_situacao_de_cada_leitura(self):
+        ingresso = checkin.gerar_ingresso(self.inscricao.pk, self.evento.pk)
+        outro = checkin.gerar_ingresso(self.inscricao.pk, self.evento.pk + 1)
+        response = self.ler(ingresso, ingresso, outro, ingresso[:-1] + 'x')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.situacoes(response), [
+            checkin.PRESENTE, checkin.REPETIDO, checkin.OUTRO_EVENTO, checkin.INVALIDO,
+        ])
+
+    def test_link_de_quiosque_invalido(self):
+        url = reverse('registrar_leituras_checkin', args=['adulterado'])
+        self.assertEqual(self.ler('x', url=url).status_code, 403)
+        self.assertEqual(self.client.post(self.url, 'nada', content_type='application/json').status_code, 400)
+
+    def test_gravacao_atualiza_estatisticas_e_caches(self):
+        versao_eventos = cache_eventos.versao()
+        versoes_painel = painel._versoes(self.aluno.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ler(checkin.gerar_ingresso(self.inscricao.pk, self.evento.pk))
+
+        self.inscricao.refresh_from_db()
+        self.assertTrue(self.inscricao.presenca)
+        self.assertEqual(estatisticas.do_evento(self.evento)['presentes'], 1)
+        self.assertGreater(cache_eventos.versao(), versao_eventos)
+        self.assertGreater(painel._versoes(self.aluno.pk)[1], versoes_painel[1])
+
+    def test_inscricao_cancelada_e_ignorada(self):
+        ingresso = checkin.gerar_ingresso(self.inscricao.pk, self.evento.pk)
+        inscricoes.cancelar(self.aluno, self.evento)
+        self.assertEqual(self.situacoes(self.ler(ingresso)), [checkin.PRESENTE])
+        self.assertEqual(estatisticas.do_evento(self.evento)['presentes'], 0)
+
+
+# --- Gravação da auditoria em lote (sgea_app.auditoria) ---
+
+class GravadorAuditoriaTests(TransactionTestCase):
+    """A thread de gravação usa a própria conexão: as gravações precisam estar commitadas."""
+
+    def gravador(self, **opcoes):
+        gravador = auditoria.GravadorAuditoria(**{'intervalo': 0.05, **opcoes})
+        self.addCleanup(gravador.encerrar)
+        return gravador
+
+    def logs(self, quantidade, prefixo='log'):
+        return [LogAuditoria(acao='login', detalhes=f"{prefixo} {i}", data_hora=timezone.now()) for i in range(quantidade)]
+
+    def test_thread_grava_em_lotes(self):
+        gravador = self.gravador(tamanho_lote=3)
+        inserts = []
+        gravar = gravador._gravar
+        with mock.patch.object(gravador, '_gravar', side_effect=lambda lote: (inserts.append(len(lote)), gravar(lote))):
+            for log in self.logs(7):
+                gravador.enfileirar(log)
+            gravador.encerrar()
+        self.assertEqual(LogAuditoria.objects.count(), 7)
+        self.assertTrue(all(tamanho <= 3 for tamanho in inserts))
+        self.assertLess(len(inserts), 7)
+
+    def test_politicas_de_fila_cheia(self):
+        with mock.patch.object(auditoria.GravadorAuditoria, '_garantir_thread'):  # fila parada
+            descartar = self.gravador(tamanho_fila=2, politica='descartar')
+            for log in self.logs(3, 'descartar'):
+                descartar.enfileirar(log)
+            self.assertEqual(descartar.descartados, 1)
+
+            direto = self.gravador(tamanho_fila=1, politica='gravar_direto')
+            for log in self.logs(2, 'direto'):
+                direto.enfileirar(log)
+            self.assertEqual(LogAuditoria.objects.filter(detalhes__startswith='direto').count(), 1)
+
+            direto.flush()
+            descartar.flush()
+        self.assertEqual(LogAuditoria.objects.count(), 4)
+        with self.assertRaises(ValueError):
+            auditoria.GravadorAuditoria(politica='ignorar')
+
+    def test_registro_invalido_nao_derruba_o_lote(self):
+        gravador = self.gravador()
+        logs = self.logs(3)
+        logs[1].acao = None  # NOT NULL
+        with mock.patch.object(auditoria.GravadorAuditoria, '_garantir_thread'), self.assertLogs('sgea_app.auditoria'):
+            for log in logs:
+                gravador.enfileirar(log)
+            gravador.flush()
+        self.assertEqual(LogAuditoria.objects.count(), 2)
+
+    @override_settings(AUDITORIA_MODO='assincrono')
+    def test_so_enfileira_apos_o_commit(self):
+        gravador = mock.Mock()
+        with mock.patch.object(auditoria, 'obter_gravador', return_value=gravador):
+            try:
+                with transaction.atomic():
+                    auditoria.registrar(None, 'login', 'desfeito')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            gravador.enfileirar.assert_not_called()
+
+            with transaction.atomic():
+                auditoria.registrar(None, 'login', 'confirmado')
+                gravador.enfileirar.assert_not_called()
+            self.assertEqual(gravador.enfileirar.call_args.args[0].detalhes, 'confirmado')
+
+
+# --- Log de auditoria: paginação por chave e arquivamento ---
+
+class LogsAuditoriaTests(BaseTestCase):
+    def criar_logs(self, quantidade, dias_atras=0, acao='login'):
+        # Vários logs no mesmo instante: o desempate pelo id precisa valer entre as páginas
+        momento = timezone.now() - timedelta(days=dias_atras)
+        return LogAuditoria.objects.bulk_create([
+            LogAuditoria(usuario=self.aluno, acao=acao, detalhes=f"log {i}", data_hora=momento - timedelta(seconds=i // 3))
+            for i in range(quantidade)
+        ])
+
+    def test_cursor_ida_e_volta(self):
+        momento = timezone.now()
+        self.assertEqual(decodificar_cursor(codificar_cursor(momento, 42)), (momento, 42))
+        self.assertIsNone(decodificar_cursor('lixo'))
+
+    def test_paginas_sem_repeticao_nem_lacunas(self):
+        self.criar_logs(8)
+        esperado = list(LogAuditoria.objects.order_by('-data_hora', '-pk').values_list('pk', flat=True))
+
+        vistos, paginas, antes = [], [], None
+        while True:
+            pagina = paginar_keyset(LogAuditoria.objects.all(), 'data_hora', antes=antes, por_pagina=3)
+            paginas.append(pagina)
+            vistos += [log.pk for log in pagina['itens']]
+            antes = pagina['proximo']
+            if antes is None:
+                break
+        self.assertEqual(vistos, esperado)
+        self.assertEqual([len(pagina['itens']) for pagina in paginas], [3, 3, 2])
+
+        # Voltando da última página chega-se exatamente à anterior
+        volta = paginar_keyset(LogAuditoria.objects.all(), 'data_hora', apos=paginas[2]['anterior'], por_pagina=3)
+        self.assertEqual([log.pk for log in volta['itens']], [log.pk for log in paginas[1]['itens']])
+
+    def test_tela_filtra_e_restringe_ao_organizador(self):
+        self.criar_logs(3)
+        self.criar_logs(2, acao='inscricao')
+        self.client.force_login(self.aluno)
+        self.assertRedirects(self.client.get(reverse('logs_auditoria')), reverse('participantes_dashboard'), fetch_redirect_response=False)
+
+        self.client.force_login(self.organizador)
+        response = self.client.get(reverse('logs_auditoria'), {'acao': 'inscricao', 'usuario': 'alu'})
+        self.assertEqual(len(response.context['logs']), 2)
+        response = self.client.get(reverse('logs_auditoria'), {'antes': 'cursor-invalido'})
+        self.assertEqual(len(response.context['logs']), 5)
+
+    def test_arquivamento_move_os_antigos_para_arquivos_diarios(self):
+        antigos = self.criar_logs(4, dias_atras=40)
+        self.criar_logs(2)
+        destino = tempfile.mkdtemp(prefix='sgea_arquivo_')
+        self.addCleanup(shutil.rmtree, destino, ignore_errors=True)
+
+        call_command('arquivar_logs', '--dias', '30', '--destino', destino, '--dry-run', stdout=mock.MagicMock())
+        self.assertEqual(LogAuditoria.objects.count(), 6)
+
+        call_command('arquivar_logs', '--dias', '30', '--destino', destino, '--lote', '3', stdout=mock.MagicMock())
+        self.assertEqual(LogAuditoria.objects.count(), 2)
+        arquivados = []
+        for pasta, _, arquivos in os.walk(destino):
+            for nome in arquivos:
+                with gzip.open(os.path.join(pasta, nome), 'rt', encoding='utf-8') as arquivo:
+                    arquivados += [json.loads(linha) for linha in arquivo]
+        self.assertEqual(sorted(registro['id'] for registro in arquivados), sorted(log.pk for log in antigos))
+        self.assertEqual(arquivados[0]['usuario__username'], 'aluno')
+
+
+# --- Emissão de certificados em lote (sgea_app.certificados) ---
+
+class EmissaoCertificadosTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.evento = criar_evento(self.organizador, self.professor, vagas=10)
+        self.usuarios = criar_usuarios('emissao', 5)
+        for usuario in self.usuarios:
+            inscricoes.inscrever(usuario, self.evento)
+        encerrar(self.evento)
+        # Três presentes, um deles já com certificado
+        presentes = Inscricao.objects.filter(usuario__in=self.usuarios[:3])
+        presentes.update(presenca=True)
+        Certificado.objects.create(inscricao=presentes.order_by('pk').first(), codigo_validacao=gerar_codigo())
+
+    def test_emite_so_os_elegiveis_uma_unica_vez(self):
+        # Presença em evento ainda não encerrado não gera certificado
+        futuro = criar_evento(self.organizador, self.professor, nome='Futuro')
+        Inscricao.objects.create(usuario=self.aluno, evento=futuro, presenca=True)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(certificados.emitir_certificados_pendentes(tamanho_lote=1), 2)
+        self.assertEqual(
+            set(Certificado.objects.values_list('inscricao__usuario', flat=True)),
+            {usuario.pk for usuario in self.usuarios[:3]},
+        )
+        self.assertEqual(EstatisticaEvento.objects.get(evento=self.evento).certificados, 3)
+        # Os códigos novos já constam do índice de validação
+        novo = Certificado.objects.order_by('-pk').first().codigo_validacao
+        self.assertIsNotNone(validacao.obter_indice().consultar(novo))
+
+        self.assertEqual(certificados.emitir_certificados_pendentes(), 0)
+        self.assertEqual(Certificado.objects.count(), 3)
+
+    def test_codigo_colidindo_com_um_existente_e_sorteado_de_novo(self):
+        existente = Certificado.objects.get().codigo_validacao
+        sorteios = iter([existente, existente, 'NOVO000000000001', 'NOVO000000000002'])
+        with mock.patch.object(certificados, 'gerar_codigo', lambda: next(sorteios)):
+            codigos = certificados._codigos_unicos(2)
+        self.assertEqual(sorted(codigos), ['NOVO000000000001', 'NOVO000000000002'])
+
+    def test_tela_do_organizador(self):
+        url = reverse('emitir_certificados_evento', args=[self.evento.pk])
+        self.client.force_login(self.aluno)
+        self.assertRedirects(self.client.post(url), reverse('organizador_dashboard'), fetch_redirect_response=False)
+        self.assertEqual(Certificado.objects.count(), 1)
+
+        self.client.force_login(self.organizador)
+        response = self.client.post(url)
+        self.assertRedirects(response, reverse('gerenciar_participantes', args=[self.evento.pk]), fetch_redirect_response=False)
+        self.assertEqual(Certificado.objects.count(), 3)
+
+
+# --- PDF dos certificados: cache em disco e exportação em ZIP ---
+
+class PdfCertificadosTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        pasta = tempfile.mkdtemp(prefix='sgea_pdf_')
+        self.addCleanup(shutil.rmtree, pasta, ignore_errors=True)
+        configuracao = self.settings(CERTIFICADOS_DIR_CACHE=pasta)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+        self.evento = criar_evento(self.organizador, self.professor)
+        self.certificados = []
+        for usuario in (self.aluno, criar_usuario('outro')):
+            inscricao = Inscricao.objects.create(usuario=usuario, evento=self.evento, presenca=True)
+            self.certificados.append(Certificado.objects.create(inscricao=inscricao, codigo_validacao=gerar_codigo()))
+
+    def carregar(self, certificado):
+        return certificados.certificados_com_dados().get(pk=certificado.pk)
+
+    def test_pdf_renderizado_uma_vez_e_refeito_quando_os_dados_mudam(self):
+        renderizar = mock.Mock(wraps=pdf.renderizar_certificado)
+        with mock.patch.object(pdf, 'renderizar_certificado', renderizar):
+            caminho, assinatura = certificados.obter_pdf(self.carregar(self.certificados[0]))
+            self.assertEqual(certificados.obter_pdf(self.carregar(self.certificados[0])), (caminho, assinatura))
+            self.assertEqual(renderizar.call_count, 1)
+
+            self.evento.nome = 'Evento Renomeado'
+            self.evento.save()
+            novo_caminho, nova_assinatura = certificados.obter_pdf(self.carregar(self.certificados[0]))
+        self.assertEqual(renderizar.call_count, 2)
+        self.assertNotEqual(nova_assinatura, assinatura)
+        with open(novo_caminho, 'rb') as arquivo:
+            self.assertTrue(arquivo.read().startswith(b'%PDF'))
+
+    def test_download_condicional_e_restrito_ao_dono(self):
+        codigo = self.certificados[0].codigo_validacao
+        url = reverse('baixar_certificado_pdf', args=[codigo])
+        self.client.force_login(self.professor)
+        self.assertRedirects(self.client.get(url), reverse('participantes_dashboard'), fetch_redirect_response=False)
+
+        self.client.force_login(self.aluno)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_zip_com_um_pdf_por_certificado(self):
+        url = reverse('exportar_certificados_evento', args=[self.evento.pk])
+        self.client.force_login(self.aluno)
+        self.assertRedirects(self.client.get(url), reverse('organizador_dashboard'), fetch_redirect_response=False)
+
+        self.client.force_login(self.organizador)
+        with self.settings(CERTIFICADOS_PROCESSOS=1):
+            response = self.client.get(url)
+            conteudo = b''.join(response.streaming_content)
+        with zipfile.ZipFile(io.BytesIO(conteudo)) as arquivo_zip:
+            self.assertIsNone(arquivo_zip.testzip())
+            nomes = arquivo_zip.namelist()
+        self.assertEqual(len(nomes), 2)
+        for certificado in self.certificados:
+            self.assertTrue(any(certificado.codigo_validacao in nome for nome in nomes))
+
+    def test_zip_reaproveita_o_pool_e_renderiza_poucos_no_proprio_processo(self):
+        criados = []
+
+        def pool_falso(max_workers, mp_context):
+            criados.append(ThreadPoolExecutor(max_workers))
+            return criados[-1]
+
+        def baixar():
+            lista = certificados.certificados_com_dados().order_by('pk')
+            with zipfile.ZipFile(io.BytesIO(b''.join(certificados.zip_certificados(lista, processos=2)))) as arquivo_zip:
+                self.assertIsNone(arquivo_zip.testzip())
+                return arquivo_zip.namelist()
+
+        self.addCleanup(lambda: [pool.shutdown() for pool in criados])
+        with mock.patch.object(certificados, 'ProcessPoolExecutor', pool_falso), \
+                mock.patch.object(certificados, '_pool', None):
+            # Menos pendentes que MIN_PENDENTES_PARALELO: nenhum pool
+            self.assertEqual(len(baixar()), 2)
+            self.assertEqual(criados, [])
+
+            with mock.patch.object(certificados, 'MIN_PENDENTES_PARALELO', 1), \
+                    mock.patch.object(certificados, 'TAMANHO_LOTE_ZIP', 1):
+                for certificado in self.certificados:
+                    self.evento.nome = f"Renomeado {certificado.pk}"  # invalida o cache dos PDFs
+                    self.evento.save()
+                    nomes = baixar()
+                    self.assertEqual([nome.rsplit(' - ', 1)[1] for nome in nomes],
+                                     [f"{c.codigo_validacao}.pdf" for c in self.certificados])
+        self.assertEqual(len(criados), 1)
+
+
+# --- API de eventos: paginação por cursor e ?fields= ---
+
+class ApiEventosPaginacaoTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cabecalho = cabecalho_token(self.aluno)
+        self.eventos = [
+            criar_evento(self.organizador, self.professor, nome=f"Evento {i}", inicio_em=timedelta(days=5 - i))
+            for i in range(5)
+        ]
+
+    def test_cursor_percorre_todos_em_ordem_de_inicio(self):
+        nomes, url = [], '/api/eventos/?page_size=2'
+        while url:
+            dados = self.client.get(url, **self.cabecalho).json()
+            self.assertLessEqual(len(dados['results']), 2)
+            nomes += [evento['nome'] for evento in dados['results']]
+            url = dados['next']
+        self.assertEqual(nomes, [f"Evento {i}" for i in reversed(range(5))])
+
+    def test_fields_devolve_so_os_campos_pedidos(self):
+        response = self.client.get('/api/eventos/?fields=id,nome', **self.cabecalho)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({tuple(sorted(evento)) for evento in response.json()['results']}, {('id', 'nome')})
+
+        response = self.client.get('/api/eventos/?fields=nome,senha', **self.cabecalho)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('senha', response.json()['fields'])
+
+    def test_filtros(self):
+        encerrar(self.eventos[0])
+        response = self.client.get('/api/eventos/?abertos=1&fields=nome', **self.cabecalho)
+        self.assertNotIn('Evento 0', [evento['nome'] for evento in response.json()['results']])
+        self.assertEqual(self.client.get('/api/eventos/?inicio_de=ontem', **self.cabecalho).status_code, 400)
+
+
+# --- Ativação da conta por SSE (sgea_app.notificacoes) ---
+
+class AtivacaoSseTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.pendente = criar_usuario('pendente', is_active=False)
+        self.canal = notificacoes.canal_ativacao(self.pendente.pk)
+
+    async def test_hub_resolve_e_remove_os_assinantes(self):
+        hub = notificacoes.HubNotificacoes()
+        futuro = hub.assinar('canal')
+        cancelado = hub.assinar('canal')
+        hub.cancelar('canal', cancelado)
+        self.assertEqual(hub.total_assinantes(), 1)
+        self.assertEqual(hub.entregar('canal', {'ativo': True}), 1)
+        self.assertEqual(await asyncio.wait_for(futuro, 1), {'ativo': True})
+        self.assertEqual(hub.total_assinantes(), 0)
+
+    async def test_fluxo_envia_ativo_quando_publicado(self):
+        fluxo = views._fluxo_ativacao(self.pendente.pk)
+        self.assertTrue((await anext(fluxo)).startswith('retry:'))
+        # Já assinado antes da primeira verificação no banco: a publicação não se perde
+        notificacoes.publicar(self.canal, {'ativo': True})
+        self.assertEqual(await asyncio.wait_for(anext(fluxo), 5), 'event: ativo\ndata: {"ativo": true}\n\n')
+        with self.assertRaises(StopAsyncIteration):
+            await anext(fluxo)
+        self.assertEqual(notificacoes.hub.total_assinantes(), 0)
+
+    async def test_fluxo_sem_espera_para_conta_ativa_ou_inexistente(self):
+        fluxo = views._fluxo_ativacao(self.aluno.pk)
+        await anext(fluxo)
+        self.assertTrue((await anext(fluxo)).startswith('event: ativo'))
+
+        fluxo = views._fluxo_ativacao(999999)
+        await anext(fluxo)
+        self.assertTrue((await anext(fluxo)).startswith('event: inexistente'))
+
+    def test_ativacao_publica_no_canal_do_usuario(self):
+        uid = urlsafe_base64_encode(force_bytes(self.pendente.pk))
+        token = default_token_generator.make_token(self.pendente)
+        with mock.patch.object(notificacoes, 'publicar') as publicar, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(reverse('activate', args=[uid, token]))
+        self.assertRedirects(response, reverse('login'), fetch_redirect_response=False)
+        publicar.assert_called_once_with(self.canal, {'ativo': True})
+
+
+# --- Importação de usuários por CSV (sgea_app.importacao) ---
+
+CSV_IMPORTACAO = """username,email,nome,perfil,telefone,instituicao_ensino,senha
+ana,ana@teste.local,Ana Souza,aluno,,Universidade Teste,Segura!123
+bruno,bruno@teste.local,Bruno Lima,professor,(61) 99999-0000,Universidade Teste,Segura!123
+ANA,ana2@teste.local,Ana Repetida,aluno,,Universidade Teste,Segura!123
+carla,aluno@teste.local,Carla Dias,aluno,,Universidade Teste,Segura!123
+davi,davi@teste.local,Davi Rocha,diretor,,,Segura!123
+elis,elis@teste.local,Elis Melo,organizador,,,123
+fabio,fabio@teste.local,Fabio Reis,organizador,,,Segura!123
+"""
+
+
+@override_settings(IMPORTACAO_PROCESSOS=1)
+class ImportacaoUsuariosTests(BaseTestCase):
+    def test_importa_validos_e_relata_recusados(self):
+        criados, erros = importacao.importar_usuarios(io.StringIO(CSV_IMPORTACAO), tamanho_bloco=2)
+        self.assertEqual(criados, 3)
+        self.assertEqual(
+            set(Usuario.objects.filter(username__in=['ana', 'bruno', 'fabio']).values_list('username', 'perfil')),
+            {('ana', 'aluno'), ('bruno', 'professor'), ('fabio', 'organizador')},
+        )
+        self.assertTrue(Usuario.objects.get(username='bruno').check_password(SENHA))
+
+        recusados = {erro['linha']: erro['erros'] for erro in erros}
+        self.assertEqual(sorted(recusados), [4, 5, 6, 7])
+        self.assertIn('username', recusados[4])  # repetido no próprio arquivo, sem diferenciar maiúsculas
+        self.assertIn('email', recusados[5])     # já cadastrado
+        self.assertIn('perfil', recusados[6])
+        self.assertIn('senha', recusados[7])
+
+    def test_aceita_ponto_e_virgula_e_recusa_cabecalho_incompleto(self):
+        criados, erros = importacao.importar_usuarios(io.StringIO(CSV_IMPORTACAO.replace(',', ';')))
+        self.assertEqual((criados, len(erros)), (3, 4))
+
+        with self.assertRaises(importacao.ArquivoInvalido):
+            importacao.importar_usuarios(io.StringIO("username,email\nzeca,zeca@teste.local\n"))
+
+    def test_tela_com_relatorio_so_para_quem_importou(self):
+        pasta = tempfile.mkdtemp(prefix='sgea_importacao_')
+        self.addCleanup(shutil.rmtree, pasta, ignore_errors=True)
+        self.client.force_login(self.organizador)
+        arquivo = SimpleUploadedFile('usuarios.csv', CSV_IMPORTACAO.encode('utf-8-sig'), content_type='text/csv')
+        with self.settings(IMPORTACAO_DIR_RELATORIOS=pasta):
+            response = self.client.post(reverse('importar_usuarios'), {'arquivo': arquivo})
+            self.assertEqual((response.context['criados'], response.context['total_erros']), (3, 4))
+            url = reverse('baixar_relatorio_importacao', args=[response.context['relatorio']])
+            relatorio = b''.join(self.client.get(url).streaming_content).decode('utf-8-sig')
+            self.assertEqual(len(relatorio.strip().splitlines()), 5)
+
+            self.client.force_login(Usuario.objects.get(username='fabio'))
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+
+# --- Login por username ou e-mail (sgea_app.backends) ---
+
+class LoginUsernameOuEmailTests(BaseTestCase):
+    def test_login_sem_diferenciar_maiusculas(self):
+        self.assertEqual(authenticate(username='ALUNO', password=SENHA), self.aluno)
+        self.assertEqual(authenticate(username='Aluno@Teste.Local', password=SENHA), self.aluno)
+        self.assertIsNone(authenticate(username='aluno', password='errada'))
+
+    def test_usuario_inexistente_ou_inativo(self):
+        with mock.patch.object(Usuario, 'set_password', autospec=True) as gerar_hash:
+            self.assertIsNone(authenticate(username='ninguem', password=SENHA))
+        gerar_hash.assert_called_once()  # mesmo custo de um usuário existente
+
+        Usuario.objects.filter(pk=self.aluno.pk).update(is_active=False)
+        self.assertIsNone(authenticate(username='aluno', password=SENHA))
+
+    def test_email_repetido_vale_o_cadastro_mais_antigo(self):
+        criar_usuario('copia', email='ALUNO@teste.local')
+        self.assertEqual(authenticate(username='aluno@teste.local', password=SENHA), self.aluno)
+
+    def test_username_tem_prioridade_sobre_o_email_de_outro(self):
+        # O username do usuário novo é igual ao e-mail de um cadastro mais antigo
+        novo = criar_usuario('Aluno@teste.local', email='novo@teste.local')
+        self.assertEqual(authenticate(username='aluno@TESTE.local', password=SENHA), novo)
+        self.assertEqual(authenticate(username='aluno', password=SENHA), self.aluno)
+
+    @skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN é do SQLite")
+    def test_busca_usa_os_indices_funcionais(self):
+        with CaptureQueriesContext(connection) as consultas:
+            Usuario.objects.por_login('Aluno').first()
+        self.assertEqual(len(consultas), 1)
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {consultas[0]['sql']}")
+            plano = ' '.join(str(linha) for linha in cursor.fetchall())
+        self.assertIn('usuario_username_lower_idx', plano)
+        self.assertIn('usuario_email_lower_idx', plano)
+
+
+# --- Limites da API: janela deslizante (sgea_app.limites) ---
+
+class ArmazenamentoLimitesTests(TestCase):
+    INICIO = 60 * 1_000_000  # início exato de uma janela de 60s
+
+    def armazenamentos(self):
+        pasta = tempfile.mkdtemp(prefix='sgea_limites_')
+        self.addCleanup(shutil.rmtree, pasta, ignore_errors=True)
+        return [limites.ArmazenamentoMemoria(), limites.ArmazenamentoSQLite(os.path.join(pasta, 'limites.sqlite3'))]
+
+    def registrar(self, armazenamento, momento, chave='cliente', limite=3):
+        with mock.patch.object(limites.time, 'time', return_value=self.INICIO + momento):
+            return armazenamento.registrar(chave, limite, 60)
+
+    def test_janela_deslizante(self):
+        for armazenamento in self.armazenamentos():
+            with self.subTest(armazenamento=type(armazenamento).__name__):
+                self.assertEqual([self.registrar(armazenamento, 1)[0] for _ in range(3)], [True] * 3)
+                permitido, espera = self.registrar(armazenamento, 1)
+                self.assertFalse(permitido)
+                self.assertAlmostEqual(espera, 59 + 20, places=3)  # próxima janela + 1/3 dela
+                self.assertTrue(self.registrar(armazenamento, 1, chave='outro')[0])
+
+                # Metade da janela seguinte: a anterior pesa 1,5 requisição
+                self.assertTrue(self.registrar(armazenamento, 90)[0])
+                permitido, espera = self.registrar(armazenamento, 90)
+                self.assertFalse(permitido)
+                self.assertAlmostEqual(espera, 10, places=3)
+
+                # Duas janelas depois os contadores antigos não pesam mais
+                self.assertEqual([self.registrar(armazenamento, 181)[0] for _ in range(4)], [True] * 3 + [False])
+
+    def test_sqlite_compartilhado_entre_instancias_e_threads(self):
+        pasta = tempfile.mkdtemp(prefix='sgea_limites_')
+        self.addCleanup(shutil.rmtree, pasta, ignore_errors=True)
+        caminho = os.path.join(pasta, 'limites.sqlite3')
+        # Duas instâncias no mesmo arquivo, como dois workers
+        workers = [limites.ArmazenamentoSQLite(caminho), limites.ArmazenamentoSQLite(caminho)]
+        resultados = []
+
+        def requisicoes(armazenamento):
+            for _ in range(20):
+                resultados.append(armazenamento.registrar('cliente', 50, 3600)[0])
+
+        threads = [threading.Thread(target=requisicoes, args=(workers[i % 2],)) for i in range(6)]
+        with mock.patch.object(limites.time, 'time', return_value=self.INICIO + 1):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(Counter(resultados), {True: 50, False: 70})
+
+
+# --- Painel do participante em fragmentos (sgea_app.painel) ---
+
+class PainelFragmentosTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.evento = criar_evento(self.organizador, self.professor, nome='Congresso de Química')
+        criar_evento(self.organizador, self.professor, nome='Feira de Robótica')
+        self.client.force_login(self.aluno)
+
+    def secao(self, secao, **params):
+        response = self.client.get(reverse('participantes_dashboard_secao', args=[secao]), params)
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_fragmento_em_cache_ate_a_inscricao(self):
+        renderizar = mock.Mock(wraps=painel._renderizar)
+        with mock.patch.object(painel, '_renderizar', renderizar):
+            self.assertIn('Congresso de Química', self.secao('disponiveis'))
+            html = self.secao('disponiveis')
+            self.assertEqual(renderizar.call_count, 1)
+            # O token CSRF é trocado na entrega, não fica no cache
+            self.assertNotIn(painel._MARCADOR_CSRF, html)
+            self.assertIn('name="csrfmiddlewaretoken"', html)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                inscricoes.inscrever(self.aluno, self.evento)
+            self.assertNotIn('Congresso de Química', self.secao('disponiveis'))
+            self.assertIn('Congresso de Química', self.secao('inscritos'))
+        self.assertEqual(renderizar.call_count, 3)
+
+    def test_edicao_do_evento_invalida_todos_os_paineis(self):
+        self.assertIn('Congresso de Química', self.secao('disponiveis'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.evento.nome = 'Congresso de Bioquímica'
+            self.evento.save()
+        self.assertIn('Congresso de Bioquímica', self.secao('disponiveis'))
+
+    def test_busca_e_secoes_restritas(self):
+        html = self.secao('disponiveis', q='robotica')
+        self.assertIn('Feira de Robótica', html)
+        self.assertNotIn('Congresso de Química', html)
+
+        self.assertEqual(self.client.get(reverse('participantes_dashboard_secao', args=['responsavel'])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('participantes_dashboard_secao', args=['outra'])).status_code, 404)
+        self.client.force_login(self.professor)
+        self.assertIn('Congresso de Química', self.secao('responsavel'))
+
+
+# --- Presença em lote (inscricoes.atualizar_presencas) ---
+
+class PresencaLoteTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.evento = criar_evento(self.organizador, self.professor)
+        self.inscricoes = [inscricoes.inscrever(usuario, self.evento) for usuario in criar_usuarios('presenca', 4)]
+        self.url = reverse('api_presencas_lote', args=[self.evento.pk])
+        self.cabecalho = cabecalho_token(self.organizador)
+
+    def test_chamada_em_lote(self):
+        outro_evento = criar_evento(self.organizador, self.professor, nome='Outro')
+        de_outro_evento = Inscricao.objects.create(usuario=self.aluno, evento=outro_evento)
+        Inscricao.objects.filter(pk=self.inscricoes[3].pk).update(presenca=True)
+        versao_usuario = painel._versoes(self.inscricoes[0].usuario_id)[1]
+        versao_listagem = cache_eventos.versao()
+
+        dados = {
+            'presentes': [self.inscricoes[0].pk, self.inscricoes[1].pk, de_outro_evento.pk],
+            'ausentes': [self.inscricoes[2].pk, self.inscricoes[3].pk],
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, dados, content_type='application/json', **self.cabecalho)
+        self.assertEqual(response.json(), {'alteradas': 3, 'inalteradas': 1, 'ignoradas': [de_outro_evento.pk]})
+        self.assertEqual(
+            list(Inscricao.objects.filter(evento=self.evento).order_by('pk').values_list('presenca', flat=True)),
+            [True, True, False, False],
+        )
+        self.assertEqual(EstatisticaEvento.objects.get(evento=self.evento).presentes, 1)
+        # bulk_update não dispara sinais: as versões de cache são incrementadas diretamente
+        self.assertGreater(painel._versoes(self.inscricoes[0].usuario_id)[1], versao_usuario)
+        self.assertNotEqual(cache_eventos.versao(), versao_listagem)
+
+    def test_evento_encerrado_emite_os_certificados(self):
+        encerrar(self.evento)
+        with self.captureOnCommitCallbacks(execute=True):
+            inscricoes.atualizar_presencas(self.evento, {self.inscricoes[0].pk: True})
+        self.assertTrue(Certificado.objects.filter(inscricao=self.inscricoes[0]).exists())
+        # Com certificado a presença não é mais alterada
+        alteradas, ignoradas = inscricoes.atualizar_presencas(self.evento, {self.inscricoes[0].pk: False})
+        self.assertEqual((alteradas, ignoradas), ([], [self.inscricoes[0].pk]))
+
+    def test_permissao_e_validacao(self):
+        dados = {'presentes': [self.inscricoes[0].pk]}
+        response = self.client.post(self.url, dados, content_type='application/json', **cabecalho_token(self.aluno))
+        self.assertEqual(response.status_code, 403)
+
+        conflito = {'presentes': [self.inscricoes[0].pk], 'ausentes': [self.inscricoes[0].pk]}
+        for dados in ({}, conflito):
+            response = self.client.post(self.url, dados, content_type='application/json', **self.cabecalho)
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(Inscricao.objects.filter(presenca=True).exists())
+
+
+# --- Variantes dos banners (sgea_app.banners) ---
+
+def imagem_png(largura, altura, cor=(200, 30, 30, 128)):
+    saida = io.BytesIO()
+    Image.new('RGBA', (largura, altura), cor).save(saida, 'PNG')
+    return SimpleUploadedFile('banner.png', saida.getvalue(), content_type='image/png')
+
+
+class BannersTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        # Os arquivos vão para uma pasta temporária, nunca para o media/ do projeto
+        pasta = tempfile.mkdtemp(prefix='sgea_media_')
+        self.addCleanup(shutil.rmtree, pasta, ignore_errors=True)
+        configuracao = self.settings(MEDIA_ROOT=pasta)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        self.storage = banners._storage()
+        self.evento = criar_evento(self.organizador, self.professor, banner=imagem_png(2000, 1000))
+
+    def test_gera_as_variantes_e_troca_o_original(self):
+        self.assertEqual(banners.imagem(self.evento), {'src': self.evento.banner.url, 'srcset': {}})
+        self.assertEqual(list(banners.pendentes()), [self.evento])
+
+        self.assertEqual(banners.processar_pendentes(processos=1), 1)
+        self.assertFalse(banners.pendentes().exists())
+        self.evento.refresh_from_db()
+        imagens = self.evento.banner_variantes['imagens']
+        self.assertEqual({nome: (v['largura'], v['altura']) for nome, v in imagens.items()},
+                         {'miniatura': (320, 160), 'cartao': (640, 320), 'destaque': (1280, 640)})
+        exibicao = banners.imagem(self.evento, 'miniatura')
+        self.assertEqual(exibicao['largura'], 320)
+        self.assertEqual(exibicao['srcset']['webp'].count('w,'), 2)
+
+        # Banner trocado: variantes novas, e o original e as variantes antigas são apagados
+        original, antigas = self.evento.banner.name, banners._caminhos(self.evento.banner_variantes)
+        self.evento.banner = imagem_png(800, 400, cor=(0, 90, 0, 255))
+        self.evento.save()
+        self.assertEqual(banners.processar_pendentes(processos=1), 1)
+        self.evento.refresh_from_db()
+        self.assertFalse(self.storage.exists(original))
+        self.assertFalse(any(self.storage.exists(caminho) for caminho in antigas))
+        # Imagens menores que a largura máxima não são ampliadas
+        self.assertEqual(self.evento.banner_variantes['imagens']['destaque']['largura'], 800)
+
+    def test_banner_ilegivel_fica_com_o_original(self):
+        self.evento.banner = SimpleUploadedFile('banner.png', b'nao e uma imagem', content_type='image/png')
+        self.evento.save()
+        with self.assertLogs('sgea_app.banners', 'ERROR'):
+            self.assertEqual(banners.processar_pendentes(processos=1), 1)
+        self.evento.refresh_from_db()
+        self.assertFalse(banners.pendentes().exists())
+        self.assertEqual(banners.imagem(self.evento)['src'], self.evento.banner.url)
+
+    def test_limpeza_de_orfaos(self):
+        banners.processar_pendentes(processos=1)
+        orfao = self.storage.save(f"{banners.DIR_VARIANTES}/999999/sobra-320.webp", ContentFile(b"x"))
+        self.assertEqual(banners.limpar_orfaos(), 1)
+        self.assertFalse(self.storage.exists(orfao))
+        self.evento.refresh_from_db()
+        self.assertTrue(all(self.storage.exists(c) for c in banners._caminhos(self.evento.banner_variantes)))
+
+
+# --- Estatísticas por evento (sgea_app.estatisticas) ---
+
+class EstatisticasTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.evento = criar_evento(self.organizador, self.professor)
+        usuarios = criar_usuarios('estat', 4)
+        self.inscricoes = [inscricoes.inscrever(usuario, self.evento) for usuario in usuarios]
+        for inscricao in self.inscricoes[:2]:
+            inscricao.presenca = True
+            inscricao.save()
+        Certificado.objects.create(inscricao=self.inscricoes[0], codigo_validacao=gerar_codigo())
+        inscricoes.cancelar(usuarios[3], self.evento)
+
+    def resumo(self):
+        dados = estatisticas.do_evento(self.evento)
+        return {campo: dados[campo] for campo in ('inscritos', 'presentes', 'taxa_presenca', 'certificados', 'inscricoes_por_dia')}
+
+    def test_totais_incrementais_iguais_aos_reconstruidos(self):
+        incremental = self.resumo()
+        self.assertEqual(incremental['inscritos'], 3)
+        self.assertEqual(incremental['presentes'], 2)
+        self.assertEqual(incremental['taxa_presenca'], 66.7)
+        self.assertEqual(incremental['certificados'], 1)
+        self.assertEqual([dia['inscricoes'] for dia in incremental['inscricoes_por_dia']], [3])
+
+        estatisticas.reconstruir()
+        self.assertEqual(self.resumo(), incremental)
+
+    def test_contador_divergente_nao_fica_negativo_e_e_recalculado(self):
+        estatisticas.atualizar(self.evento.pk, certificados=-5)
+        self.assertEqual(EstatisticaEvento.objects.get(evento=self.evento).certificados, 0)
+
+        call_command('recalcular_estatisticas', str(self.evento.pk), stdout=mock.MagicMock())
+        self.assertEqual(EstatisticaEvento.objects.get(evento=self.evento).certificados, 1)
+
+    def test_api_restrita_ao_organizador(self):
+        url = reverse('api_estatisticas_evento', args=[self.evento.pk])
+        self.assertEqual(self.client.get(url, **cabecalho_token(self.professor)).status_code, 403)
+        self.assertEqual(self.client.get(reverse('api_estatisticas'), **cabecalho_token(self.aluno)).status_code, 403)
+
+        cabecalho = cabecalho_token(self.organizador)
+        self.assertEqual(self.client.get(url, **cabecalho).json()['presentes'], 2)
+        totais = self.client.get(reverse('api_estatisticas'), **cabecalho).json()
+        self.assertEqual((totais['inscritos'], totais['certificados']), (3, 1))
+        self.assertEqual([evento['evento'] for evento in totais['eventos']], [self.evento.pk])
+
+
+# --- Exportação de participantes em fluxo (sgea_app.exportacao) ---
+
+class ExportacaoParticipantesTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.evento = criar_evento(self.organizador, self.professor)
+        inscricoes.inscrever(criar_usuario('bia', first_name='Bia', telefone='(61) 99999-0000'), self.evento)
+        inscricao = inscricoes.inscrever(criar_usuario('caio', first_name='=Caio\x07'), self.evento)
+        inscricao.presenca = True
+        inscricao.save()
+        self.codigo = Certificado.objects.create(inscricao=inscricao, codigo_validacao=gerar_codigo()).codigo_validacao
+        self.client.force_login(self.organizador)
+
+    def baixar(self, formato):
+        response = self.client.get(reverse('exportar_participantes', args=[self.evento.pk, formato]))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_csv(self):
+        texto = self.baixar('csv').decode('utf-8')
+        self.assertTrue(texto.startswith('\ufeff'))
+        linhas = list(csv.reader(io.StringIO(texto[1:]), delimiter=';'))
+        self.assertEqual(linhas[0], list(exportacao.COLUNAS))
+        por_usuario = {linha[1]: linha for linha in linhas[1:]}
+        self.assertEqual(sorted(por_usuario), ['bia', 'caio'])
+        self.assertEqual(por_usuario['caio'][0], "'=Caio\x07")  # não vira fórmula na planilha
+        self.assertEqual(por_usuario['caio'][7:], ['Sim', self.codigo])
+        self.assertEqual(por_usuario['bia'][3:6], ['(61) 99999-0000', 'Universidade Teste', 'Aluno'])
+        self.assertEqual(por_usuario['bia'][7:], ['Não', ''])
+
+    def test_xlsx(self):
+        with zipfile.ZipFile(io.BytesIO(self.baixar('xlsx'))) as arquivo_zip:
+            self.assertIsNone(arquivo_zip.testzip())
+            planilha = ElementTree.fromstring(arquivo_zip.read('xl/worksheets/sheet1.xml'))
+        espaco = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+        linhas = [
+            [''.join(celula.itertext()) for celula in linha.iter(f'{espaco}c')]
+            for linha in planilha.iter(f'{espaco}row')
+        ]
+        self.assertEqual(linhas[0], list(exportacao.COLUNAS))
+        self.assertEqual(len(linhas), 3)
+        self.assertIn('=Caio', [linha[0] for linha in linhas])  # caractere de controle removido; texto, não fórmula
+
+    def test_cabecalho_antes_da_consulta_e_permissoes(self):
+        with self.assertNumQueries(0):
+            primeiro = next(exportacao.csv_participantes(exportacao.linhas_participantes(self.evento)))
+        self.assertIn('Nome', primeiro)
+
+        url = reverse('exportar_participantes', args=[self.evento.pk, 'pdf'])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.client.force_login(self.aluno)
+        url = reverse('exportar_participantes', args=[self.evento.pk, 'csv'])
+        self.assertRedirects(self.client.get(url), reverse('organizador_dashboard'), fetch_redirect_response=False)
@@ -15,13 +15,17 @@ urlpatterns = [
     # URL de Ativação por E-mail
     path('activate/<uidb64>/<token>/', views.activate, name='activate'),
     path('api/status-usuario/<int:user_id>/', views.verificar_status_usuario, name='verificar_status_usuario'),
+    path('api/status-usuario/<int:user_id>/eventos/', views.eventos_status_usuario, name='eventos_status_usuario'),
 
     # --- Dashboards ---
     path('dashboard/participante/', views.participantes_dashboard, name='participantes_dashboard'),
+    path('dashboard/participante/secao/<str:secao>/', views.participantes_dashboard_secao, name='participantes_dashboard_secao'),
     path('dashboard/organizador/', views.organizador_dashboard, name='organizador_dashboard'),
 
     # --- Log Organizador ---
     path('organizador/novo-participante/', views.organizador_cadastrar_participante, name='organizador_cadastrar_participante'),
+    path('organizador/importar-usuarios/', views.importar_usuarios, name='importar_usuarios'),
+    path('organizador/importar-usuarios/relatorio/<uuid:relatorio>/', views.baixar_relatorio_importacao, name='baixar_relatorio_importacao'),
     path('organizador/auditoria/', views.logs_auditoria, name='logs_auditoria'),
 
     # --- CRUD de Eventos ---
@@ -36,10 +40,19 @@ urlpatterns = [
 
     # --- Gestão de Participantes e Certificados ---
     path('evento/<int:pk>/participantes/', views.gerenciar_participantes, name='gerenciar_participantes'),
+    path('evento/<int:pk>/certificados/emitir/', views.emitir_certificados_evento, name='emitir_certificados_evento'),
+    path('evento/<int:pk>/certificados/exportar/', views.exportar_certificados_evento, name='exportar_certificados_evento'),
+    path('evento/<int:pk>/participantes/exportar/<str:formato>/', views.exportar_participantes, name='exportar_participantes'),
+    path('certificado/validar/', views.validar_certificado, name='validar_certificado'),
     path('certificado/<str:codigo>/', views.visualizar_certificado, name='visualizar_certificado'),
+    path('certificado/<str:codigo>/pdf/', views.baixar_certificado_pdf, name='baixar_certificado_pdf'),
     
     # Rota nova do seu amigo (Marcar Presença)
     path('inscricao/<int:inscricao_pk>/presenca/', views.marcar_presenca, name='marcar_presenca'),
+    path('evento/<int:pk>/presencas/', views.marcar_presencas_em_lote, name='marcar_presencas_em_lote'),
+    # Quiosque de check-in por QR code (link assinado, sem login)
+    path('checkin/<str:chave>/', views.quiosque_checkin, name='quiosque_checkin'),
+    path('checkin/<str:chave>/leituras/', views.registrar_leituras_checkin, name='registrar_leituras_checkin'),
 
     # --- API Endpoints ---
     # Endpoint para obter o token (Login da API)
@@ -47,7 +60,21 @@ urlpatterns = [
 
     # Consulta de Eventos (GET) - Limitada a 20/dia
     path('api/eventos/', api_views.EventoListAPIView.as_view(), name='api_eventos_list'),
+    path('api/eventos/busca/', api_views.EventoBuscaAPIView.as_view(), name='api_eventos_busca'),
 
     # Inscrição (POST) - Limitada a 50/dia
     path('api/inscrever/', api_views.InscricaoCreateAPIView.as_view(), name='api_inscrever'),
+
+    # Inscrição em lote (POST) - organizador inscrevendo turmas ou usuário em vários eventos
+    path('api/inscrever/lote/', api_views.InscricaoLoteAPIView.as_view(), name='api_inscrever_lote'),
+
+    # Presença em lote (POST) - organizador registrando a chamada do evento
+    path('api/eventos/<int:pk>/presencas/', api_views.PresencaLoteAPIView.as_view(), name='api_presencas_lote'),
+
+    # Estatísticas (GET) - organizador: totais dos seus eventos ou de um evento
+    path('api/estatisticas/', api_views.EstatisticasOrganizadorAPIView.as_view(), name='api_estatisticas'),
+    path('api/eventos/<int:pk>/estatisticas/', api_views.EstatisticasEventoAPIView.as_view(), name='api_estatisticas_evento'),
+
+    # Validação pública de certificados (sem autenticação)
+    path('api/certificados/validar/', api_views.CertificadoValidacaoAPIView.as_view(), name='api_validar_certificado'),
 ]
\ No newline at end of file
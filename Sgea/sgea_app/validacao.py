@@ -0,0 +1,247 @@
+# sgea_app/validacao.py
+
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Certificado
+
+# Limite de códigos por requisição (HTML e API)
+MAXIMO_POR_CONSULTA = 100
+
+
+class FiltroBloom:
+    """
+    Filtro de Bloom simples sobre um bytearray.
+    Pode dar falso positivo (tratado com uma consulta ao banco), nunca falso negativo.
+    """
+
+    def __init__(self, capacidade, taxa_erro=0.001):
+        capacidade = max(capacidade, 1)
+        self.capacidade = capacidade
+        self.bits = max(8, int(-capacidade * math.log(taxa_erro) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.bits / capacidade * math.log(2)))
+        self.tamanho = 0
+        self._vetor = bytearray((self.bits + 7) // 8)
+
+    def _posicoes(self, chave):
+        # Hashing duplo (Kirsch-Mitzenmacher): k posições a partir de um único digest
+        digest = hashlib.blake2b(chave.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def adicionar(self, chave):
+        """Adiciona a chave; chaves já presentes não contam em `tamanho` (evita inflar com re-sincronizações)."""
+        posicoes = self._posicoes(chave)
+        vetor = self._vetor
+        if all(vetor[posicao >> 3] & (1 << (posicao & 7)) for posicao in posicoes):
+            return
+        for posicao in posicoes:
+            vetor[posicao >> 3] |= 1 << (posicao & 7)
+        self.tamanho += 1
+
+    def __contains__(self, chave):
+        vetor = self._vetor
+        return all(vetor[posicao >> 3] & (1 << (posicao & 7)) for posicao in self._posicoes(chave))
+
+
+class IndiceCertificados:
+    """
+    Índice em memória dos códigos emitidos: Filtro de Bloom + LRU dos acertos recentes.
+
+    - Código fora do filtro: inválido, sem tocar no banco.
+    - Código no LRU: resposta direta da memória.
+    - Demais: uma consulta (em lote) ao banco, e o resultado entra no LRU.
+
+    Códigos emitidos neste processo entram no índice na hora (ver certificados.py e
+    signals.py). Para pegar emissões de outros processos, o índice faz no máximo uma
+    sincronização incremental (por data_emissao) a cada `intervalo_sincronizacao` segundos.
+    """
+
+    def __init__(self, capacidade_lru=10000, intervalo_sincronizacao=5.0, taxa_erro=0.001):
+        self.capacidade_lru = capacidade_lru
+        self.intervalo_sincronizacao = intervalo_sincronizacao
+        self.taxa_erro = taxa_erro
+        # _trava protege só o estado em memória (seções curtas, sem consultas ao banco);
+        # _trava_sincronizacao garante uma única carga/sincronização por vez
+        self._trava = threading.RLock()
+        self._trava_sincronizacao = threading.Lock()
+        self._filtro = None
+        self._redimensionar = False
+        self._adicionados_na_carga = None
+        self._lru = OrderedDict()
+        self._ultima_emissao = None
+        self._ultima_sincronizacao = 0.0
+
+    # --- Manutenção do índice ---
+
+    def aquecer(self, codigos=None):
+        """
+        Reconstrói o filtro. Sem argumentos, carrega todos os códigos do banco. A leitura é feita
+        fora de _trava: as consultas continuam usando o filtro anterior até a troca.
+        """
+        with self._trava:
+            self._adicionados_na_carga = []
+        try:
+            if codigos is None:
+                agora = timezone.now()
+                quantidade = Certificado.objects.count()
+                codigos = Certificado.objects.values_list('codigo_validacao', flat=True).iterator(chunk_size=10000)
+            else:
+                agora = None
+                codigos = list(codigos)
+                quantidade = len(codigos)
+
+            # Folga de 2x para novas emissões antes de precisar redimensionar
+            filtro = FiltroBloom(max(quantidade * 2, 1024), self.taxa_erro)
+            for codigo in codigos:
+                filtro.adicionar(codigo)
+        except BaseException:
+            with self._trava:
+                self._adicionados_na_carga = None
+            raise
+
+        with self._trava:
+            # Códigos emitidos neste processo durante a carga (podem não estar na leitura acima)
+            for codigo in self._adicionados_na_carga:
+                filtro.adicionar(codigo)
+            self._adicionados_na_carga = None
+            self._filtro = filtro
+            self._redimensionar = filtro.tamanho > filtro.capacidade
+            self._lru.clear()
+            self._ultima_emissao = agora
+            self._ultima_sincronizacao = time.monotonic()
+
+    def adicionar(self, codigos):
+        with self._trava:
+            codigos = list(codigos)
+            if self._adicionados_na_carga is not None:
+                self._adicionados_na_carga.extend(codigos)
+            if self._filtro is None:
+                return  # será carregado do banco no primeiro uso
+            for codigo in codigos:
+                self._filtro.adicionar(codigo)
+            if self._filtro.tamanho > self._filtro.capacidade:
+                # Continua válido (só com mais falsos positivos) até a reconstrução, feita
+                # por _sincronizar() antes de uma consulta
+                self._redimensionar = True
+
+    def remover(self, codigo):
+        # O filtro não suporta remoção: basta tirar do LRU; o banco confirma a ausência
+        with self._trava:
+            self._lru.pop(codigo, None)
+
+    def _sincronizar(self):
+        with self._trava:
+            sem_filtro = self._filtro is None
+            redimensionar = self._redimensionar
+            desde = self._ultima_emissao
+            vencido = time.monotonic() - self._ultima_sincronizacao >= self.intervalo_sincronizacao
+
+        if sem_filtro:
+            # Sem filtro não há como responder: espera a carga em andamento (ou a faz)
+            with self._trava_sincronizacao:
+                if self._filtro is None:
+                    self.aquecer()
+            return
+        if not (redimensionar or (vencido and desde is not None)):
+            return
+        # Outra thread já está sincronizando: segue com o filtro atual
+        if not self._trava_sincronizacao.acquire(blocking=False):
+            return
+        try:
+            if redimensionar:
+                self.aquecer()
+                return
+            agora = timezone.now()
+            # Margem de 1 minuto para transações que gravaram data_emissao antes de fazer commit
+            novos = list(Certificado.objects.filter(
+                data_emissao__gte=desde - timedelta(minutes=1)
+            ).values_list('codigo_validacao', flat=True))
+            self.adicionar(novos)
+            with self._trava:
+                self._ultima_emissao = agora
+                self._ultima_sincronizacao = time.monotonic()
+        finally:
+            self._trava_sincronizacao.release()
+
+    # --- Consultas ---
+
+    def consultar(self, codigo):
+        return self.consultar_varios([codigo])[codigo]
+
+    def consultar_varios(self, codigos):
+        """Retorna {codigo: dados ou None} para uma lista de códigos."""
+        resultado = {}
+        buscar = []
+        self._sincronizar()
+        with self._trava:
+            filtro = self._filtro
+            for codigo in codigos:
+                if codigo in resultado:
+                    continue
+                if codigo in self._lru:
+                    self._lru.move_to_end(codigo)
+                    resultado[codigo] = self._lru[codigo]
+                elif filtro is None or codigo in filtro:
+                    buscar.append(codigo)
+                else:
+                    resultado[codigo] = None
+
+        if buscar:
+            encontrados = {
+                certificado.codigo_validacao: _dados_publicos(certificado)
+                for certificado in Certificado.objects.filter(codigo_validacao__in=buscar)
+                .select_related('inscricao__usuario', 'inscricao__evento')
+            }
+            with self._trava:
+                for codigo in buscar:
+                    dados = encontrados.get(codigo)
+                    resultado[codigo] = dados
+                    if dados is not None:
+                        self._lru[codigo] = dados
+                        self._lru.move_to_end(codigo)
+                while len(self._lru) > self.capacidade_lru:
+                    self._lru.popitem(last=False)
+        return resultado
+
+
+def _dados_publicos(certificado):
+    """Somente o que já está impresso no próprio certificado."""
+    inscricao = certificado.inscricao
+    usuario = inscricao.usuario
+    return {
+        'codigo': certificado.codigo_validacao,
+        'participante': f"{usuario.first_name} {usuario.last_name}".strip() or usuario.username,
+        'evento': inscricao.evento.nome,
+        'data_inicio': inscricao.evento.data_inicio,
+        'data_fim': inscricao.evento.data_fim,
+        'data_emissao': certificado.data_emissao,
+    }
+
+
+def normalizar_codigo(codigo):
+    return (codigo or '').strip().upper()
+
+
+_indice = None
+_indice_trava = threading.Lock()
+
+
+def obter_indice():
+    global _indice
+    if _indice is None:
+        with _indice_trava:
+            if _indice is None:
+                _indice = IndiceCertificados(
+                    capacidade_lru=getattr(settings, 'VALIDACAO_LRU_TAMANHO', 10000),
+                    intervalo_sincronizacao=getattr(settings, 'VALIDACAO_INTERVALO_SINCRONIZACAO', 5.0),
+                )
+    return _indice
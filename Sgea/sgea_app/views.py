@@ -8,6 +8,12 @@ from django.contrib import messages
 from django.utils import timezone
 from django.db.models import Q
 from django.utils.dateparse import parse_date
+from datetime import datetime, time, timedelta
+import asyncio
+import csv
+import io
+import json
+import os
 import uuid
 
 # --- Imports para E-mail e Ativação ---
@@ -15,44 +21,43 @@ from django.contrib.sites.shortcuts import get_current_site
 from django.template.loader import render_to_string
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
-from django.core.mail import EmailMessage
 from django.contrib.auth.tokens import default_token_generator
-from django.http import HttpResponse, JsonResponse
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
 from django.core.mail import BadHeaderError
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from smtplib import SMTPException
 
 from .models import Evento, Inscricao, Certificado, LogAuditoria
 from .forms import UsuarioCreationForm, EventoForm
+from . import auditoria, importacao, inscricoes, painel
+from . import certificados, checkin, emails, estatisticas, exportacao, notificacoes, validacao
+from .replicas import leitura_em_replica
+from .certificados import emitir_certificados_pendentes
+from .paginacao import paginar_keyset
+
+LOGS_POR_PAGINA = 50
+
+# Server-Sent Events da ativação de conta (segundos, exceto quando indicado)
+SSE_HEARTBEAT = 15
+SSE_INTERVALO_VERIFICACAO = 60
+SSE_DURACAO_MAXIMA = 600
+SSE_RECONEXAO_MS = 3000
 
 
 # --- Funções Auxiliares ---
 
 def registrar_log(request, acao, detalhes=""):
-    """Salva um registro na tabela de auditoria"""
+    """Registra uma ação na auditoria (gravação em lote, ver sgea_app.auditoria)"""
     ip = request.META.get('REMOTE_ADDR')
     user = request.user if request.user.is_authenticated else None
 
-    LogAuditoria.objects.create(
-        usuario=user,
-        acao=acao,
-        detalhes=detalhes,
-        ip_usuario=ip
-    )
-
+    auditoria.registrar(user, acao, detalhes, ip)
 
-def verificar_e_gerar_certificado(inscricao):
-    """
-    Verifica se a inscrição cumpre os requisitos e gera o certificado automaticamente.
-    Requisitos: Evento finalizado + Presença confirmada + Sem certificado existente.
-    """
-    evento = inscricao.evento
-    if inscricao.presenca and evento.data_fim < timezone.now():
-        if not hasattr(inscricao, 'certificado'):
-            codigo = uuid.uuid4().hex[:16].upper()
-            Certificado.objects.create(inscricao=inscricao, codigo_validacao=codigo)
-            return True
-    return False
 
 @login_required
 def visualizar_certificado(request, codigo):
@@ -73,6 +78,54 @@ def visualizar_certificado(request, codigo):
     return render(request, 'sgea_app/certificado/visualizar_certificado.html', context)
 
 
+def validar_certificado(request):
+    """Validação pública (sem login) de um ou vários códigos de certificado"""
+    texto = request.GET.get('codigos', '')
+    codigos = [validacao.normalizar_codigo(c) for c in texto.replace(',', '\n').splitlines()]
+    codigos = list(dict.fromkeys(c for c in codigos if c))[:validacao.MAXIMO_POR_CONSULTA]
+
+    resultados = []
+    if codigos:
+        encontrados = validacao.obter_indice().consultar_varios(codigos)
+        resultados = [(codigo, encontrados[codigo]) for codigo in codigos]
+
+    return render(request, 'sgea_app/certificado/validar_certificado.html', {
+        'codigos': texto,
+        'resultados': resultados,
+        'maximo': validacao.MAXIMO_POR_CONSULTA,
+    })
+
+
+@login_required
+def baixar_certificado_pdf(request, codigo):
+    """Entrega o PDF do certificado a partir do cache em disco, com suporte a ETag/Last-Modified (304)"""
+    certificado = get_object_or_404(certificados.certificados_com_dados(), codigo_validacao=codigo)
+
+    if certificado.inscricao.usuario != request.user and not request.user.is_superuser:
+        messages.error(request, "Você não tem permissão para visualizar este certificado.")
+        return redirect('participantes_dashboard')
+
+    dados = certificados.dados_certificado(certificado)
+    caminho = certificados.caminho_pdf(dados)
+    etag = f'"{certificados.assinatura_pdf(dados)}"'
+    ultima_modificacao = int(os.path.getmtime(caminho)) if os.path.exists(caminho) else None
+
+    nao_modificado = get_conditional_response(request, etag=etag, last_modified=ultima_modificacao)
+    if nao_modificado is not None:
+        return nao_modificado
+
+    caminho, _ = certificados.obter_pdf(certificado)
+    response = FileResponse(
+        open(caminho, 'rb'),
+        content_type='application/pdf',
+        filename=f"certificado-{codigo}.pdf",
+    )
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(os.path.getmtime(caminho))
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
 # --- Autenticação e Cadastro ---
 
 def login_view(request):
@@ -134,19 +187,21 @@ def cadastro(request):
                     }
                     message = render_to_string('sgea_app/emails/acc_active_email.html', context)
                     to_email = form.cleaned_data.get('email')
-                    email = EmailMessage(mail_subject, message, to=[to_email])
-                    email.content_subtype = "html"
 
                     # 3. Verifica se tem senha configurada
                     if not settings.EMAIL_HOST_PASSWORD:
                         # Força o erro para acionar o rollback do banco
                         raise Exception("Configuração de e-mail não encontrada (.env ausente).")
 
-                    # 4. Tenta Enviar
-                    email.send(fail_silently=False)
+                    # 4. Grava na caixa de saída, na mesma transação (o worker enviar_emails faz o envio SMTP)
+                    emails.enfileirar(mail_subject, message, to_email)
 
                 # Renderiza a tela de espera passando o ID do usuário para o JavaScript monitorar
-                return render(request, 'sgea_app/usuarios/email_sent.html', {'user_id': user.pk})
+                # (SSE quando servido via ASGI; caso contrário, polling)
+                return render(request, 'sgea_app/usuarios/email_sent.html', {
+                    'user_id': user.pk,
+                    'usar_sse': isinstance(request, ASGIRequest),
+                })
 
             except (SMTPException, OSError, Exception) as e:
                 # SE DEU ERRO: O transaction.atomic já desfez o salvamento do usuário no banco.
@@ -169,6 +224,49 @@ def verificar_status_usuario(request, user_id):
         return JsonResponse({'ativo': False})
 
 
+async def eventos_status_usuario(request, user_id):
+    """
+    Server-Sent Events: mantém a conexão aberta (barata sob ASGI) e envia um único
+    evento 'ativo' quando a conta for ativada. Substitui o polling de verificar_status_usuario.
+    """
+    response = StreamingHttpResponse(_fluxo_ativacao(user_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # evita buffering em proxies (nginx)
+    return response
+
+
+async def _fluxo_ativacao(user_id):
+    loop = asyncio.get_running_loop()
+    notificacoes.obter_backend()  # garante a escuta do backend entre processos, se houver
+    canal = notificacoes.canal_ativacao(user_id)
+    # Assina antes de consultar o banco: uma ativação entre as duas etapas não se perde
+    futuro = notificacoes.hub.assinar(canal)
+    try:
+        yield f"retry: {SSE_RECONEXAO_MS}\n\n"
+        encerrar_em = loop.time() + SSE_DURACAO_MAXIMA
+        proxima_verificacao = loop.time()
+        while True:
+            # Verificação de segurança no banco (ex: ativação feita por outro processo sem backend compartilhado)
+            if loop.time() >= proxima_verificacao:
+                ativo = await get_user_model().objects.filter(pk=user_id).values_list('is_active', flat=True).afirst()
+                if ativo is None:
+                    yield 'event: inexistente\ndata: {"ativo": false}\n\n'
+                    return
+                if ativo:
+                    break
+                proxima_verificacao = loop.time() + SSE_INTERVALO_VERIFICACAO
+            if loop.time() >= encerrar_em:
+                return  # o EventSource reconecta sozinho
+            try:
+                await asyncio.wait_for(asyncio.shield(futuro), timeout=SSE_HEARTBEAT)
+                break
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+        yield 'event: ativo\ndata: {"ativo": true}\n\n'
+    finally:
+        notificacoes.hub.cancelar(canal, futuro)
+
+
 def activate(request, uidb64, token):
     User = get_user_model()
     try:
@@ -180,6 +278,10 @@ def activate(request, uidb64, token):
     if user is not None and default_token_generator.check_token(user, token):
         user.is_active = True
         user.save()
+        # Avisa a página de espera (SSE) de forma instantânea
+        transaction.on_commit(lambda: notificacoes.publicar(
+            notificacoes.canal_ativacao(user.pk), {'ativo': True}
+        ))
         registrar_log(request, 'ativacao_conta', f"Conta ativada: {user.username}")
         messages.success(request, 'Sua conta foi ativada com sucesso! Faça login para continuar.')
         return redirect('login')
@@ -191,49 +293,42 @@ def activate(request, uidb64, token):
 
 @login_required
 def participantes_dashboard(request):
-    # 1. Automação: Gera certificados pendentes ao acessar o dashboard
-    inscricoes_pendentes = Inscricao.objects.filter(
-        usuario=request.user,
-        presenca=True,
-        certificado__isnull=True,
-        evento__data_fim__lt=timezone.now()
-    )
-    for inscricao in inscricoes_pendentes:
-        verificar_e_gerar_certificado(inscricao)
-
-    # 2. Listas de Eventos
-    eventos_inscritos = Evento.objects.filter(participantes=request.user)
-    eventos_disponiveis = Evento.objects.exclude(
-        participantes=request.user
-    ).filter(
-        data_fim__gte=timezone.now()
-    )
-
-    # 3. Lista de Responsabilidade do Professor
-    eventos_responsavel = []
-    if request.user.perfil == 'professor':
-        eventos_responsavel = Evento.objects.filter(professor_responsavel=request.user)
-
-    certificados_obtidos = Certificado.objects.filter(inscricao__usuario=request.user).select_related(
-        'inscricao__evento')
-
+    # Certificados são emitidos em lote por 'manage.py emitir_certificados' (ver sgea_app.certificados).
+    # A página só monta a estrutura: cada seção é carregada por participantes_dashboard_secao.
+    secoes = [secao for secao in painel.SECOES if secao != 'responsavel' or request.user.perfil == 'professor']
     context = {
-        'eventos_inscritos': eventos_inscritos,
-        'eventos_disponiveis': eventos_disponiveis,
-        'certificados_obtidos': certificados_obtidos,
-        'eventos_responsavel': eventos_responsavel,
+        'secoes': secoes,
+        'busca_texto': request.GET.get('q', '').strip(),
     }
     return render(request, 'sgea_app/dashboard/participantes_dashboard.html', context)
 
 
 @login_required
+def participantes_dashboard_secao(request, secao):
+    """
+    Uma página (?pagina=N) de uma seção do painel; em 'disponiveis', ?q= busca pelo índice textual.
+    Lê do primário: o fragmento vai para o cache sob as versões do primário (ver sgea_app.replicas).
+    """
+    if secao not in painel.SECOES or (secao == 'responsavel' and request.user.perfil != 'professor'):
+        raise Http404("Seção não encontrada.")
+    busca_texto = request.GET.get('q', '').strip() if secao == 'disponiveis' else ''
+    html = painel.fragmento(request, secao, request.GET.get('pagina'), busca_texto)
+    response = HttpResponse(html)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@login_required
+@leitura_em_replica
 def organizador_dashboard(request):
     if request.user.perfil != 'organizador':
         return redirect('participantes_dashboard')
 
-    eventos = Evento.objects.filter(organizador=request.user).order_by('-data_inicio')
+    # Presentes e certificados vêm da tabela de resumo (sgea_app.estatisticas), sem agregações por evento
+    eventos = Evento.objects.com_estatisticas().filter(organizador=request.user).order_by('-data_inicio')
     context = {
-        'eventos': eventos
+        'eventos': eventos,
+        'totais': estatisticas.do_organizador(request.user),
     }
     return render(request, 'sgea_app/dashboard/organizador_dashboard.html', context)
 
@@ -297,7 +392,10 @@ def deletar_evento(request, pk):
 
 
 def detalhes_evento(request, pk):
-    evento = get_object_or_404(Evento, pk=pk)
+    evento = get_object_or_404(
+        Evento.objects.com_ocupacao().select_related('professor_responsavel'),
+        pk=pk
+    )
     inscrito = False
     if request.user.is_authenticated:
         inscrito = Inscricao.objects.filter(usuario=request.user, evento=evento).exists()
@@ -316,23 +414,17 @@ def inscrever_evento(request, pk):
     evento = get_object_or_404(Evento, pk=pk)
 
     if request.method == 'POST':
-        # Impede inscrição se o evento já terminou
-        if evento.data_fim < timezone.now():
+        try:
+            inscricoes.inscrever(request.user, evento)
+        except inscricoes.InscricoesEncerradas:
             messages.error(request, f"As inscrições para '{evento.nome}' estão encerradas (o evento já terminou).")
-            return redirect('participantes_dashboard')
-
-        # Regra: Limite de Vagas
-        if evento.participantes.count() >= evento.quantidade_participantes:
+        except inscricoes.VagasEsgotadas:
             messages.error(request, f"Desculpe, as vagas para o evento '{evento.nome}' estão esgotadas.")
-            return redirect('participantes_dashboard')
-
-        ja_inscrito = Inscricao.objects.filter(usuario=request.user, evento=evento).exists()
-        if not ja_inscrito:
-            Inscricao.objects.create(usuario=request.user, evento=evento)
+        except inscricoes.JaInscrito:
+            messages.warning(request, f"Você já está inscrito no evento '{evento.nome}'.")
+        else:
             registrar_log(request, 'inscricao', f"Inscrição realizada no evento: {evento.nome}")
             messages.success(request, f"Inscrição no evento '{evento.nome}' realizada com sucesso!")
-        else:
-            messages.warning(request, f"Você já está inscrito no evento '{evento.nome}'.")
 
     return redirect('participantes_dashboard')
 
@@ -342,9 +434,7 @@ def cancelar_inscricao(request, pk):
     evento = get_object_or_404(Evento, pk=pk)
 
     if request.method == 'POST':
-        inscricao = Inscricao.objects.filter(usuario=request.user, evento=evento)
-        if inscricao.exists():
-            inscricao.delete()
+        if inscricoes.cancelar(request.user, evento):
             registrar_log(request, 'cancelamento', f"Cancelou inscrição no evento: {evento.nome}")
             messages.info(request, f"Sua inscrição no evento '{evento.nome}' foi cancelada.")
 
@@ -358,48 +448,160 @@ def gerenciar_participantes(request, pk):
     if evento.organizador != request.user:
         return redirect('organizador_dashboard')
 
-    # Automação: Se o evento já acabou, verifica e gera certificados pendentes para quem tem presença
-    if evento.data_fim < timezone.now():
-        pendentes = Inscricao.objects.filter(evento=evento, presenca=True, certificado__isnull=True)
-        gerados = 0
-        for insc in pendentes:
-            if verificar_e_gerar_certificado(insc):
-                gerados += 1
-
-        if gerados > 0:
-            messages.success(request, f"{gerados} certificados foram gerados automaticamente.")
-
     inscricoes = Inscricao.objects.filter(evento=evento).select_related('usuario', 'certificado').order_by(
         'usuario__first_name')
 
     context = {
         'evento': evento,
-        'inscricoes': inscricoes
+        'inscricoes': inscricoes,
+        'chave_quiosque': checkin.gerar_chave_quiosque(evento.pk),
     }
     return render(request, 'sgea_app/eventos/gerenciar_participantes.html', context)
 
 
 @login_required
 def marcar_presenca(request, inscricao_pk):
-    inscricao = get_object_or_404(Inscricao, pk=inscricao_pk)
+    inscricao = get_object_or_404(Inscricao.objects.select_related('usuario', 'evento'), pk=inscricao_pk)
     evento = inscricao.evento
 
     if evento.organizador != request.user:
         return redirect('organizador_dashboard')
 
-    # Alterna status de presença
-    inscricao.presenca = not inscricao.presenca
-    inscricao.save()
+    # Alterna status de presença (emite o certificado após o commit se o evento já acabou)
+    alteradas, _ = inscricoes.atualizar_presencas(evento, {inscricao.pk: not inscricao.presenca})
+    if alteradas:
+        status_str = "Presente" if alteradas[0].presenca else "Ausente"
+        registrar_log(request, 'presenca', f"Marcou {status_str} para {inscricao.usuario.username} no evento {evento.nome}")
 
-    status_str = "Presente" if inscricao.presenca else "Ausente"
-    registrar_log(request, 'presenca', f"Marcou {status_str} para {inscricao.usuario.username} no evento {evento.nome}")
+    return redirect('gerenciar_participantes', pk=evento.pk)
 
-    # Tenta gerar certificado automaticamente se o evento já acabou
-    verificar_e_gerar_certificado(inscricao)
+
+@login_required
+def marcar_presencas_em_lote(request, pk):
+    """
+    Chamada de presença da lista inteira: 'inscricoes' traz as inscrições exibidas e 'presentes'
+    as marcadas. Um único bulk_update, um registro de auditoria e uma emissão de certificados.
+    """
+    evento = get_object_or_404(Evento, pk=pk)
+
+    if evento.organizador != request.user:
+        return redirect('organizador_dashboard')
+
+    if request.method == 'POST':
+        try:
+            exibidas = {int(valor) for valor in request.POST.getlist('inscricoes')}
+            marcadas = {int(valor) for valor in request.POST.getlist('presentes')}
+        except ValueError:
+            messages.error(request, "Seleção de participantes inválida.")
+            return redirect('gerenciar_participantes', pk=evento.pk)
+
+        alteradas, _ = inscricoes.atualizar_presencas(evento, {pk: pk in marcadas for pk in exibidas | marcadas})
+        if alteradas:
+            registrar_log(request, 'presenca', inscricoes.resumo_presencas(evento, alteradas))
+            messages.success(request, f"Presença atualizada para {len(alteradas)} participante(s).")
+        else:
+            messages.info(request, "Nenhuma presença foi alterada.")
 
     return redirect('gerenciar_participantes', pk=evento.pk)
 
 
+@login_required
+def exportar_certificados_evento(request, pk):
+    """Baixa todos os certificados do evento em um único ZIP, gerado em streaming"""
+    evento = get_object_or_404(Evento, pk=pk)
+
+    if evento.organizador != request.user:
+        return redirect('organizador_dashboard')
+
+    lista = certificados.certificados_com_dados(
+        Certificado.objects.filter(inscricao__evento=evento)
+    ).order_by('inscricao__usuario__first_name')
+
+    response = StreamingHttpResponse(certificados.zip_certificados(lista), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="certificados-evento-{evento.pk}.zip"'
+    return response
+
+
+FORMATOS_EXPORTACAO = {
+    'csv': ('text/csv; charset=utf-8', exportacao.csv_participantes),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', exportacao.xlsx_participantes),
+}
+
+
+@login_required
+def exportar_participantes(request, pk, formato):
+    """Baixa a lista de participantes do evento em CSV ou XLSX, gerada em streaming"""
+    if formato not in FORMATOS_EXPORTACAO:
+        raise Http404("Formato de exportação não suportado.")
+    evento = get_object_or_404(Evento.objects.only('id', 'organizador_id'), pk=pk)
+
+    if evento.organizador_id != request.user.pk:
+        return redirect('organizador_dashboard')
+
+    content_type, gerar = FORMATOS_EXPORTACAO[formato]
+    response = StreamingHttpResponse(gerar(exportacao.linhas_participantes(evento)), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="participantes-evento-{evento.pk}.{formato}"'
+    return response
+
+
+@login_required
+def emitir_certificados_evento(request, pk):
+    """Emite de uma vez os certificados pendentes de um evento encerrado"""
+    evento = get_object_or_404(Evento, pk=pk)
+
+    if evento.organizador != request.user:
+        return redirect('organizador_dashboard')
+
+    if request.method == 'POST':
+        gerados = emitir_certificados_pendentes(Inscricao.objects.filter(evento=evento))
+        if gerados > 0:
+            messages.success(request, f"{gerados} certificados foram emitidos.")
+        else:
+            messages.info(request, "Nenhum certificado pendente para este evento.")
+
+    return redirect('gerenciar_participantes', pk=evento.pk)
+
+
+# --- Check-in por QR Code (ver sgea_app.checkin) ---
+
+CHECKIN_MAX_LEITURAS = 5000
+
+
+def quiosque_checkin(request, chave):
+    """Tela do quiosque na porta do evento: aberta pelo link assinado, sem login."""
+    evento_id = checkin.ler_chave_quiosque(chave)
+    if evento_id is None:
+        raise Http404("Link de check-in inválido ou expirado.")
+    evento = get_object_or_404(Evento.objects.only('id', 'nome', 'local', 'data_inicio'), pk=evento_id)
+    return render(request, 'sgea_app/eventos/quiosque_checkin.html', {'evento': evento, 'chave': chave})
+
+
+@csrf_exempt
+@require_POST
+def registrar_leituras_checkin(request, chave):
+    """
+    Leituras do quiosque: POST {"leituras": ["<ingresso>", ...]}, uma a uma ou o lote guardado
+    enquanto o quiosque estava offline. Autenticado pelo próprio link assinado (sem sessão).
+    """
+    evento_id = checkin.ler_chave_quiosque(chave)
+    if evento_id is None:
+        return JsonResponse({'detail': "Link de check-in inválido ou expirado."}, status=403)
+
+    try:
+        leituras = json.loads(request.body)['leituras']
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'detail': "Envie {\"leituras\": [...]}."}, status=400)
+    if not isinstance(leituras, list) or not all(isinstance(leitura, str) for leitura in leituras):
+        return JsonResponse({'detail': "'leituras' deve ser uma lista de textos."}, status=400)
+    if len(leituras) > CHECKIN_MAX_LEITURAS:
+        return JsonResponse({'detail': f"Máximo de {CHECKIN_MAX_LEITURAS} leituras por requisição."}, status=400)
+
+    situacoes = checkin.obter_registro().registrar(evento_id, leituras)
+    return JsonResponse({
+        'resultados': [{'leitura': leitura, 'situacao': situacao} for leitura, situacao in zip(leituras, situacoes)]
+    })
+
+
 # --- Funcionalidades Extras do Organizador (Auditoria e Cadastro) ---
 
 @login_required
@@ -433,28 +635,87 @@ def organizador_cadastrar_participante(request):
 
 
 @login_required
+def importar_usuarios(request):
+    """Importa usuários em massa a partir de um CSV, com relatório das linhas recusadas para download"""
+    if request.user.perfil != 'organizador':
+        return redirect('participantes_dashboard')
+
+    contexto = {'colunas': importacao.COLUNAS}
+    if request.method == 'POST' and request.FILES.get('arquivo'):
+        arquivo = io.TextIOWrapper(request.FILES['arquivo'].file, encoding='utf-8-sig', newline='')
+        try:
+            criados, erros = importacao.importar_usuarios(arquivo)
+        except importacao.ArquivoInvalido as e:
+            messages.error(request, str(e))
+            return redirect('importar_usuarios')
+        except (UnicodeDecodeError, csv.Error):
+            messages.error(request, "Não foi possível ler o arquivo. Salve a planilha como CSV (UTF-8).")
+            return redirect('importar_usuarios')
+
+        registrar_log(request, 'cadastro_usuario', f"Organizador importou {criados} usuário(s) via CSV ({len(erros)} linha(s) recusada(s))")
+        contexto.update({'criados': criados, 'total_erros': len(erros)})
+        if erros:
+            # O relatório fica em disco, prefixado pelo organizador que o gerou
+            relatorio = uuid.uuid4()
+            os.makedirs(settings.IMPORTACAO_DIR_RELATORIOS, exist_ok=True)
+            caminho = os.path.join(settings.IMPORTACAO_DIR_RELATORIOS, f"{request.user.pk}_{relatorio}.csv")
+            with open(caminho, 'w', encoding='utf-8-sig', newline='') as saida:
+                importacao.escrever_relatorio(erros, saida)
+            contexto['relatorio'] = relatorio
+            contexto['erros'] = erros[:20]
+
+    return render(request, 'sgea_app/usuarios/importar_usuarios.html', contexto)
+
+
+@login_required
+def baixar_relatorio_importacao(request, relatorio):
+    """Download do relatório de erros de uma importação feita pelo próprio organizador"""
+    caminho = os.path.join(settings.IMPORTACAO_DIR_RELATORIOS, f"{request.user.pk}_{relatorio}.csv")
+    if request.user.perfil != 'organizador' or not os.path.exists(caminho):
+        raise Http404("Relatório não encontrado.")
+    return FileResponse(open(caminho, 'rb'), as_attachment=True, filename="erros-importacao.csv", content_type='text/csv')
+
+
+@login_required
+@leitura_em_replica
 def logs_auditoria(request):
-    """Exibe a lista de logs do sistema com filtros"""
+    """Exibe a lista de logs do sistema com filtros, paginada por chave (data_hora, id)"""
     if request.user.perfil != 'organizador':
         return redirect('participantes_dashboard')
 
     # Busca logs e otimiza query com select_related
     logs = LogAuditoria.objects.all().select_related('usuario')
 
-    # Filtros
+    # Filtros (escritos como faixas/IN para aproveitar os índices de LogAuditoria)
     data_filtro = request.GET.get('data')
     usuario_filtro = request.GET.get('usuario')
+    acao_filtro = request.GET.get('acao')
 
     if data_filtro:
         data = parse_date(data_filtro)
         if data:
-            logs = logs.filter(data_hora__date=data)
+            inicio = timezone.make_aware(datetime.combine(data, time.min))
+            logs = logs.filter(data_hora__gte=inicio, data_hora__lt=inicio + timedelta(days=1))
 
     if usuario_filtro:
-        logs = logs.filter(usuario__username__icontains=usuario_filtro)
+        usuarios = get_user_model().objects.filter(username__icontains=usuario_filtro)
+        logs = logs.filter(usuario__in=usuarios)
+
+    if acao_filtro:
+        logs = logs.filter(acao=acao_filtro)
+
+    pagina = paginar_keyset(
+        logs, 'data_hora',
+        antes=request.GET.get('antes'),
+        apos=request.GET.get('apos'),
+        por_pagina=LOGS_POR_PAGINA,
+    )
 
     return render(request, 'sgea_app/dashboard/logs_auditoria.html', {
-        'logs': logs,
+        'logs': pagina['itens'],
+        'pagina': pagina,
         'data_filtro': data_filtro,
-        'usuario_filtro': usuario_filtro
-    })
\ No newline at end of file
+        'usuario_filtro': usuario_filtro,
+        'acao_filtro': acao_filtro,
+        'acoes': LogAuditoria.ACAO_CHOICES,
+    })